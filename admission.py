@@ -0,0 +1,287 @@
+import base64
+import heapq
+import json
+import math
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from itertools import islice
+from typing import Callable, Dict, List, Optional
+
+from base import VideoBase
+
+
+class AdmissionRejected(RuntimeError):
+
+    def __init__(self, op: str, cost: int, reason: str):
+        super().__init__(f"İstek reddedildi: {op} ({reason})")
+        self.op = op
+        self.cost = cost
+        self.reason = reason
+
+
+class ScanCursor:
+    # after, son dönen videonun (anahtar, video_id) çiftidir; devam parçası
+    # ofseti atlamak yerine bu anahtardan sonrasını seçer, böylece her
+    # parçanın maliyeti derinlikten bağımsız n log limit olur. stop, sayfa
+    # gibi sınırlı taramalarda devamın aşmayacağı sıradır.
+    __slots__ = ("op", "reverse", "offset", "after", "stop")
+
+    def __init__(
+        self,
+        op: str,
+        reverse: bool,
+        offset: int,
+        after: Optional[tuple] = None,
+        stop: Optional[int] = None
+    ):
+        self.op = op
+        self.reverse = reverse
+        self.offset = offset
+        self.after = after
+        self.stop = stop
+
+    def to_token(self) -> str:
+        after = None
+        if self.after is not None:
+            key, video_id = self.after
+            if isinstance(key, datetime):
+                after = ["t", key.isoformat(), video_id]
+            else:
+                after = ["s", key, video_id]
+        data = json.dumps(
+            [self.op, self.reverse, self.offset, after, self.stop]
+        )
+        return base64.urlsafe_b64encode(data.encode("utf-8")).decode("ascii")
+
+    @classmethod
+    def from_token(cls, token: str) -> "ScanCursor":
+        try:
+            op, reverse, offset, after, stop = json.loads(
+                base64.urlsafe_b64decode(token.encode("ascii"))
+            )
+            if after is not None:
+                kind, key, video_id = after
+                if kind == "t":
+                    key = datetime.fromisoformat(key)
+                after = (key, video_id)
+        except (ValueError, TypeError):
+            raise ValueError("Geçersiz cursor")
+        if (
+            op not in SCAN_KEYS
+            or not isinstance(offset, int)
+            or not isinstance(stop, (int, type(None)))
+        ):
+            raise ValueError("Geçersiz cursor")
+        return cls(op, bool(reverse), offset, after, stop)
+
+    def __repr__(self) -> str:
+        return f"<ScanCursor {self.op} | offset={self.offset}>"
+
+
+class TruncatedResult(list):
+    # Bütçeyi aşan taramanın ilk parçası; devamı cursor ile alınır.
+
+    def __init__(
+        self,
+        items: List[VideoBase],
+        cursor: Optional[ScanCursor],
+        total: int
+    ):
+        super().__init__(items)
+        self.cursor = cursor
+        self.total = total
+
+
+class _Lane:
+    # Sabit eşzamanlılık bütçesi ve sınırlı bekleme kuyruğu. Kuyruk doluysa
+    # ya da bekleme süresi dolarsa istek düşürülür.
+
+    def __init__(self, name: str, limit: int, max_queue: int):
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.shed = 0
+        self.max_waiting = 0
+        self._cond = threading.Condition()
+
+    def acquire(self, timeout: Optional[float]) -> bool:
+        with self._cond:
+            if self.active < self.limit and not self.waiting:
+                self.active += 1
+                self.admitted += 1
+                return True
+            if self.waiting >= self.max_queue:
+                self.shed += 1
+                return False
+
+            self.waiting += 1
+            self.max_waiting = max(self.max_waiting, self.waiting)
+            try:
+                ready = self._cond.wait_for(
+                    lambda: self.active < self.limit, timeout
+                )
+            finally:
+                self.waiting -= 1
+            if not ready:
+                self.shed += 1
+                return False
+            self.active += 1
+            self.admitted += 1
+            return True
+
+    def release(self) -> None:
+        with self._cond:
+            self.active -= 1
+            self._cond.notify()
+
+    def metrics(self) -> dict:
+        return {
+            "active": self.active,
+            "queue_depth": self.waiting,
+            "max_queue_depth": self.max_waiting,
+            "admitted": self.admitted,
+            "shed": self.shed
+        }
+
+
+SCAN_KEYS: Dict[str, Optional[Callable[[VideoBase], object]]] = {
+    "list_all": None,
+    "paginate": lambda v: v.created_at,
+    "sort_by_created": lambda v: v.created_at,
+    "sort_by_updated": lambda v: v.updated_at or v.created_at,
+    "sort_by_title": lambda v: v.title.lower()
+}
+
+
+class AdmissionController:
+    # Maliyet, dokunulacak video sayısı cinsinden tahmin edilir: indeksli
+    # sorgular indeks boyutu, tam taramalar katalog boyutu, sıralamalar
+    # n log n. Ucuz ve pahalı işler ayrı bütçelerden geçer; böylece ağır
+    # taramalar ne kadar birikirse biriksin tekil işlemler beklemez.
+
+    def __init__(
+        self,
+        cheap_limit: int = 32,
+        expensive_limit: int = 2,
+        cheap_queue: int = 256,
+        expensive_queue: int = 8,
+        queue_timeout: Optional[float] = 1.0,
+        cheap_cost: int = 5000,
+        max_cost: int = 5000000,
+        degrade_limit: int = 1000
+    ):
+        self.cheap = _Lane("cheap", cheap_limit, cheap_queue)
+        self.expensive = _Lane("expensive", expensive_limit, expensive_queue)
+        self.queue_timeout = queue_timeout
+        self.cheap_cost = cheap_cost
+        self.max_cost = max_cost
+        self.degrade_limit = degrade_limit
+        self.degraded = 0
+        self.rejected = 0
+
+    @staticmethod
+    def sort_cost(size: int) -> int:
+        return AdmissionController.select_cost(size, size)
+
+    @staticmethod
+    def select_cost(size: int, count: int) -> int:
+        # n eleman içinden ilk k'yı yığınla seçmek: n log k.
+        return size * max(1, math.ceil(math.log2(count + 1)))
+
+    def scan_cost(self, op: str, size: int, count: int) -> int:
+        if SCAN_KEYS[op] is None:
+            return min(size, count)
+        return self.select_cost(size, count)
+
+    def lane(self, cost: int) -> _Lane:
+        return self.cheap if cost <= self.cheap_cost else self.expensive
+
+    @contextmanager
+    def admit(self, op: str, cost: int):
+        lane = self.lane(cost)
+        if not lane.acquire(self.queue_timeout):
+            self.rejected += 1
+            raise AdmissionRejected(op, cost, f"{lane.name} kuyruğu dolu")
+        try:
+            yield
+        finally:
+            lane.release()
+
+    def run(
+        self,
+        op: str,
+        cost: int,
+        call: Callable,
+        degrade: Optional[Callable] = None,
+        degrade_cost: Optional[int] = None
+    ):
+        # Kısaltılmış tarama da kendi maliyetiyle bütçeden geçer; o da
+        # sınırı aşıyorsa istek reddedilir.
+        if cost > self.max_cost:
+            if degrade is not None:
+                cost = self.max_cost if degrade_cost is None else degrade_cost
+            if degrade is None or cost > self.max_cost:
+                self.rejected += 1
+                raise AdmissionRejected(op, cost, "maliyet sınırı aşıldı")
+            with self.admit(op, cost):
+                self.degraded += 1
+                return degrade()
+        with self.admit(op, cost):
+            return call()
+
+    def scan(
+        self,
+        videos,
+        total: int,
+        op: str,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        reverse: bool = False,
+        after: Optional[tuple] = None,
+        stop: Optional[int] = None
+    ) -> TruncatedResult:
+        # Tam sıralama yerine yalnızca istenen parça seçilir: n log k.
+        # Eşit anahtarlar video_id ile ayrılır ki cursor kaymasın.
+        limit = limit or self.degrade_limit
+        key = SCAN_KEYS[op]
+        end = offset + limit
+        bound = total if stop is None else min(total, stop)
+        if key is None:
+            items = list(islice(videos, offset, end))
+            cursor = None
+            if end < bound:
+                cursor = ScanCursor(op, reverse, end, None, stop)
+            return TruncatedResult(items, cursor, total)
+
+        def position(video: VideoBase) -> tuple:
+            return key(video), video.video_id
+
+        if after is not None:
+            if reverse:
+                videos = (v for v in videos if position(v) < after)
+            else:
+                videos = (v for v in videos if position(v) > after)
+            skip, count = 0, limit
+        else:
+            skip, count = offset, end
+        if reverse:
+            items = heapq.nlargest(count, videos, key=position)[skip:]
+        else:
+            items = heapq.nsmallest(count, videos, key=position)[skip:]
+        cursor = None
+        if end < bound and items:
+            cursor = ScanCursor(op, reverse, end, position(items[-1]), stop)
+        return TruncatedResult(items, cursor, total)
+
+    def metrics(self) -> dict:
+        return {
+            "cheap": self.cheap.metrics(),
+            "expensive": self.expensive.metrics(),
+            "degraded": self.degraded,
+            "rejected": self.rejected,
+            "shed": self.cheap.shed + self.expensive.shed
+        }
@@ -0,0 +1,271 @@
+import asyncio
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from base import VideoBase
+from services import BulkOutcome, UnitOfWork, VideoService
+
+
+class AsyncVideoService:
+    # VideoService'in asyncio yüzü. Tekil işlemler döngü içinde çalışır;
+    # tarama ve sıralamalar sınırlı bir havuza gönderilir. Aynı döngü
+    # turunda gelen izlenme ve etiket çağrıları tek toplu işleme birleşir.
+    # Depo iş parçacığı güvenli olmadığından her erişim tek bir kilitle
+    # sıralanır; kilit meşgulse tekil işlem de havuza düşer ve döngü
+    # hiçbir zaman beklemez.
+
+    # Tarama, sıralama ve toplu işlemler havuza gider. VideoService'in
+    # geri kalan açık metotları döngü içinde çalışır; yeni bir tarama
+    # eklenirse buraya da eklenmelidir. Bu sınıfta tanımlı metotlar
+    # (toplanan çağrılar, unit_of_work) servisteki karşılıklarını ezer.
+    OFFLOADED = frozenset({
+        "transition_many",
+        "block_where",
+        "set_visibility_many",
+        "add_ratings",
+        "mark_videos_watched",
+        "add_tags",
+        "list_all",
+        "list_by_channel",
+        "list_by_status",
+        "list_by_visibility",
+        "list_public",
+        "list_uploaded_between",
+        "list_updated_between",
+        "list_published_public",
+        "list_filtered",
+        "list_processing",
+        "list_blocked",
+        "list_unlisted",
+        "paginate",
+        "sort_by_created",
+        "sort_by_updated",
+        "sort_by_title",
+        "resume"
+    })
+    # Modül sonunda VideoService'in açık metotlarından üretilir.
+    INLINE: frozenset = frozenset()
+
+    def __init__(
+        self,
+        service: VideoService,
+        max_workers: int = 4,
+        max_pending: int = 64,
+        executor: Optional[Executor] = None,
+        default_timeout: Optional[float] = None
+    ):
+        self.service = service
+        self.default_timeout = default_timeout
+        self.max_pending = max_pending
+        self._executor = executor or ThreadPoolExecutor(
+            max_workers, thread_name_prefix="video-scan"
+        )
+        self._owns_executor = executor is None
+        self._lock = threading.Lock()
+        self._slots: Optional[asyncio.Semaphore] = None
+
+        self._pending_watch: List[Tuple[str, Optional[str], asyncio.Future]] = []
+        self._pending_tags: List[Tuple[str, str, asyncio.Future]] = []
+        self._flush_scheduled = False
+        self._tasks: set = set()
+
+        self.inline_calls = 0
+        self.offloaded_calls = 0
+        self.batches = 0
+        self.batched_calls = 0
+        self.cancelled_calls = 0
+
+    def _locked(self, method, args, kwargs):
+        with self._lock:
+            return method(*args, **kwargs)
+
+    async def _offload(self, method, args, kwargs):
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_pending)
+        async with self._slots:
+            self.offloaded_calls += 1
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._executor, self._locked, method, args, kwargs
+            )
+
+    async def _inline(self, method, args, kwargs):
+        if self._lock.acquire(blocking=False):
+            try:
+                self.inline_calls += 1
+                return method(*args, **kwargs)
+            finally:
+                self._lock.release()
+        return await self._offload(method, args, kwargs)
+
+    async def _with_timeout(self, awaitable, timeout: Optional[float]):
+        if timeout is None:
+            timeout = self.default_timeout
+        if timeout is None:
+            return await awaitable
+        return await asyncio.wait_for(awaitable, timeout)
+
+    def __getattr__(self, name: str):
+        if name in self.OFFLOADED:
+            runner = self._offload
+        elif name in self.INLINE:
+            runner = self._inline
+        else:
+            raise AttributeError(name)
+        method = getattr(self.service, name)
+
+        async def call(*args, timeout: Optional[float] = None, **kwargs):
+            return await self._with_timeout(
+                runner(method, args, kwargs), timeout
+            )
+
+        call.__name__ = name
+        return call
+
+    async def get_video(
+        self,
+        video_id: str,
+        timeout: Optional[float] = None
+    ) -> Optional[VideoBase]:
+        return await self._with_timeout(
+            self._inline(self.service.repository.find_by_id, (video_id,), {}),
+            timeout
+        )
+
+    async def mark_video_watched(
+        self,
+        video_id: str,
+        viewer_id: Optional[str] = None,
+        timeout: Optional[float] = None
+    ) -> None:
+        future = asyncio.get_running_loop().create_future()
+        self._pending_watch.append((video_id, viewer_id, future))
+        self._schedule_flush()
+        await self._with_timeout(future, timeout)
+
+    async def add_tag(
+        self,
+        video_id: str,
+        tag: str,
+        timeout: Optional[float] = None
+    ) -> None:
+        future = asyncio.get_running_loop().create_future()
+        self._pending_tags.append((video_id, tag, future))
+        self._schedule_flush()
+        await self._with_timeout(future, timeout)
+
+    async def unit_of_work(
+        self,
+        build: Callable[[UnitOfWork], None],
+        timeout: Optional[float] = None
+    ) -> Dict[str, BulkOutcome]:
+        # Birim iş, adımları ve commit'iyle birlikte kilit altında tek seferde
+        # çalışır; adımlar arasında başka bir çağrı depoya dokunamaz.
+        def run() -> Dict[str, BulkOutcome]:
+            uow = self.service.unit_of_work()
+            try:
+                build(uow)
+            except BaseException:
+                uow.rollback()
+                raise
+            return uow.commit()
+
+        return await self._with_timeout(self._offload(run, (), {}), timeout)
+
+    def _schedule_flush(self) -> None:
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            asyncio.get_running_loop().call_soon(self._flush)
+
+    def _flush(self) -> None:
+        self._flush_scheduled = False
+        watch, self._pending_watch = self._pending_watch, []
+        tags, self._pending_tags = self._pending_tags, []
+
+        # Bekleyen çağrı iptal edildiyse toplu işleme hiç girmez.
+        queued = len(watch) + len(tags)
+        watch = [entry for entry in watch if not entry[2].cancelled()]
+        tags = [entry for entry in tags if not entry[2].cancelled()]
+        self.cancelled_calls += queued - len(watch) - len(tags)
+        if not watch and not tags:
+            return
+        task = asyncio.ensure_future(self._apply_batch(watch, tags))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _apply_batch(self, watch, tags) -> None:
+        def apply():
+            watched = self.service.mark_videos_watched(
+                (video_id, viewer_id) for video_id, viewer_id, _ in watch
+            ) if watch else {}
+            tagged = self.service.add_tags(
+                (video_id, tag) for video_id, tag, _ in tags
+            ) if tags else {}
+            return watched, tagged
+
+        self.batches += 1
+        self.batched_calls += len(watch) + len(tags)
+        try:
+            watched, tagged = await self._inline(apply, (), {})
+        except Exception as error:
+            for *_, future in watch + tags:
+                if not future.done():
+                    future.set_exception(error)
+            return
+
+        self._resolve(watch, watched)
+        self._resolve(tags, tagged)
+
+    @staticmethod
+    def _resolve(entries, outcomes: Dict[str, BulkOutcome]) -> None:
+        for video_id, _, future in entries:
+            if future.done():
+                continue
+            if outcomes.get(video_id) == BulkOutcome.NOT_FOUND:
+                future.set_exception(LookupError("Video yok"))
+            else:
+                future.set_result(None)
+
+    def metrics(self) -> dict:
+        return {
+            "inline_calls": self.inline_calls,
+            "offloaded_calls": self.offloaded_calls,
+            "batches": self.batches,
+            "batched_calls": self.batched_calls,
+            "cancelled_calls": self.cancelled_calls
+        }
+
+    def close(self) -> None:
+        if self._owns_executor:
+            self._executor.shutdown(wait=True)
+
+    async def __aenter__(self) -> "AsyncVideoService":
+        return self
+
+    async def aclose(self) -> None:
+        # Bekleyen toplu işlemler biter, havuz döngüyü bloklamadan kapanır.
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+
+def _public_methods(cls: type) -> frozenset:
+    return frozenset(
+        name for name in dir(cls)
+        if not name.startswith("_") and callable(getattr(cls, name))
+    )
+
+
+_stale = AsyncVideoService.OFFLOADED - _public_methods(VideoService)
+if _stale:
+    raise TypeError(f"VideoService'te olmayan metotlar: {sorted(_stale)}")
+
+AsyncVideoService.INLINE = (
+    _public_methods(VideoService)
+    - AsyncVideoService.OFFLOADED
+    - _public_methods(AsyncVideoService)
+)
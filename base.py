@@ -1,8 +1,12 @@
+import sys
 from abc import ABC, abstractmethod
 from datetime import datetime
-from typing import Optional
+from typing import Callable, List, Optional
 from uuid import uuid4
 from enum import Enum
+from operator import attrgetter, methodcaller
+
+from validation import Rule, register_rules, validators
 
 
 class VideoVisibility(Enum):  
@@ -18,6 +22,19 @@ class VideoStatus(Enum):
     BLOCKED = "blocked"
 
 
+class ChangeType(Enum):
+    CREATED = "created"
+    STATUS_CHANGED = "status_changed"
+    VISIBILITY_CHANGED = "visibility_changed"
+    TAG_ADDED = "tag_added"
+    TAG_REMOVED = "tag_removed"
+    TITLE_CHANGED = "title_changed"
+    STATS_DELTA = "stats_delta"
+    # İzleyici kimlikleri sayısal STATS_DELTA'dan ayrı taşınır.
+    VIEWERS_SEEN = "viewers_seen"
+    REMOVED = "removed"
+
+
 class VideoBase(ABC):
 
     @staticmethod
@@ -62,36 +79,96 @@ class VideoBase(ABC):
 
         self.metadata: dict[str, str] = {}
 
+        # Repository kaydederken değişiklik dinleyicisini buraya bağlar.
+        self._observer: Optional[Callable] = None
+
+    def __getstate__(self) -> dict:
+        # Dinleyici repository'ye bağlıdır; kopyalanan/taşınan videoya geçmez.
+        state = self.__dict__.copy()
+        state["_observer"] = None
+        return state
+
+    def intern_fields(self) -> None:
+        # Binlerce videoda tekrar eden kısa metinler tek nesneyi paylaşır.
+        self.channel_id = sys.intern(self.channel_id)
+        self.tags = [sys.intern(tag) for tag in self.tags]
+        self.flags = [sys.intern(flag) for flag in self.flags]
+        self.metadata = {
+            sys.intern(key): value for key, value in self.metadata.items()
+        }
+
+    def _notify(self, change_type: ChangeType, payload: dict) -> None:
+        if self._observer is not None:
+            self._observer(self, change_type, payload)
+
+    def _change_status(
+        self,
+        status: VideoStatus,
+        now: Optional[datetime] = None
+    ) -> None:
+        old_status = self.status
+        self.status = status
+        if now is not None:
+            self.updated_at = now
+        if old_status != status:
+            self._notify(
+                ChangeType.STATUS_CHANGED,
+                {"old": old_status, "new": status}
+            )
+
     def process(self) -> None:   
         if self.status == VideoStatus.UPLOADED:
-            self.status = VideoStatus.PROCESSING
-            self.updated_at = datetime.now()
+            self._change_status(VideoStatus.PROCESSING, datetime.now())
 
     def publish(self) -> None:    
         if self.status == VideoStatus.PROCESSING:
-            self.status = VideoStatus.PUBLISHED
-            self.updated_at = datetime.now()
+            self._change_status(VideoStatus.PUBLISHED, datetime.now())
 
     def unpublish(self) -> None:
         if self.status == VideoStatus.PUBLISHED:
-            self.status = VideoStatus.PROCESSING
-            self.updated_at = datetime.now()
+            self._change_status(VideoStatus.PROCESSING, datetime.now())
 
     def block(self) -> None:      
-        self.status = VideoStatus.BLOCKED
-        self.updated_at = datetime.now()
+        self._change_status(VideoStatus.BLOCKED, datetime.now())
 
     def change_visibility(self, visibility: VideoVisibility) -> None:
+        old_visibility = self.visibility
         self.visibility = visibility
         self.updated_at = datetime.now()
+        if old_visibility != visibility:
+            self._notify(
+                ChangeType.VISIBILITY_CHANGED,
+                {"old": old_visibility, "new": visibility}
+            )
 
-    def mark_watched(self) -> None:
+    def mark_watched(self, viewer_id: Optional[str] = None) -> None:
         self.last_watched_at = datetime.now()
         self.view_count += 1
+        self._notify(ChangeType.STATS_DELTA, {"views": 1})
+        if viewer_id is not None:
+            self._notify(ChangeType.VIEWERS_SEEN, {"viewer_ids": [viewer_id]})
+
+    def mark_watched_many(
+        self,
+        viewer_ids: List[Optional[str]],
+        now: Optional[datetime] = None
+    ) -> None:
+        if not viewer_ids:
+            return
+        self.last_watched_at = now or datetime.now()
+        self.view_count += len(viewer_ids)
+        self._notify(ChangeType.STATS_DELTA, {"views": len(viewer_ids)})
+        known = [viewer for viewer in viewer_ids if viewer is not None]
+        if known:
+            self._notify(ChangeType.VIEWERS_SEEN, {"viewer_ids": known})
 
     def add_watch_time(self, seconds: int) -> None:
         if seconds > 0:
             self.watch_time_seconds += seconds
+            self._notify(
+                ChangeType.STATS_DELTA,
+                {"watch_time_seconds": seconds}
+            )
 
     def enable_subtitles(self) -> None:
         self.has_subtitles = True
@@ -101,15 +178,18 @@ class VideoBase(ABC):
 
     def add_tag(self, tag: str) -> None:
         if tag not in self.tags:
+            tag = sys.intern(tag)
             self.tags.append(tag)
+            self._notify(ChangeType.TAG_ADDED, {"tag": tag})
 
     def remove_tag(self, tag: str) -> None:
         if tag in self.tags:
             self.tags.remove(tag)
+            self._notify(ChangeType.TAG_REMOVED, {"tag": tag})
 
     def add_flag(self, flag: str) -> None:
         if flag not in self.flags:
-            self.flags.append(flag)
+            self.flags.append(sys.intern(flag))
 
     def remove_flag(self, flag: str) -> None:
         if flag in self.flags:
@@ -119,6 +199,22 @@ class VideoBase(ABC):
         if 1 <= rating <= 5:
             self.rating_total += rating
             self.rating_count += 1
+            self._notify(
+                ChangeType.STATS_DELTA,
+                {"rating_total": rating, "rating_count": 1}
+            )
+
+    def add_ratings(self, ratings: List[int]) -> int:
+        valid = [rating for rating in ratings if 1 <= rating <= 5]
+        if valid:
+            total = sum(valid)
+            self.rating_total += total
+            self.rating_count += len(valid)
+            self._notify(
+                ChangeType.STATS_DELTA,
+                {"rating_total": total, "rating_count": len(valid)}
+            )
+        return len(valid)
 
     def average_rating(self) -> float:
         if self.rating_count == 0:
@@ -126,7 +222,7 @@ class VideoBase(ABC):
         return self.rating_total / self.rating_count
 
     def add_metadata(self, key: str, value: str) -> None:
-        self.metadata[key] = value
+        self.metadata[sys.intern(key)] = value
 
     def remove_metadata(self, key: str) -> None:
         if key in self.metadata:
@@ -154,19 +250,21 @@ class VideoBase(ABC):
         return self.status == VideoStatus.BLOCKED
 
     def is_valid(self) -> bool:
-        if not self.title:
-          return False
+        return validators.is_valid(self)
 
-        if self.get_video_type() != "LiveStreamVideo":
-          if self.duration_seconds <= 0:
-            return False
+    def validation_failures(self) -> list:
+        return validators.failures(self)
 
-        return self.validate_specific_rules()
+    def validate_duration(self) -> bool:
+        return self.duration_seconds > 0
 
 
     def update_title(self, title: str) -> None:
+        old = self.title
         self.title = title
         self.updated_at = datetime.now()
+        if old != title:
+            self._notify(ChangeType.TITLE_CHANGED, {"old": old, "new": title})
 
     def update_duration(self, seconds: int) -> None:
         if seconds > 0:
@@ -174,21 +272,30 @@ class VideoBase(ABC):
             self.updated_at = datetime.now()
 
     def reset_stats(self) -> None:
+        delta = {
+            "views": -self.view_count,
+            "watch_time_seconds": -self.watch_time_seconds,
+            "rating_total": -self.rating_total,
+            "rating_count": -self.rating_count
+        }
         self.view_count = 0
         self.watch_time_seconds = 0
         self.rating_total = 0
         self.rating_count = 0
+        self._notify(ChangeType.STATS_DELTA, delta)
 
     def increment_views(self, count: int = 1) -> None:
         if count > 0:
             self.view_count += count
             self.updated_at = datetime.now()
+            self._notify(ChangeType.STATS_DELTA, {"views": count})
     
     def increment_shares(self, count: int = 1) -> None:
         if count > 0:
             self.metadata["shares"] = str(
             int(self.metadata.get("shares", "0")) + count
         )
+            self._notify(ChangeType.STATS_DELTA, {"shares": count})
         self.updated_at = datetime.now()
 
 
@@ -222,3 +329,20 @@ class VideoBase(ABC):
     def validate_specific_rules(self) -> bool:
         pass
 
+
+# Kendi kuralını kaydetmeyen alt sınıflar da eski is_valid davranışını
+# korur: süre kontrolü ve sınıfın validate_specific_rules'ı.
+register_rules(
+    VideoBase,
+    Rule("title", attrgetter("title"), "Başlık boş olamaz"),
+    Rule(
+        "duration",
+        methodcaller("validate_duration"),
+        "Süre sıfırdan büyük olmalı"
+    ),
+    Rule(
+        "specific_rules",
+        methodcaller("validate_specific_rules"),
+        "Videoya özgü kurallar sağlanmıyor"
+    )
+)
@@ -0,0 +1,401 @@
+import asyncio
+import os
+import threading
+from datetime import datetime, timedelta
+from random import Random
+from time import perf_counter
+
+from admission import AdmissionController, AdmissionRejected
+from async_service import AsyncVideoService
+from base import VideoStatus, VideoVisibility
+from events import ChangeLog
+from implementations import LiveStreamVideo, StandardVideo
+from scheduler import ManualClock, StreamScheduler
+from server import AsyncVideoClient, VideoHttpServer
+from related import RelatedIndex
+from repository import VideoRepository
+from services import VideoService
+from sketches import HeavyHitters, HyperLogLog
+from validation import validate_parallel, validate_stream
+from workload import ReplayDriver, generate_demo_mix, percentile
+from sharding import ShardedVideoService
+
+
+def print_header(title):
+    print("\n" + "=" * 40)
+    print(title)
+    print("=" * 40)
+
+
+def make_videos(count, channels=64):
+    return [
+        StandardVideo(
+            channel_id=f"channel_{i % channels}",
+            title=f"Bench Video {i}",
+            duration_seconds=120 + i % 600,
+            visibility=VideoVisibility.PUBLIC
+        )
+        for i in range(count)
+    ]
+
+
+def bench_sharding(video_count=20000, shard_counts=(1, 2, 4, 8), rounds=20):
+    print_header("SHARDING THROUGHPUT")
+    print(f"{'shards':>6} {'upload/s':>12} {'scatter q/s':>12} {'point q/s':>12}")
+
+    for shard_count in shard_counts:
+        videos = make_videos(video_count)
+        with ShardedVideoService(shard_count) as service:
+            started = perf_counter()
+            service.upload_many(videos)
+            upload_rate = video_count / (perf_counter() - started)
+
+            started = perf_counter()
+            for _ in range(rounds):
+                service.count_by_status()
+                service.list_by_status(VideoStatus.BLOCKED)
+                service.paginate(3, 50)
+            scatter_rate = rounds * 3 / (perf_counter() - started)
+
+            started = perf_counter()
+            for video in videos[:2000]:
+                service.add_tag(video.video_id, "bench")
+            point_rate = 2000 / (perf_counter() - started)
+
+        print(
+            f"{shard_count:>6} {upload_rate:>12.0f} "
+            f"{scatter_rate:>12.1f} {point_rate:>12.0f}"
+        )
+
+
+def bench_scheduler(stream_count=200000, step_minutes=5):
+    print_header("STREAM SCHEDULER")
+    clock = ManualClock(datetime(2026, 1, 1))
+    scheduler = StreamScheduler(clock=clock, batch_size=5000)
+    streams = [
+        LiveStreamVideo(
+            channel_id=f"live_{i % 100}",
+            title=f"Stream {i}",
+            scheduled_time=clock.now + timedelta(seconds=(i * 7919) % 86400)
+        )
+        for i in range(stream_count)
+    ]
+
+    started = perf_counter()
+    for video in streams:
+        scheduler.schedule(video)
+    print(f"schedule: {stream_count / (perf_counter() - started):.0f}/s")
+
+    started = perf_counter()
+    fired = 0
+    for _ in range(24 * 60 // step_minutes):
+        clock.advance(timedelta(minutes=step_minutes))
+        fired += len(scheduler.run_pending())
+    print(f"fired {fired} streams: {fired / (perf_counter() - started):.0f}/s")
+
+
+def bench_sketches(views=200000, viewers=50000, tags=500):
+    print_header("SKETCHES VS EXACT")
+    rng = Random(42)
+    events = [
+        (
+            f"viewer_{rng.randrange(viewers)}",
+            f"tag_{int(rng.paretovariate(1.1)) % tags}"
+        )
+        for _ in range(views)
+    ]
+
+    started = perf_counter()
+    exact_viewers = set()
+    exact_tags = {}
+    for viewer, tag in events:
+        exact_viewers.add(viewer)
+        exact_tags[tag] = exact_tags.get(tag, 0) + 1
+    exact_time = perf_counter() - started
+
+    started = perf_counter()
+    hll = HyperLogLog(12)
+    hitters = HeavyHitters(10)
+    for viewer, tag in events:
+        hll.add(viewer)
+        hitters.add(tag)
+    sketch_time = perf_counter() - started
+
+    estimate = hll.count()
+    error = abs(estimate - len(exact_viewers)) / len(exact_viewers)
+    top_exact = sorted(exact_tags, key=exact_tags.get, reverse=True)[:10]
+    top_sketch = [tag for tag, _ in hitters.top(10)]
+    recall = len(set(top_exact) & set(top_sketch)) / 10
+
+    print(f"distinct: exact={len(exact_viewers)} hll={estimate} error={error:.2%}")
+    print(f"top-10 tag recall: {recall:.0%}")
+    print(f"exact: {views / exact_time:.0f}/s, sketch: {views / sketch_time:.0f}/s")
+    print(f"memory: hll={hll.memory_bytes()}B cms={hitters.sketch.memory_bytes()}B")
+
+
+def bench_replay(requests=50000, target_qps=20000, workers=8):
+    print_header("DEMO MIX REPLAY")
+    service = VideoService(VideoRepository())
+    report = ReplayDriver(service, target_qps, workers).run(
+        generate_demo_mix(requests, seed=1)
+    )
+    print(report)
+    for op in sorted(report.latencies):
+        summary = report.summary(op)
+        print(
+            f"{op:>22} n={summary['requests']:>6} "
+            f"p50={summary['p50_ms']:.3f}ms p99={summary['p99_ms']:.3f}ms "
+            f"errors={summary['errors']}"
+        )
+
+
+def bench_server(video_count=5000, clients=32, requests_per_client=200):
+    print_header("HTTP SERVER (LOCALHOST)")
+    repository = VideoRepository()
+    service = VideoService(repository)
+    videos = make_videos(video_count)
+    for video in videos:
+        service.upload_video(video)
+
+    async def run():
+        server = VideoHttpServer(service, port=0)
+        await server.start()
+        pool = [AsyncVideoClient(port=server.port) for _ in range(clients)]
+
+        async def point_load(client, offset):
+            for i in range(requests_per_client):
+                video = videos[(offset * requests_per_client + i) % video_count]
+                await client.post_json(f"/videos/{video.video_id}/watch")
+
+        started = perf_counter()
+        await asyncio.gather(*(point_load(c, i) for i, c in enumerate(pool)))
+        point_rate = clients * requests_per_client / (perf_counter() - started)
+
+        started = perf_counter()
+        await asyncio.gather(*(c.get_lines("/videos/sorted?by=title") for c in pool))
+        scan_time = perf_counter() - started
+
+        for client in pool:
+            await client.close()
+        await server.stop()
+        print(f"point requests: {point_rate:.0f}/s")
+        print(
+            f"{clients} concurrent sorted scans of {video_count}: "
+            f"{scan_time * 1000:.0f}ms (coalesced {server.coalesced})"
+        )
+
+    asyncio.run(run())
+
+
+def bench_async_service(video_count=5000, calls=50000, scans=20):
+    print_header("ASYNC FACADE BATCHING")
+    service = VideoService(VideoRepository())
+    videos = make_videos(video_count)
+    for video in videos:
+        service.upload_video(video)
+        service.process_and_publish(video.video_id)
+
+    async def run():
+        async with AsyncVideoService(service) as facade:
+            started = perf_counter()
+            scan_tasks = [
+                asyncio.ensure_future(facade.sort_by_title())
+                for _ in range(scans)
+            ]
+            await asyncio.gather(*(
+                facade.mark_video_watched(
+                    videos[i % video_count].video_id, f"viewer_{i}"
+                )
+                for i in range(calls)
+            ))
+            watch_time = perf_counter() - started
+            await asyncio.gather(*scan_tasks)
+            metrics = facade.metrics()
+
+        print(
+            f"{calls} watches in {watch_time * 1000:.0f}ms "
+            f"({calls / watch_time:.0f}/s) over {metrics['batches']} batches"
+        )
+        print(
+            f"{scans} sorted scans offloaded, "
+            f"{metrics['inline_calls']} inline calls"
+        )
+
+    asyncio.run(run())
+
+
+def bench_validation(video_count=400000, workers=None):
+    print_header("CATALOG VALIDATION")
+    videos = make_videos(video_count)
+    for i in range(0, video_count, 7):
+        videos[i].title = ""
+
+    started = perf_counter()
+    legacy = sum(1 for video in videos if not video.is_valid())
+    legacy_time = perf_counter() - started
+
+    started = perf_counter()
+    streamed = sum(1 for result in validate_stream(videos) if not result.ok)
+    stream_time = perf_counter() - started
+
+    started = perf_counter()
+    parallel = sum(
+        1 for result in validate_parallel(videos, workers) if not result.ok
+    )
+    parallel_time = perf_counter() - started
+
+    print(f"is_valid loop:      {legacy_time * 1000:.0f}ms ({legacy} invalid)")
+    print(f"validate_stream:    {stream_time * 1000:.0f}ms ({streamed} invalid)")
+    print(
+        f"validate_parallel:  {parallel_time * 1000:.0f}ms "
+        f"({parallel} invalid, {workers or os.cpu_count()} workers)"
+    )
+
+
+def bench_related(video_count=20000, vocabulary=400, lookups=2000):
+    print_header("RELATED VIDEOS")
+    rng = Random(7)
+    repository = VideoRepository()
+    service = VideoService(repository)
+    videos = make_videos(video_count)
+    for video in videos:
+        words = [f"w{rng.randrange(vocabulary)}" for _ in range(3)]
+        video.update_title(" ".join(words))
+        for _ in range(3):
+            video.add_tag(f"tag_{int(rng.paretovariate(1.2)) % vocabulary}")
+        service.upload_video(video)
+        service.process_and_publish(video.video_id)
+
+    index = RelatedIndex()
+    started = perf_counter()
+    index.attach(repository)
+    build_time = perf_counter() - started
+
+    sample = [rng.choice(videos).video_id for _ in range(lookups)]
+    started = perf_counter()
+    for video_id in sample:
+        index.related(video_id, 10)
+    indexed = (perf_counter() - started) / lookups
+
+    def brute_force(video_id):
+        target = set(repository.find_by_id(video_id).tags)
+        return sorted(
+            (
+                (len(target.intersection(video.tags)), video.video_id)
+                for video in repository.find_all()
+                if video.video_id != video_id
+            ),
+            reverse=True
+        )[:10]
+
+    started = perf_counter()
+    for video_id in sample[:50]:
+        brute_force(video_id)
+    scan = (perf_counter() - started) / 50
+
+    started = perf_counter()
+    for video in videos[:1000]:
+        video.add_tag("incremental")
+    update = (perf_counter() - started) / 1000
+
+    print(f"build over {video_count}: {build_time * 1000:.0f}ms")
+    print(f"related(k=10): {indexed * 1e6:.1f}us vs full scan {scan * 1000:.1f}ms")
+    print(f"incremental add_tag: {update * 1e6:.0f}us")
+
+
+def bench_unit_of_work(video_count=20000):
+    print_header("UNIT OF WORK")
+
+    def run(batched):
+        service = VideoService(VideoRepository(), change_log=ChangeLog())
+        videos = make_videos(video_count)
+        started = perf_counter()
+        if batched:
+            with service.unit_of_work() as uow:
+                for video in videos:
+                    uow.upload_video(video)
+                    uow.add_tag(video.video_id, "bench")
+                    uow.process_and_publish(video.video_id)
+                    uow.change_visibility(
+                        video.video_id, VideoVisibility.UNLISTED
+                    )
+        else:
+            for video in videos:
+                service.upload_video(video)
+                service.add_tag(video.video_id, "bench")
+                service.process_and_publish(video.video_id)
+                service.change_visibility(
+                    video.video_id, VideoVisibility.UNLISTED
+                )
+        return perf_counter() - started
+
+    single = run(False)
+    batched = run(True)
+    print(f"separate calls: {single * 1000:.0f}ms")
+    print(f"unit of work:   {batched * 1000:.0f}ms ({single / batched:.1f}x)")
+
+
+def bench_admission(video_count=50000, point_calls=5000, scanners=4):
+    print_header("ADMISSION CONTROL (MIXED LOAD)")
+    videos = make_videos(video_count)
+
+    def run(admission):
+        service = VideoService(VideoRepository(), admission=admission)
+        for video in videos:
+            service.upload_video(video)
+            service.process_and_publish(video.video_id)
+
+        stop = threading.Event()
+        shed = [0]
+
+        def scanner():
+            while not stop.is_set():
+                try:
+                    service.sort_by_updated(reverse=True)
+                except AdmissionRejected:
+                    shed[0] += 1
+                    stop.wait(0.01)
+
+        threads = [threading.Thread(target=scanner) for _ in range(scanners)]
+        for thread in threads:
+            thread.start()
+        latencies = []
+        for i in range(point_calls):
+            started = perf_counter()
+            service.mark_video_watched(videos[i % video_count].video_id)
+            latencies.append(perf_counter() - started)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        latencies.sort()
+        return latencies, shed[0]
+
+    for label, admission in (
+        ("no admission", None),
+        ("admission", AdmissionController(
+            expensive_limit=1, expensive_queue=0, max_cost=200000
+        ))
+    ):
+        latencies, shed = run(admission)
+        print(
+            f"{label:>13}: point p50={percentile(latencies, 0.5) * 1e6:.0f}us "
+            f"p99={percentile(latencies, 0.99) * 1e6:.0f}us "
+            f"p999={percentile(latencies, 0.999) * 1e6:.0f}us shed={shed}"
+        )
+
+
+def main():
+    bench_sharding()
+    bench_scheduler()
+    bench_sketches()
+    bench_replay()
+    bench_server()
+    bench_async_service()
+    bench_validation()
+    bench_related()
+    bench_unit_of_work()
+    bench_admission()
+
+
+if __name__ == "__main__":
+    main()
@@ -88,17 +88,21 @@ def simulate_watching(service, videos):
 
 
 def simulate_visibility_changes(service, videos):
-    for i, v in enumerate(videos):
-        if i % 3 == 0:
-            service.change_visibility(v.video_id, VideoVisibility.PRIVATE)
-        elif i % 3 == 1:
-            service.change_visibility(v.video_id, VideoVisibility.UNLISTED)
+    service.set_visibility_many(
+        [v.video_id for i, v in enumerate(videos) if i % 3 == 0],
+        VideoVisibility.PRIVATE
+    )
+    service.set_visibility_many(
+        [v.video_id for i, v in enumerate(videos) if i % 3 == 1],
+        VideoVisibility.UNLISTED
+    )
 
 
 def simulate_blocking(service, videos):
-    for i, v in enumerate(videos):
-        if i % 5 == 0:
-            service.block_video(v.video_id)
+    service.transition_many(
+        [v.video_id for i, v in enumerate(videos) if i % 5 == 0],
+        VideoStatus.BLOCKED
+    )
 
 
 def main():
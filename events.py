@@ -0,0 +1,309 @@
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from base import ChangeType, VideoBase
+
+
+class ChangeEvent:
+    __slots__ = (
+        "seq",
+        "change_type",
+        "video_id",
+        "channel_id",
+        "video_type",
+        "timestamp",
+        "payload"
+    )
+
+    def __init__(
+        self,
+        seq: int,
+        change_type: ChangeType,
+        video_id: str,
+        channel_id: str,
+        video_type: str,
+        timestamp: datetime,
+        payload: dict
+    ):
+        self.seq = seq
+        self.change_type = change_type
+        self.video_id = video_id
+        self.channel_id = channel_id
+        self.video_type = video_type
+        self.timestamp = timestamp
+        self.payload = payload
+
+    def to_dict(self) -> dict:
+        return {
+            "seq": self.seq,
+            "type": self.change_type.value,
+            "video_id": self.video_id,
+            "channel_id": self.channel_id,
+            "video_type": self.video_type,
+            "timestamp": self.timestamp,
+            "payload": self.payload
+        }
+
+    def __repr__(self) -> str:
+        return (
+            f"<ChangeEvent #{self.seq} | "
+            f"{self.change_type.value} | "
+            f"id={self.video_id}>"
+        )
+
+
+class Subscription:
+
+    def __init__(self, log: "ChangeLog", name: str, offset: int):
+        self.log = log
+        self.name = name
+        self.offset = offset   # okunacak bir sonraki sıra numarası
+        self.missed = 0        # tampon taştığı için kaçırılan olaylar
+
+    def poll(
+        self,
+        max_items: int = 100,
+        timeout: Optional[float] = None
+    ) -> List[ChangeEvent]:
+        return self.log.read(self, max_items, timeout)
+
+    def batches(self, batch_size: int = 100):
+        while True:
+            batch = self.poll(batch_size)
+            if not batch:
+                return
+            yield batch
+
+    def lag(self) -> int:
+        return self.log.last_seq - self.offset + 1
+
+    def __repr__(self) -> str:
+        return f"<Subscription {self.name} | offset={self.offset}>"
+
+
+class ChangeLog:
+    # Sabit boyutlu halka tampon. Tampon dolduğunda block_timeout None ise
+    # en eski olay ezilir (geride kalan aboneler `missed` ile bunu görür),
+    # aksi halde yazar en yavaş abone ilerleyene kadar bekler. Değişikliği
+    # yapmadan önce yer ayıran (reserve) yazar hiç beklemez; ayrılmamış
+    # yazım, olay modelde oluştuktan sonra BufferError ile düşebilir.
+
+    def __init__(
+        self,
+        capacity: int = 65536,
+        block_timeout: Optional[float] = None
+    ):
+        if capacity < 1:
+            raise ValueError("Geçersiz kapasite")
+        self.capacity = capacity
+        self.block_timeout = block_timeout
+        self._buffer: List[Optional[ChangeEvent]] = [None] * capacity
+        self._next_seq = 1
+        self._subscribers: Dict[str, Subscription] = {}
+        self._cond = threading.Condition()
+        self._pending: Dict[int, list] = {}
+        self._reserved = 0
+        self._credits: Dict[int, int] = {}
+
+    @property
+    def last_seq(self) -> int:
+        return self._next_seq - 1
+
+    @property
+    def first_seq(self) -> int:
+        return max(1, self._next_seq - self.capacity)
+
+    def record(
+        self,
+        video: VideoBase,
+        change_type: ChangeType,
+        payload: dict
+    ) -> Optional[ChangeEvent]:
+        return self.append(
+            change_type,
+            video.video_id,
+            video.channel_id,
+            video.get_video_type(),
+            payload
+        )
+
+    def append(
+        self,
+        change_type: ChangeType,
+        video_id: str,
+        channel_id: str,
+        video_type: str,
+        payload: Optional[dict] = None
+    ) -> Optional[ChangeEvent]:
+        pending = self._pending.get(threading.get_ident())
+        if pending is not None:
+            pending.append(
+                (change_type, video_id, channel_id, video_type, payload)
+            )
+            return None
+
+        with self._cond:
+            event = self._insert(
+                change_type,
+                video_id,
+                channel_id,
+                video_type,
+                datetime.now(),
+                payload
+            )
+            self._cond.notify_all()
+            return event
+
+    def _insert(
+        self,
+        change_type: ChangeType,
+        video_id: str,
+        channel_id: str,
+        video_type: str,
+        timestamp: datetime,
+        payload: Optional[dict]
+    ) -> ChangeEvent:
+        ident = threading.get_ident()
+        credits = self._credits.get(ident)
+        if credits:
+            self._credits[ident] = credits - 1
+            self._reserved -= 1
+        elif self.block_timeout is not None and self._is_full():
+            if not self._cond.wait_for(
+                lambda: not self._is_full(),
+                self.block_timeout
+            ):
+                raise BufferError("Olay tamponu dolu")
+
+        event = ChangeEvent(
+            self._next_seq,
+            change_type,
+            video_id,
+            channel_id,
+            video_type,
+            timestamp,
+            payload or {}
+        )
+        self._buffer[event.seq % self.capacity] = event
+        self._next_seq += 1
+        return event
+
+    @contextmanager
+    def reserve(self, count: int):
+        # Blok içinde bu iş parçacığının yazacağı en fazla `count` olay için
+        # önceden yer ayrılır; yer yoksa hiçbir şey değişmeden BufferError
+        # fırlatılır. Kullanılmayan yer çıkışta geri verilir.
+        if self.block_timeout is None or count <= 0:
+            yield
+            return
+        ident = threading.get_ident()
+        with self._cond:
+            if not self._cond.wait_for(
+                lambda: self._has_room(count),
+                self.block_timeout
+            ):
+                raise BufferError("Olay tamponu dolu")
+            outer = self._credits.get(ident, 0)
+            self._credits[ident] = outer + count
+            self._reserved += count
+        try:
+            yield
+        finally:
+            with self._cond:
+                left = self._credits.pop(ident)
+                if outer:
+                    self._credits[ident] = min(left, outer)
+                self._reserved -= max(0, left - outer)
+                self._cond.notify_all()
+
+    @contextmanager
+    def batch(self):
+        # Blok içinde bu iş parçacığından gelen olaylar biriktirilir ve çıkışta
+        # tek kilit altında, aynı zaman damgasıyla ardışık yazılır. Blok hata
+        # verse de biriken olaylar yazılır: bunlar zaten uygulanmış
+        # değişikliklerdir. Tamponda yer olduğunu garanti etmek için
+        # değişiklikten önce reserve kullanılır.
+        ident = threading.get_ident()
+        if ident in self._pending:
+            yield
+            return
+        pending = self._pending[ident] = []
+        try:
+            yield
+        finally:
+            del self._pending[ident]
+            if pending:
+                self._write(pending)
+
+    def _write(self, pending: list) -> None:
+        timestamp = datetime.now()
+        with self._cond:
+            try:
+                for record in pending:
+                    self._insert(*record[:4], timestamp, record[4])
+            finally:
+                self._cond.notify_all()
+
+    def subscribe(
+        self,
+        name: str,
+        from_seq: Optional[int] = None
+    ) -> Subscription:
+        with self._cond:
+            if name in self._subscribers:
+                return self._subscribers[name]
+            offset = self._next_seq if from_seq is None else from_seq
+            subscription = Subscription(self, name, offset)
+            self._subscribers[name] = subscription
+            return subscription
+
+    def unsubscribe(self, name: str) -> None:
+        with self._cond:
+            self._subscribers.pop(name, None)
+            self._cond.notify_all()
+
+    def read(
+        self,
+        subscription: Subscription,
+        max_items: int = 100,
+        timeout: Optional[float] = None
+    ) -> List[ChangeEvent]:
+        with self._cond:
+            if timeout is not None and subscription.offset >= self._next_seq:
+                self._cond.wait_for(
+                    lambda: subscription.offset < self._next_seq,
+                    timeout
+                )
+
+            first = self.first_seq
+            if subscription.offset < first:
+                subscription.missed += first - subscription.offset
+                subscription.offset = first
+
+            end = min(self._next_seq, subscription.offset + max_items)
+            batch = [
+                self._buffer[seq % self.capacity]
+                for seq in range(subscription.offset, end)
+            ]
+            subscription.offset = end
+            self._cond.notify_all()
+            return batch
+
+    def subscribers(self) -> List[Subscription]:
+        return list(self._subscribers.values())
+
+    def _has_room(self, count: int) -> bool:
+        # Başka yazarların ayırdığı yer de dolu sayılır.
+        if not self._subscribers:
+            return True
+        slowest = min(s.offset for s in self._subscribers.values())
+        used = self._next_seq - slowest + self._reserved
+        return used + count <= self.capacity
+
+    def _is_full(self) -> bool:
+        return not self._has_room(1)
+
+    def __len__(self):
+        return self._next_seq - self.first_seq
@@ -1,13 +1,16 @@
 
 
 from datetime import datetime
+from operator import methodcaller
 from typing import Optional, List
 
 from base import (
+     ChangeType,
      VideoBase,
      VideoStatus,
      VideoVisibility
 )
+from validation import Rule, register_rules
 
 class StandardVideo(VideoBase): # Klasik, önceden kaydedilmiş videolar.
 
@@ -44,8 +47,8 @@ class StandardVideo(VideoBase): # Klasik, önceden kaydedilmiş videolar.
     def validate_specific_rules(self) -> bool:
         return self.duration_seconds >= 60
 
-    def mark_watched(self) -> None:
-        super().mark_watched()
+    def mark_watched(self, viewer_id: Optional[str] = None) -> None:
+        super().mark_watched(viewer_id)
 
     def enable_subtitles(self) -> None:
         self.has_subtitles = True
@@ -88,18 +91,24 @@ class LiveStreamVideo(VideoBase): # Canlı yayın videoları.
     def validate_specific_rules(self) -> bool:
         return self.scheduled_time is not None
 
-    def start_stream(self) -> None:
+    def start_stream(self, now: Optional[datetime] = None) -> None:
         if not self.is_live:
+            now = now or datetime.now()
             self.is_live = True
-            self.started_at = datetime.now()
-            self.status = VideoStatus.PUBLISHED
+            self.started_at = now
+            self._change_status(VideoStatus.PUBLISHED, now)
 
-    def end_stream(self, final_duration: int) -> None:
+    def end_stream(
+        self,
+        final_duration: int,
+        now: Optional[datetime] = None
+    ) -> None:
         if self.is_live:
+            now = now or datetime.now()
             self.is_live = False
-            self.ended_at = datetime.now()
+            self.ended_at = now
             self.duration_seconds = final_duration
-            self.status = VideoStatus.PROCESSING
+            self._change_status(VideoStatus.PROCESSING, now)
 
     def is_scheduled(self) -> bool:
         return self.scheduled_time is not None
@@ -144,6 +153,7 @@ class ShortVideo(VideoBase): # Shorts videolar.
 
     def increment_loop(self) -> None:
         self.loop_count += 1
+        self._notify(ChangeType.STATS_DELTA, {"loops": 1})
 
     def uses_music(self) -> bool:
         return self.music_used
@@ -153,8 +163,36 @@ class ShortVideo(VideoBase): # Shorts videolar.
 
     @staticmethod
     def validate_all_videos(videos: List[VideoBase]) -> List[VideoBase]:
-        valid_videos = []
-        for video in videos:
-            if video.validate_duration():
-                valid_videos.append(video)
-        return valid_videos
\ No newline at end of file
+        return [video for video in videos if video.validate_duration()]
+
+
+# Kontroller metodu isimle çağırır: kuralı kaydetmeyen alt sınıfın ezdiği
+# metot da çalışır ve methodcaller süreç havuzuna pickle ile taşınabilir.
+register_rules(
+    StandardVideo,
+    Rule(
+        "min_duration",
+        methodcaller("validate_specific_rules"),
+        "Standart video en az 60 saniye olmalı",
+        replaces=("specific_rules",)
+    )
+)
+register_rules(
+    LiveStreamVideo,
+    Rule(
+        "scheduled_time",
+        methodcaller("validate_specific_rules"),
+        "Canlı yayın için planlanan zaman gerekli",
+        # Canlı yayının süresi yayın bitene kadar sıfırdır.
+        replaces=("duration", "specific_rules")
+    )
+)
+register_rules(
+    ShortVideo,
+    Rule(
+        "duration",
+        methodcaller("validate_duration"),
+        f"Short video 1-{ShortVideo.MAX_DURATION} saniye arasında olmalı",
+        replaces=("specific_rules",)
+    )
+)
\ No newline at end of file
@@ -0,0 +1,52 @@
+from bisect import bisect_left, insort
+from typing import Dict, List, Optional, Tuple
+
+
+class Leaderboard:
+    # Negatif skora göre sıralı liste; kapasite dolunca en düşük skor düşer.
+    # Trend tabloları ve benzer video komşulukları aynı yapıyı kullanır.
+    __slots__ = ("capacity", "entries", "members")
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.entries: List[Tuple[float, str]] = []
+        self.members: Dict[str, float] = {}
+
+    @property
+    def full(self) -> bool:
+        return len(self.entries) >= self.capacity
+
+    def offer(self, video_id: str, score: float) -> Optional[str]:
+        # Tablodan çıkan id döner: düşen en düşük kayıt ya da kabul
+        # edilmeyen id'nin kendisi. Çıkan yoksa None.
+        old = self.members.get(video_id)
+        if old is not None:
+            self._discard(video_id, old)
+        elif self.full and score <= -self.entries[-1][0]:
+            return video_id
+
+        insort(self.entries, (-score, video_id))
+        self.members[video_id] = score
+        if len(self.entries) > self.capacity:
+            _, dropped = self.entries.pop()
+            del self.members[dropped]
+            return dropped
+        return None
+
+    def remove(self, video_id: str) -> bool:
+        score = self.members.pop(video_id, None)
+        if score is None:
+            return False
+        self._discard(video_id, score)
+        return True
+
+    def _discard(self, video_id: str, score: float) -> None:
+        index = bisect_left(self.entries, (-score, video_id))
+        del self.entries[index]
+
+    def rescale(self, factor: float) -> None:
+        self.entries = [(score * factor, vid) for score, vid in self.entries]
+        self.members = {vid: s * factor for vid, s in self.members.items()}
+
+    def __len__(self):
+        return len(self.entries)
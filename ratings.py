@@ -0,0 +1,91 @@
+from bisect import bisect_left, insort
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from base import ChangeType, VideoBase
+from repository import VideoRepository
+
+
+class RatingIndex:
+    # Bayes ortalaması: (C * m + toplam) / (C + adet). Önsel ortalama sabit
+    # tutulur; böylece bir puan yalnızca kendi videosunun sırasını değiştirir.
+
+    def __init__(self, prior_mean: float = 3.0, prior_weight: int = 5):
+        self.prior_mean = prior_mean
+        self.prior_weight = prior_weight
+        self._entries: Dict[str, Tuple[float, int, str]] = {}
+        self._global: List[Tuple[float, str]] = []
+        self._channels: Dict[str, List[Tuple[float, str]]] = defaultdict(list)
+
+    def attach(self, repository: VideoRepository) -> None:
+        for video in repository.find_all():
+            self.update(video)
+        repository.add_listener(self._on_change)
+
+    def detach(self, repository: VideoRepository) -> None:
+        repository.remove_listener(self._on_change)
+
+    def _on_change(
+        self,
+        video: VideoBase,
+        change_type: ChangeType,
+        payload: dict
+    ) -> None:
+        if change_type == ChangeType.STATS_DELTA:
+            if "rating_count" in payload:
+                self.update(video)
+        elif change_type == ChangeType.REMOVED:
+            self.discard(video.video_id)
+
+    def smoothed(self, rating_total: int, rating_count: int) -> float:
+        return (
+            (self.prior_weight * self.prior_mean + rating_total)
+            / (self.prior_weight + rating_count)
+        )
+
+    def update(self, video: VideoBase) -> None:
+        self.discard(video.video_id)
+        if video.rating_count == 0:
+            return
+
+        score = self.smoothed(video.rating_total, video.rating_count)
+        self._entries[video.video_id] = (
+            score, video.rating_count, video.channel_id
+        )
+        insort(self._global, (-score, video.video_id))
+        insort(self._channels[video.channel_id], (-score, video.video_id))
+
+    def discard(self, video_id: str) -> None:
+        entry = self._entries.pop(video_id, None)
+        if entry is None:
+            return
+        score, _, channel_id = entry
+        key = (-score, video_id)
+        del self._global[bisect_left(self._global, key)]
+
+        ranking = self._channels[channel_id]
+        del ranking[bisect_left(ranking, key)]
+        if not ranking:
+            del self._channels[channel_id]
+
+    def top_rated(
+        self,
+        k: int = 10,
+        channel_id: Optional[str] = None,
+        min_count: int = 1
+    ) -> List[Tuple[str, float]]:
+        if channel_id is None:
+            ranking = self._global
+        else:
+            ranking = self._channels.get(channel_id, [])
+
+        result = []
+        for score, video_id in ranking:
+            if len(result) >= k:
+                break
+            if self._entries[video_id][1] >= min_count:
+                result.append((video_id, -score))
+        return result
+
+    def __len__(self):
+        return len(self._entries)
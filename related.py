@@ -0,0 +1,255 @@
+import re
+from collections import defaultdict
+from hashlib import blake2b
+from itertools import islice
+from random import Random
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+
+from base import ChangeType, VideoBase, VideoStatus, VideoVisibility
+from leaderboard import Leaderboard
+from repository import VideoRepository
+
+
+_PRIME = (1 << 61) - 1
+_TOKEN = re.compile(r"\w+")
+
+
+class RelatedIndex:
+    # Her video için etiket ve başlık kelimelerinden MinHash imzası çıkarılır;
+    # imza bantlara bölünüp LSH kovalarına konur. Komşular yalnızca aynı
+    # kovayı paylaşan adaylar arasından, gerçek Jaccard benzerliği ve kanal
+    # bonusuyla seçilir ve video başına ilk N olarak saklanır. Görünürlük
+    # okurken süzülür, bu yüzden durum değişiklikleri yeniden hesap gerektirmez.
+
+    def __init__(
+        self,
+        capacity: int = 20,
+        num_perm: int = 64,
+        bands: int = 16,
+        channel_boost: float = 0.25,
+        max_candidates: int = 256,
+        max_cached_features: int = 100000,
+        seed: int = 1
+    ):
+        if num_perm % bands:
+            raise ValueError("Bant sayısı permütasyon sayısını bölmeli")
+        rng = Random(seed)
+        self._perms = [
+            (rng.randrange(1, _PRIME), rng.randrange(_PRIME))
+            for _ in range(num_perm)
+        ]
+        self.capacity = capacity
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.channel_boost = channel_boost
+        self.max_candidates = max_candidates
+        self.max_cached_features = max_cached_features
+        self._hash_cache: Dict[str, Tuple[int, ...]] = {}
+
+        self._features: Dict[str, FrozenSet[str]] = {}
+        self._channels: Dict[str, str] = {}
+        self._keys: Dict[str, List[tuple]] = {}
+        self._buckets: Dict[tuple, Dict[str, None]] = {}
+        self._neighbors: Dict[str, Leaderboard] = {}
+        self._referrers: Dict[str, Set[str]] = defaultdict(set)
+        self._visible: Set[str] = set()
+
+    def attach(self, repository: VideoRepository) -> None:
+        for video in repository.find_all():
+            self.update(video)
+        repository.add_listener(self._on_change)
+
+    def detach(self, repository: VideoRepository) -> None:
+        repository.remove_listener(self._on_change)
+
+    def _on_change(
+        self,
+        video: VideoBase,
+        change_type: ChangeType,
+        payload: dict
+    ) -> None:
+        if change_type in (
+            ChangeType.CREATED,
+            ChangeType.TAG_ADDED,
+            ChangeType.TAG_REMOVED,
+            ChangeType.TITLE_CHANGED
+        ):
+            self.update(video)
+        elif change_type in (
+            ChangeType.STATUS_CHANGED,
+            ChangeType.VISIBILITY_CHANGED
+        ):
+            self._refresh_visibility(video)
+        elif change_type == ChangeType.REMOVED:
+            self.forget(video.video_id)
+
+    @staticmethod
+    def features(video: VideoBase) -> FrozenSet[str]:
+        words = {
+            "w:" + token
+            for token in _TOKEN.findall(video.title.lower())
+            if len(token) > 1
+        }
+        return frozenset(words | {"t:" + tag.lower() for tag in video.tags})
+
+    def _feature_hashes(self, feature: str) -> Tuple[int, ...]:
+        # Etiket ve kelime sözlüğü küçük olduğundan her özelliğin permütasyon
+        # değerleri önbelleğe alınır; imza sütun bazında minimum olur.
+        hashes = self._hash_cache.get(feature)
+        if hashes is None:
+            h = int.from_bytes(
+                blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big"
+            )
+            hashes = tuple((a * h + b) % _PRIME for a, b in self._perms)
+            if len(self._hash_cache) >= self.max_cached_features:
+                self._hash_cache.clear()
+            self._hash_cache[feature] = hashes
+        return hashes
+
+    def signature(self, features: FrozenSet[str]) -> List[int]:
+        return list(map(min, zip(*map(self._feature_hashes, features))))
+
+    def _band_keys(self, signature: List[int]) -> List[tuple]:
+        rows = self.rows
+        return [
+            (band, tuple(signature[band * rows:(band + 1) * rows]))
+            for band in range(self.bands)
+        ]
+
+    def similarity(self, video_id: str, other_id: str) -> float:
+        a = self._features.get(video_id)
+        b = self._features.get(other_id)
+        if not a or not b:
+            return 0.0
+        shared = len(a & b)
+        if not shared:
+            return 0.0
+        score = shared / (len(a) + len(b) - shared)
+        if self._channels[video_id] == self._channels[other_id]:
+            score += self.channel_boost
+        return score
+
+    def _refresh_visibility(self, video: VideoBase) -> None:
+        if (
+            video.status == VideoStatus.PUBLISHED
+            and video.visibility == VideoVisibility.PUBLIC
+        ):
+            self._visible.add(video.video_id)
+        else:
+            self._visible.discard(video.video_id)
+
+    def _candidates(self, video_id: str) -> Set[str]:
+        # Kalabalık kovalarda yalnızca en son eklenenler aday olur; toplam
+        # aday sayısı sınırlı olduğu için maliyet katalog boyutundan
+        # bağımsızdır.
+        candidates: Set[str] = set()
+        for key in self._keys.get(video_id, ()):
+            room = self.max_candidates - len(candidates)
+            if room <= 0:
+                break
+            candidates.update(islice(reversed(self._buckets[key]), room))
+        candidates.discard(video_id)
+        return candidates
+
+    def _link(self, owner: str, other: str, score: float) -> None:
+        # _referrers[x], x'i komşu tablosunda tutan videolardır; tablodan
+        # düşen ya da hiç kabul edilmeyen id'ler buradan da silinir.
+        dropped = self._neighbors[owner].offer(other, score)
+        if dropped != other:
+            self._referrers[other].add(owner)
+        if dropped is not None:
+            self._unrefer(dropped, owner)
+
+    def _unrefer(self, video_id: str, owner: str) -> None:
+        referrers = self._referrers.get(video_id)
+        if referrers is not None:
+            referrers.discard(owner)
+            if not referrers:
+                del self._referrers[video_id]
+
+    def _refill(self, owner: str) -> None:
+        # Dolu bir tablodan komşu silinince yer, sahibin kendi kovalarındaki
+        # adaylardan doldurulur; aksi halde tablo bir sonraki güncellemeye
+        # kadar eksik kalırdı.
+        board = self._neighbors[owner]
+        for other in self._candidates(owner):
+            if other in board.members:
+                continue
+            score = self.similarity(owner, other)
+            if score > 0:
+                self._link(owner, other, score)
+
+    def _unlink(self, video_id: str) -> None:
+        for key in self._keys.pop(video_id, ()):
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.pop(video_id, None)
+                if not bucket:
+                    del self._buckets[key]
+
+        board = self._neighbors.pop(video_id, None)
+        if board is not None:
+            for other in board.members:
+                self._unrefer(other, video_id)
+
+        for referrer in self._referrers.pop(video_id, ()):
+            board = self._neighbors.get(referrer)
+            if board is None:
+                continue
+            was_full = board.full
+            if board.remove(video_id) and was_full:
+                self._refill(referrer)
+
+    def update(self, video: VideoBase) -> None:
+        # Değişen videonun eski kovaları ve komşulukları silinir, yeni imzayla
+        # yalnızca aday kovalar taranır. Maliyet kova boyutlarıyla sınırlıdır.
+        video_id = video.video_id
+        self._unlink(video_id)
+        self._refresh_visibility(video)
+        features = self.features(video)
+        self._features[video_id] = features
+        self._channels[video_id] = video.channel_id
+        if not features:
+            return
+
+        keys = self._keys[video_id] = self._band_keys(self.signature(features))
+        for key in keys:
+            self._buckets.setdefault(key, {})
+        candidates = self._candidates(video_id)
+        for key in keys:
+            self._buckets[key][video_id] = None
+
+        self._neighbors[video_id] = Leaderboard(self.capacity)
+        for other in candidates:
+            score = self.similarity(video_id, other)
+            if score <= 0:
+                continue
+            self._link(video_id, other, score)
+            self._link(other, video_id, score)
+
+    def forget(self, video_id: str) -> None:
+        self._unlink(video_id)
+        self._features.pop(video_id, None)
+        self._channels.pop(video_id, None)
+        self._visible.discard(video_id)
+
+    def related(self, video_id: str, k: int = 10) -> List[Tuple[str, float]]:
+        board = self._neighbors.get(video_id)
+        if board is None:
+            return []
+        result = []
+        for score, other in board.entries:
+            if other in self._visible:
+                result.append((other, -score))
+                if len(result) >= k:
+                    break
+        return result
+
+    def neighbors(self, video_id: str) -> Optional[List[Tuple[str, float]]]:
+        board = self._neighbors.get(video_id)
+        if board is None:
+            return None
+        return [(other, -score) for score, other in board.entries]
+
+    def __len__(self):
+        return len(self._features)
@@ -1,23 +1,241 @@
+import sys
 from datetime import datetime
-from typing import List, Optional, Dict
+from operator import itemgetter
+from typing import Callable, List, Optional, Dict, Set, Tuple
 from collections import defaultdict
-
-from base import VideoBase, VideoStatus, VideoVisibility
+from itertools import count
+
+from base import ChangeType, VideoBase, VideoStatus, VideoVisibility
+
+
+def _transition(video: VideoBase, status: VideoStatus, now: datetime) -> None:
+    # Hedef duruma videonun açık geçiş metotlarıyla gidilir; alt sınıfların
+    # ezdiği block/publish/unpublish kancaları toplu işlemde de çalışır.
+    if status == VideoStatus.BLOCKED:
+        video.block()
+    elif status == VideoStatus.PROCESSING:
+        if video.status == VideoStatus.PUBLISHED:
+            video.unpublish()
+        else:
+            video.process()
+    elif status == VideoStatus.PUBLISHED:
+        video.process()
+        video.publish()
+    else:
+        video._change_status(status, now)
+
+
+def _deep_size(obj, seen: set) -> int:
+    # Paylaşılan nesneler (interned metinler, enum'lar) yalnızca bir kez sayılır.
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            size += _deep_size(key, seen) + _deep_size(value, seen)
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        for item in obj:
+            size += _deep_size(item, seen)
+    return size
 
 
 class VideoRepository:
     def __init__(self):
         self._videos: Dict[str, VideoBase] = {}
+        self._listeners: List[Callable] = []
+
+        # İkincil indeksler yalnızca id tutar. Durum indeksinde değer, videonun
+        # o duruma girdiği zamandır. Kayıtlar genelde zaman sırasıyla gelir;
+        # eski zaman damgalı bir kayıt eklenen kova sırasız işaretlenir ve
+        # status_entries() okumadan önce bir kez sıralar.
+        self._by_status: Dict[VideoStatus, Dict[str, datetime]] = {
+            status: {} for status in VideoStatus
+        }
+        self._unsorted_status: Set[VideoStatus] = set()
+        self._latest_entry: Dict[VideoStatus, datetime] = {}
+        self._by_visibility: Dict[VideoVisibility, Dict[str, None]] = {
+            visibility: {} for visibility in VideoVisibility
+        }
+        self._by_channel: Dict[str, Dict[str, None]] = defaultdict(dict)
+        # İndeks sırası giriş sırasıdır; sorgular videoları depoya ilk
+        # eklendikleri sırayla döndürsün diye her id'nin sırası tutulur.
+        self._order: Dict[str, int] = {}
+        self._positions = count()
+
+    def add_listener(self, listener: Callable) -> None:
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _on_video_change(
+        self,
+        video: VideoBase,
+        change_type: ChangeType,
+        payload: dict
+    ) -> None:
+        if change_type == ChangeType.STATUS_CHANGED:
+            self._by_status[payload["old"]].pop(video.video_id, None)
+            self._enter_status(
+                payload["new"],
+                video.video_id,
+                video.updated_at or datetime.now()
+            )
+        elif change_type == ChangeType.VISIBILITY_CHANGED:
+            self._by_visibility[payload["old"]].pop(video.video_id, None)
+            self._by_visibility[payload["new"]][video.video_id] = None
+
+        for listener in self._listeners:
+            listener(video, change_type, payload)
+
+    def _enter_status(
+        self,
+        status: VideoStatus,
+        video_id: str,
+        entered_at: datetime
+    ) -> None:
+        bucket = self._by_status[status]
+        bucket.pop(video_id, None)
+        bucket[video_id] = entered_at
+        latest = self._latest_entry.get(status)
+        if latest is not None and entered_at < latest:
+            self._unsorted_status.add(status)
+        else:
+            self._latest_entry[status] = entered_at
+
+    def _index(self, video: VideoBase, position: Optional[int] = None) -> None:
+        self._order[video.video_id] = (
+            next(self._positions) if position is None else position
+        )
+        self._enter_status(
+            video.status, video.video_id, video.updated_at or video.created_at
+        )
+        self._by_visibility[video.visibility][video.video_id] = None
+        self._by_channel[video.channel_id][video.video_id] = None
+
+    def _unindex(self, video: VideoBase) -> Optional[int]:
+        # Videonun sırası döner; aynı id yeniden indekslenirse korunur.
+        self._by_status[video.status].pop(video.video_id, None)
+        self._by_visibility[video.visibility].pop(video.video_id, None)
+        channel = self._by_channel.get(video.channel_id)
+        if channel is not None:
+            channel.pop(video.video_id, None)
+            if not channel:
+                del self._by_channel[video.channel_id]
+        return self._order.pop(video.video_id, None)
+
+    def _iter_all(self):
+        return iter(self._videos.values())
+
+    def _resolve(self, video_ids) -> List[VideoBase]:
+        return [self._videos[video_id] for video_id in video_ids]
+
+    def _resolve_ordered(self, video_ids) -> List[VideoBase]:
+        return self._resolve(sorted(video_ids, key=self._order.__getitem__))
 
     def save(self, video: VideoBase) -> None:
+        previous = self._videos.get(video.video_id)
+        position = None
+        if previous is not None and previous is not video:
+            previous._observer = None
+            position = self._unindex(previous)
+
+        video.intern_fields()
         self._videos[video.video_id] = video
+        video._observer = self._on_video_change
+        if previous is not video:
+            self._index(video, position)
+        if previous is None:
+            self._on_video_change(video, ChangeType.CREATED, {})
 
     def remove(self, video_id: str) -> bool:
         if video_id in self._videos:
-            del self._videos[video_id]
+            video = self._videos.pop(video_id)
+            video._observer = None
+            self._unindex(video)
+            self._on_video_change(video, ChangeType.REMOVED, {})
             return True
         return False
 
+    def apply_bulk(
+        self,
+        videos: List[VideoBase],
+        now: datetime,
+        status: Optional[VideoStatus] = None,
+        visibility: Optional[VideoVisibility] = None
+    ) -> None:
+        # Toplu geçiş: değişiklik videonun açık metotlarından geçer (alt
+        # sınıf kancaları çalışır); gözlemci geçici olarak değiştirilip
+        # indeksler tek zaman damgasıyla aynı geçişte güncellenir, olaylar
+        # sonra sırayla iletilir.
+        notify = bool(self._listeners)
+        events: List[Tuple[VideoBase, ChangeType, dict]] = []
+
+        def collect(video, change_type, payload):
+            video_id = video.video_id
+            if change_type == ChangeType.STATUS_CHANGED:
+                self._by_status[payload["old"]].pop(video_id, None)
+                self._enter_status(payload["new"], video_id, now)
+            elif change_type == ChangeType.VISIBILITY_CHANGED:
+                self._by_visibility[payload["old"]].pop(video_id, None)
+                self._by_visibility[payload["new"]][video_id] = None
+            if notify:
+                events.append((video, change_type, payload))
+
+        for video in videos:
+            observer, video._observer = video._observer, collect
+            try:
+                if status is not None and video.status != status:
+                    _transition(video, status, now)
+                if visibility is not None and video.visibility != visibility:
+                    video.change_visibility(visibility)
+            finally:
+                video._observer = observer
+            video.updated_at = now
+
+        for video, change_type, payload in events:
+            for listener in self._listeners:
+                listener(video, change_type, payload)
+
+    def apply_batch(
+        self,
+        created: List[VideoBase],
+        changed: List[Tuple[VideoBase, VideoStatus, VideoVisibility]],
+        removed: List[str],
+        events: List[Tuple[VideoBase, ChangeType, dict]],
+        now: datetime
+    ) -> None:
+        # Birim iş commit'i: alanlar çağıran tarafından zaten yazılmıştır;
+        # burada tek geçişte indeksler düzeltilir ve olaylar sırayla iletilir.
+        for video in created:
+            video.intern_fields()
+            self._videos[video.video_id] = video
+            video._observer = self._on_video_change
+            self._index(video)
+
+        for video, old_status, old_visibility in changed:
+            video_id = video.video_id
+            if video.status != old_status:
+                self._by_status[old_status].pop(video_id, None)
+                self._enter_status(video.status, video_id, now)
+            if video.visibility != old_visibility:
+                self._by_visibility[old_visibility].pop(video_id, None)
+                self._by_visibility[video.visibility][video_id] = None
+
+        for video_id in removed:
+            video = self._videos.pop(video_id, None)
+            if video is not None:
+                video._observer = None
+                self._unindex(video)
+                events.append((video, ChangeType.REMOVED, {}))
+
+        for video, change_type, payload in events:
+            for listener in self._listeners:
+                listener(video, change_type, payload)
+
     def count(self) -> int:
         return len(self._videos)
 
@@ -25,36 +243,34 @@ class VideoRepository:
         return video_id in self._videos
 
     def find_all(self) -> List[VideoBase]:
-        return list(self._videos.values())
+        return list(self._iter_all())
 
     def find_by_id(self, video_id: str) -> Optional[VideoBase]:
         return self._videos.get(video_id)
 
     def find_by_channel(self, channel_id: str) -> List[VideoBase]:
-        return [
-            v for v in self._videos.values()
-            if v.channel_id == channel_id
-        ]
+        return self._resolve_ordered(self._by_channel.get(channel_id, ()))
 
     def find_by_status(self, status: VideoStatus) -> List[VideoBase]:
-        return [
-            v for v in self._videos.values()
-            if v.status == status
-        ]
+        return self._resolve_ordered(self._by_status[status])
 
     def find_by_visibility(self, visibility: VideoVisibility) -> List[VideoBase]:
-        return [
-            v for v in self._videos.values()
-            if v.visibility == visibility
-        ]
+        return self._resolve_ordered(self._by_visibility[visibility])
 
     def find_public_videos(self) -> List[VideoBase]:
-        return [
-            v for v in self._videos.values()
-            if v.visibility == VideoVisibility.PUBLIC
-            and v.status == VideoStatus.PUBLISHED
-    ]
+        return self.filter(
+            status=VideoStatus.PUBLISHED,
+            visibility=VideoVisibility.PUBLIC
+        )
 
+    def status_entries(self, status: VideoStatus):
+        # (video_id, giriş zamanı) çiftleri, en eski girişten başlayarak.
+        if status in self._unsorted_status:
+            self._unsorted_status.discard(status)
+            self._by_status[status] = dict(
+                sorted(self._by_status[status].items(), key=itemgetter(1))
+            )
+        return iter(self._by_status[status].items())
 
     def find_uploaded_between(
         self,
@@ -62,7 +278,7 @@ class VideoRepository:
         end: datetime
     ) -> List[VideoBase]:
         return [
-            v for v in self._videos.values()
+            v for v in self._iter_all()
             if start <= v.created_at <= end
         ]
 
@@ -72,7 +288,7 @@ class VideoRepository:
         end: datetime
     ) -> List[VideoBase]:
         return [
-            v for v in self._videos.values()
+            v for v in self._iter_all()
             if v.updated_at and start <= v.updated_at <= end
         ]
 
@@ -82,25 +298,48 @@ class VideoRepository:
         status: Optional[VideoStatus] = None,
         visibility: Optional[VideoVisibility] = None
     ) -> List[VideoBase]:
-        result = list(self._videos.values())
-
+        candidates = []
         if channel_id is not None:
-            result = [v for v in result if v.channel_id == channel_id]
-
+            candidates.append(self._by_channel.get(channel_id, {}))
         if status is not None:
-            result = [v for v in result if v.status == status]
-
+            candidates.append(self._by_status[status])
         if visibility is not None:
-            result = [v for v in result if v.visibility == visibility]
+            candidates.append(self._by_visibility[visibility])
 
-        return result
+        if not candidates:
+            return self.find_all()
+
+        # En küçük indeksten başlayıp diğerleriyle kesişim alınır.
+        candidates.sort(key=len)
+        smallest, rest = candidates[0], candidates[1:]
+        return self._resolve_ordered(
+            video_id for video_id in smallest
+            if all(video_id in index for index in rest)
+        )
+
+    def index_size(
+        self,
+        channel_id: Optional[str] = None,
+        status: Optional[VideoStatus] = None,
+        visibility: Optional[VideoVisibility] = None
+    ) -> int:
+        # filter() en küçük indeksten başladığı için maliyeti de odur;
+        # hiçbir indeks yoksa tüm katalog taranır.
+        sizes = []
+        if channel_id is not None:
+            sizes.append(len(self._by_channel.get(channel_id, ())))
+        if status is not None:
+            sizes.append(len(self._by_status[status]))
+        if visibility is not None:
+            sizes.append(len(self._by_visibility[visibility]))
+        return min(sizes) if sizes else self.count()
 
     def paginate(self, page: int, page_size: int) -> List[VideoBase]:
         if page < 1 or page_size < 1:
           return []
 
         sorted_videos = sorted(
-           self._videos.values(),
+           self._iter_all(),
            key=lambda v: v.created_at
     )
 
@@ -112,81 +351,117 @@ class VideoRepository:
 
     def sort_by_title(self) -> List[VideoBase]:
         return sorted(
-            self._videos.values(),
+            self._iter_all(),
             key=lambda v: v.title.lower()
         )
 
     def sort_by_created(self, reverse: bool = False) -> List[VideoBase]:
         return sorted(
-            self._videos.values(),
+            self._iter_all(),
             key=lambda v: v.created_at,
             reverse=reverse
         )
 
     def sort_by_updated(self, reverse: bool = False) -> List[VideoBase]:
         return sorted(
-            self._videos.values(),
+            self._iter_all(),
             key=lambda v: v.updated_at or v.created_at,
             reverse=reverse
         )
 
     def any_blocked(self) -> bool:
-        return any(
-            v.status == VideoStatus.BLOCKED
-            for v in self._videos.values()
-        )
+        return bool(self._by_status[VideoStatus.BLOCKED])
 
     def any_published(self) -> bool:
-        return any(
-            v.status == VideoStatus.PUBLISHED
-            for v in self._videos.values()
-        )
+        return bool(self._by_status[VideoStatus.PUBLISHED])
 
     def channels(self) -> set:
-        return {v.channel_id for v in self._videos.values()}
+        return set(self._by_channel)
 
     def statuses(self) -> set:
-        return {v.status for v in self._videos.values()}
+        return {s for s, ids in self._by_status.items() if ids}
 
     def visibilities(self) -> set:
-        return {v.visibility for v in self._videos.values()}
+        return {v for v, ids in self._by_visibility.items() if ids}
 
     def count_by_channel(self) -> Dict[str, int]:
-        result = defaultdict(int)
-        for v in self._videos.values():
-            result[v.channel_id] += 1
-        return dict(result)
+        return {c: len(ids) for c, ids in self._by_channel.items()}
 
     def count_by_status(self) -> Dict[VideoStatus, int]:
-        result = defaultdict(int)
-        for v in self._videos.values():
-            result[v.status] += 1
-        return dict(result)
+        return {s: len(ids) for s, ids in self._by_status.items() if ids}
 
     def count_by_visibility(self) -> Dict[VideoVisibility, int]:
-        result = defaultdict(int)
-        for v in self._videos.values():
-            result[v.visibility] += 1
-        return dict(result)
+        return {v: len(ids) for v, ids in self._by_visibility.items() if ids}
 
     def latest(self, limit: int = 5) -> List[VideoBase]:
         return sorted(
-            self._videos.values(),
+            self._iter_all(),
             key=lambda v: v.created_at,
             reverse=True
         )[:limit]
 
     def oldest(self, limit: int = 5) -> List[VideoBase]:
         return sorted(
-            self._videos.values(),
+            self._iter_all(),
             key=lambda v: v.created_at
         )[:limit]
 
+    def video_size(self, video: VideoBase) -> int:
+        seen: set = set()
+        size = sys.getsizeof(video) + sys.getsizeof(video.__dict__)
+        for field, value in video.__dict__.items():
+            if field != "_observer":
+                size += _deep_size(value, seen)
+        return size
+
+    def memory_report(self) -> dict:
+        seen: set = set()
+        by_field: Dict[str, int] = defaultdict(int)
+        by_type: Dict[str, int] = defaultdict(int)
+
+        for video in self._videos.values():
+            video_bytes = sys.getsizeof(video) + sys.getsizeof(video.__dict__)
+            by_field["<object>"] += video_bytes
+            for field, value in video.__dict__.items():
+                if field == "_observer":
+                    continue
+                size = _deep_size(value, seen)
+                by_field[field] += size
+                video_bytes += size
+            by_type[video.get_video_type()] += video_bytes
+
+        by_index = {
+            "videos": sys.getsizeof(self._videos),
+            "status": _deep_size(self._by_status, seen),
+            "visibility": _deep_size(self._by_visibility, seen),
+            "channel": _deep_size(self._by_channel, seen),
+            "order": _deep_size(self._order, seen)
+        }
+
+        return {
+            "videos": len(self._videos),
+            "total_bytes": sum(by_type.values()) + sum(by_index.values()),
+            "by_field": dict(by_field),
+            "by_type": dict(by_type),
+            "by_index": by_index
+        }
+
     def clear(self) -> None:
+        for video in self._videos.values():
+            video._observer = None
+            self._on_video_change(video, ChangeType.REMOVED, {})
         self._videos.clear()
+        for ids in self._by_status.values():
+            ids.clear()
+        for ids in self._by_visibility.values():
+            ids.clear()
+        self._by_channel.clear()
+        self._order.clear()
+        self._unsorted_status.clear()
+        self._latest_entry.clear()
 
     def __len__(self):
         return len(self._videos)
 
     def __iter__(self):
-        return iter(self._videos.values())
+        return self._iter_all()
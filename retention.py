@@ -0,0 +1,153 @@
+from datetime import datetime, timedelta
+from time import perf_counter
+from typing import Callable, Dict, List, Optional
+
+from base import VideoStatus
+from repository import VideoRepository
+
+
+class RetentionPolicy:
+
+    def __init__(self, name: str, status: VideoStatus, older_than: timedelta):
+        self.name = name
+        self.status = status
+        self.older_than = older_than
+
+    def cutoff(self, now: datetime) -> datetime:
+        return now - self.older_than
+
+    def __repr__(self) -> str:
+        return (
+            f"<RetentionPolicy {self.name} | "
+            f"status={self.status.value} | older_than={self.older_than}>"
+        )
+
+
+def blocked_for(days: int) -> RetentionPolicy:
+    return RetentionPolicy(
+        f"blocked_{days}d", VideoStatus.BLOCKED, timedelta(days=days)
+    )
+
+
+def never_processed_for(days: int) -> RetentionPolicy:
+    return RetentionPolicy(
+        f"unprocessed_{days}d", VideoStatus.UPLOADED, timedelta(days=days)
+    )
+
+
+class RetentionReport:
+
+    def __init__(self):
+        self.removed: Dict[str, int] = {}
+        self.bytes_reclaimed = 0
+        self.elapsed_seconds = 0.0
+        self.complete = True
+
+    @property
+    def total_removed(self) -> int:
+        return sum(self.removed.values())
+
+    def merge(self, other: "RetentionReport") -> None:
+        for name, count in other.removed.items():
+            self.removed[name] = self.removed.get(name, 0) + count
+        self.bytes_reclaimed += other.bytes_reclaimed
+        self.elapsed_seconds += other.elapsed_seconds
+        self.complete = other.complete
+
+    def __repr__(self) -> str:
+        return (
+            f"<RetentionReport removed={self.total_removed} | "
+            f"bytes={self.bytes_reclaimed} | complete={self.complete}>"
+        )
+
+
+class RetentionRunner:
+    # status_entries() videoları o duruma giriş zamanına göre sıralı verir;
+    # her dilim baştan okur ve kesme zamanından yeni ilk kayıtta durur;
+    # böylece bir dilimin maliyeti silinen video sayısıyla sınırlıdır.
+
+    def __init__(
+        self,
+        repository: VideoRepository,
+        policies: List[RetentionPolicy],
+        clock: Callable[[], datetime] = datetime.now
+    ):
+        self.repository = repository
+        self.policies = policies
+        self.clock = clock
+
+    def _expired_ids(
+        self,
+        policy: RetentionPolicy,
+        cutoff: datetime,
+        limit: int
+    ) -> List[str]:
+        expired = []
+        for video_id, entered_at in self.repository.status_entries(
+            policy.status
+        ):
+            if entered_at > cutoff or len(expired) >= limit:
+                break
+            expired.append(video_id)
+        return expired
+
+    def pending(self) -> Dict[str, int]:
+        now = self.clock()
+        return {
+            policy.name: len(self._expired_ids(
+                policy, policy.cutoff(now), self.repository.count()
+            ))
+            for policy in self.policies
+        }
+
+    def run(
+        self,
+        max_items: int = 1000,
+        max_seconds: Optional[float] = None
+    ) -> RetentionReport:
+        report = RetentionReport()
+        started = perf_counter()
+        now = self.clock()
+        budget = max_items
+
+        for policy in self.policies:
+            report.removed.setdefault(policy.name, 0)
+            if budget <= 0:
+                report.complete = False
+                continue
+
+            expired = self._expired_ids(policy, policy.cutoff(now), budget + 1)
+            if len(expired) > budget:
+                report.complete = False
+                expired = expired[:budget]
+
+            for video_id in expired:
+                if (
+                    max_seconds is not None
+                    and perf_counter() - started >= max_seconds
+                ):
+                    report.complete = False
+                    break
+                video = self.repository.find_by_id(video_id)
+                if video is None:
+                    continue
+                size = self.repository.video_size(video)
+                if self.repository.remove(video_id):
+                    report.removed[policy.name] += 1
+                    report.bytes_reclaimed += size
+                    budget -= 1
+
+        report.elapsed_seconds = perf_counter() - started
+        return report
+
+    def run_until_complete(
+        self,
+        slice_items: int = 1000,
+        max_seconds: Optional[float] = None
+    ) -> RetentionReport:
+        total = RetentionReport()
+        while True:
+            report = self.run(slice_items, max_seconds)
+            total.merge(report)
+            if report.complete or report.total_removed == 0:
+                return total
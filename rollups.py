@@ -0,0 +1,213 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from base import ChangeType, VideoBase
+from repository import VideoRepository
+
+
+METRICS = ("views", "watch_time_seconds", "rating_total", "rating_count")
+_EMPTY_BUCKET = array("q", [0]) * len(METRICS)
+
+# (ad, bucket genişliği saniye, bucket sayısı)
+DEFAULT_RESOLUTIONS = (
+    ("minute", 60, 60),
+    ("hour", 3600, 24),
+    ("day", 86400, 30)
+)
+
+
+class _RingSeries:
+    # Yalnızca yazılmış zaman dilimleri (epoch) artan sırada tutulur; her
+    # dilim values içinde METRICS kadar yer kaplar. Pencereden çıkan
+    # dilimler yazarken atılır, böylece seyrek izlenen bir video tam halka
+    # yerine birkaç dilimlik yer tutar.
+    __slots__ = ("buckets", "epochs", "values")
+
+    def __init__(self, buckets: int):
+        self.buckets = buckets
+        self.epochs = array("q")
+        self.values = array("q")
+
+    def add(self, epoch: int, metric_index: int, amount: int) -> None:
+        epochs = self.epochs
+        width = len(METRICS)
+        if epochs and epochs[-1] == epoch:
+            index = len(epochs) - 1
+        elif not epochs or epoch > epochs[-1]:
+            epochs.append(epoch)
+            self.values.extend(_EMPTY_BUCKET)
+            stale = bisect_right(epochs, epoch - self.buckets)
+            if stale:
+                del epochs[:stale]
+                del self.values[:stale * width]
+            index = len(epochs) - 1
+        elif epoch <= epochs[-1] - self.buckets:
+            return
+        else:
+            index = bisect_left(epochs, epoch)
+            if epochs[index] != epoch:
+                epochs.insert(index, epoch)
+                self.values[index * width:index * width] = _EMPTY_BUCKET
+        self.values[index * width + metric_index] += amount
+
+    def total(self, metric_index: int, first_epoch: int, last_epoch: int) -> int:
+        width = len(METRICS)
+        first = bisect_left(self.epochs, first_epoch)
+        last = bisect_right(self.epochs, last_epoch)
+        return sum(self.values[first * width + metric_index:last * width:width])
+
+    def series(
+        self,
+        metric_index: int,
+        first_epoch: int,
+        last_epoch: int
+    ) -> List[int]:
+        width = len(METRICS)
+        result = [0] * (last_epoch - first_epoch + 1)
+        first = bisect_left(self.epochs, first_epoch)
+        last = bisect_right(self.epochs, last_epoch)
+        for index in range(first, last):
+            result[self.epochs[index] - first_epoch] = (
+                self.values[index * width + metric_index]
+            )
+        return result
+
+
+class RollupStore:
+
+    def __init__(
+        self,
+        clock: Callable[[], datetime] = datetime.now,
+        resolutions: Tuple[Tuple[str, int, int], ...] = DEFAULT_RESOLUTIONS
+    ):
+        self.clock = clock
+        self.resolutions = resolutions
+        self._videos: Dict[str, List[_RingSeries]] = {}
+        self._channels: Dict[str, List[_RingSeries]] = {}
+
+    def attach(self, repository: VideoRepository) -> None:
+        repository.add_listener(self._on_change)
+
+    def detach(self, repository: VideoRepository) -> None:
+        repository.remove_listener(self._on_change)
+
+    def _on_change(
+        self,
+        video: VideoBase,
+        change_type: ChangeType,
+        payload: dict
+    ) -> None:
+        if change_type == ChangeType.STATS_DELTA:
+            for metric, amount in payload.items():
+                # reset_stats negatif delta üretir; geçmiş bucket'lar korunur.
+                if amount > 0 and metric in METRICS:
+                    self.record(video.video_id, video.channel_id, metric, amount)
+        elif change_type == ChangeType.REMOVED:
+            self._videos.pop(video.video_id, None)
+
+    def _series_for(
+        self,
+        table: Dict[str, List[_RingSeries]],
+        key: str
+    ) -> List[_RingSeries]:
+        series = table.get(key)
+        if series is None:
+            series = [_RingSeries(buckets) for _, _, buckets in self.resolutions]
+            table[key] = series
+        return series
+
+    def record(
+        self,
+        video_id: str,
+        channel_id: str,
+        metric: str,
+        amount: int,
+        when: Optional[datetime] = None
+    ) -> None:
+        metric_index = METRICS.index(metric)
+        timestamp = (when or self.clock()).timestamp()
+        video_series = self._series_for(self._videos, video_id)
+        channel_series = self._series_for(self._channels, channel_id)
+
+        for i, (_, width, _) in enumerate(self.resolutions):
+            epoch = int(timestamp // width)
+            video_series[i].add(epoch, metric_index, amount)
+            channel_series[i].add(epoch, metric_index, amount)
+
+    def _resolution_for(self, window: timedelta) -> int:
+        seconds = window.total_seconds()
+        for i, (_, width, buckets) in enumerate(self.resolutions):
+            if seconds <= width * buckets:
+                return i
+        raise ValueError("Pencere çok büyük")
+
+    def _total(
+        self,
+        table: Dict[str, List[_RingSeries]],
+        key: str,
+        metric: str,
+        window: timedelta
+    ) -> int:
+        series = table.get(key)
+        if series is None:
+            return 0
+        index = self._resolution_for(window)
+        width = self.resolutions[index][1]
+        last_epoch = int(self.clock().timestamp() // width)
+        span = max(1, round(window.total_seconds() / width))
+        return series[index].total(
+            METRICS.index(metric), last_epoch - span + 1, last_epoch
+        )
+
+    def video_total(
+        self,
+        video_id: str,
+        metric: str,
+        window: timedelta
+    ) -> int:
+        return self._total(self._videos, video_id, metric, window)
+
+    def channel_total(
+        self,
+        channel_id: str,
+        metric: str,
+        window: timedelta
+    ) -> int:
+        return self._total(self._channels, channel_id, metric, window)
+
+    def video_views(self, video_id: str, window: timedelta) -> int:
+        return self.video_total(video_id, "views", window)
+
+    def channel_views(self, channel_id: str, window: timedelta) -> int:
+        return self.channel_total(channel_id, "views", window)
+
+    def average_rating(self, video_id: str, window: timedelta) -> float:
+        count = self.video_total(video_id, "rating_count", window)
+        if count == 0:
+            return 0.0
+        return self.video_total(video_id, "rating_total", window) / count
+
+    def video_series(
+        self,
+        video_id: str,
+        metric: str,
+        resolution: str = "minute"
+    ) -> List[int]:
+        names = [name for name, _, _ in self.resolutions]
+        index = names.index(resolution)
+        _, width, buckets = self.resolutions[index]
+        series = self._videos.get(video_id)
+        if series is None:
+            return [0] * buckets
+        last_epoch = int(self.clock().timestamp() // width)
+        return series[index].series(
+            METRICS.index(metric), last_epoch - buckets + 1, last_epoch
+        )
+
+    def forget_video(self, video_id: str) -> None:
+        self._videos.pop(video_id, None)
+
+    def __len__(self):
+        return len(self._videos)
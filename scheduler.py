@@ -0,0 +1,178 @@
+import heapq
+from datetime import datetime, timedelta
+from itertools import count
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from base import ChangeType, VideoBase
+from implementations import LiveStreamVideo
+from repository import VideoRepository
+
+
+class ManualClock:
+
+    def __init__(self, start: Optional[datetime] = None):
+        self.now = start or datetime.now()
+
+    def advance(self, delta: timedelta) -> datetime:
+        self.now += delta
+        return self.now
+
+    def __call__(self) -> datetime:
+        return self.now
+
+
+class StreamScheduler:
+    # scheduled_time üzerinde min-heap. İptal ve yeniden planlama heap'i
+    # taramaz; eski kayıtlar çekilirken atlanır (lazy deletion).
+
+    def __init__(
+        self,
+        clock: Callable[[], datetime] = datetime.now,
+        batch_size: int = 1000
+    ):
+        self.clock = clock
+        self.batch_size = batch_size
+        self._heap: List[Tuple[datetime, int, str]] = []
+        self._pending: Dict[str, Tuple[datetime, LiveStreamVideo]] = {}
+        self._live: Dict[str, LiveStreamVideo] = {}
+        self._counter = count()
+
+    def attach(self, repository: VideoRepository) -> None:
+        for video in repository.find_all():
+            self._track(video)
+        repository.add_listener(self._on_change)
+
+    def detach(self, repository: VideoRepository) -> None:
+        repository.remove_listener(self._on_change)
+
+    def _on_change(
+        self,
+        video: VideoBase,
+        change_type: ChangeType,
+        payload: dict
+    ) -> None:
+        if not isinstance(video, LiveStreamVideo):
+            return
+        if change_type == ChangeType.CREATED:
+            self._track(video)
+        elif change_type == ChangeType.REMOVED:
+            self.cancel(video.video_id)
+            self._live.pop(video.video_id, None)
+        elif change_type == ChangeType.STATUS_CHANGED:
+            # start_stream/end_stream doğrudan çağrıldıysa canlı kümesini eşitle.
+            if video.is_live:
+                self._pending.pop(video.video_id, None)
+                self._live[video.video_id] = video
+            else:
+                self._live.pop(video.video_id, None)
+
+    def _track(self, video: VideoBase) -> None:
+        if not isinstance(video, LiveStreamVideo):
+            return
+        if video.is_live:
+            self._live[video.video_id] = video
+        elif video.is_scheduled() and video.started_at is None:
+            self.schedule(video)
+
+    def schedule(self, video: LiveStreamVideo) -> None:
+        if not video.is_scheduled():
+            raise ValueError("Yayın zamanı yok")
+        self._pending[video.video_id] = (video.scheduled_time, video)
+        heapq.heappush(
+            self._heap,
+            (video.scheduled_time, next(self._counter), video.video_id)
+        )
+
+    def reschedule(self, video_id: str, scheduled_time: datetime) -> None:
+        entry = self._pending.get(video_id)
+        if entry is None:
+            raise LookupError("Planlı yayın yok")
+        video = entry[1]
+        video.scheduled_time = scheduled_time
+        self.schedule(video)
+
+    def cancel(self, video_id: str) -> bool:
+        return self._pending.pop(video_id, None) is not None
+
+    def _is_current(self, entry: Tuple[datetime, int, str]) -> bool:
+        pending = self._pending.get(entry[2])
+        return pending is not None and pending[0] == entry[0]
+
+    def _drop_stale(self) -> None:
+        while self._heap and not self._is_current(self._heap[0]):
+            heapq.heappop(self._heap)
+
+    def next_due(self) -> Optional[LiveStreamVideo]:
+        self._drop_stale()
+        if not self._heap:
+            return None
+        return self._pending[self._heap[0][2]][1]
+
+    def seconds_until_next(self) -> Optional[float]:
+        video = self.next_due()
+        if video is None:
+            return None
+        return max(0.0, (video.scheduled_time - self.clock()).total_seconds())
+
+    def upcoming(self, limit: int = 10) -> List[LiveStreamVideo]:
+        popped = []
+        result = []
+        while self._heap and len(result) < limit:
+            entry = heapq.heappop(self._heap)
+            if self._is_current(entry):
+                popped.append(entry)
+                result.append(self._pending[entry[2]][1])
+        for entry in popped:
+            heapq.heappush(self._heap, entry)
+        return result
+
+    def due(self, now: Optional[datetime] = None) -> List[LiveStreamVideo]:
+        now = now or self.clock()
+        result = []
+        while self._heap and len(result) < self.batch_size:
+            self._drop_stale()
+            if not self._heap or self._heap[0][0] > now:
+                break
+            entry = heapq.heappop(self._heap)
+            result.append(self._pending.pop(entry[2])[1])
+        return result
+
+    def _start(self, videos: List[LiveStreamVideo]) -> List[LiveStreamVideo]:
+        started = []
+        for video in videos:
+            if video.is_blocked():
+                continue
+            video.start_stream(self.clock())
+            self._live[video.video_id] = video
+            started.append(video)
+        return started
+
+    def tick(self) -> List[LiveStreamVideo]:
+        return self._start(self.due())
+
+    def run_pending(self) -> List[LiveStreamVideo]:
+        now = self.clock()
+        started = []
+        while True:
+            batch = self.due(now)
+            if not batch:
+                return started
+            started.extend(self._start(batch))
+
+    def end_stream(self, video_id: str, final_duration: int) -> None:
+        video = self._live.pop(video_id, None)
+        if video is None:
+            raise LookupError("Canlı yayın yok")
+        video.end_stream(final_duration, self.clock())
+
+    def live_ids(self) -> Set[str]:
+        return set(self._live)
+
+    def live_streams(self) -> List[LiveStreamVideo]:
+        return list(self._live.values())
+
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    def __len__(self):
+        return len(self._pending)
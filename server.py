@@ -0,0 +1,611 @@
+import asyncio
+import json
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from enum import Enum
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+from admission import AdmissionRejected, ScanCursor, TruncatedResult
+from base import VideoBase, VideoStatus, VideoVisibility
+from repository import VideoRepository
+from services import VideoService
+from workload import decode_video
+
+
+STREAM_CHUNK = 500
+
+logger = logging.getLogger(__name__)
+
+REASONS = {
+    200: "OK",
+    201: "Created",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    409: "Conflict",
+    500: "Internal Server Error",
+    503: "Service Unavailable"
+}
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, set):
+        return sorted(value, key=str)
+    raise TypeError(f"{type(value).__name__} JSON'a çevrilemez")
+
+
+def dumps(value) -> bytes:
+    return json.dumps(
+        value, default=_json_default, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def video_to_dict(video: VideoBase) -> dict:
+    data = video.to_dict()
+    data["type"] = video.get_video_type()
+    data["tags"] = list(video.tags)
+    return data
+
+
+class HttpError(Exception):
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class Request:
+
+    def __init__(
+        self,
+        method: str,
+        path: str,
+        query: Dict[str, str],
+        headers: Dict[str, str],
+        body: bytes
+    ):
+        self.method = method
+        self.path = path
+        self.query = query
+        self.headers = headers
+        self.body = body
+
+    def json(self) -> dict:
+        if not self.body:
+            return {}
+        try:
+            data = json.loads(self.body)
+        except ValueError:
+            raise HttpError(400, "Geçersiz JSON")
+        if not isinstance(data, dict):
+            raise HttpError(400, "JSON nesnesi bekleniyor")
+        return data
+
+    @property
+    def keep_alive(self) -> bool:
+        return self.headers.get("connection", "").lower() != "close"
+
+
+def encode_lines(videos: List[VideoBase]) -> List[bytes]:
+    return [dumps(video_to_dict(video)) + b"\n" for video in videos]
+
+
+class Stream:
+    # Önceden kodlanmış JSON satırları parça parça gönderilir. Kodlama
+    # executor'da bir kez yapılır; birleştirilen istekler aynı satırları
+    # paylaşır.
+
+    def __init__(self, lines: List[bytes]):
+        self.lines = lines
+
+
+class VideoHttpServer:
+    # Servis çağrıları tek işçili bir executor'da sırayla çalışır: olay
+    # döngüsü hiçbir taramada bloklanmaz ve repository'ye aynı anda tek iş
+    # parçacığı dokunur. Aynı anda gelen özdeş GET istekleri tek çağrıda
+    # birleştirilir.
+
+    def __init__(
+        self,
+        service: VideoService,
+        host: str = "127.0.0.1",
+        port: int = 8080
+    ):
+        self.service = service
+        self.host = host
+        self.port = port
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._inflight: Dict[Tuple, asyncio.Future] = {}
+        self.coalesced = 0
+        self._routes: List[Tuple[str, re.Pattern, Callable]] = []
+        self._register_routes()
+
+    def _route(self, method: str, pattern: str, handler: Callable) -> None:
+        self._routes.append((method, re.compile(f"^{pattern}$"), handler))
+
+    def _register_routes(self) -> None:
+        self._route("GET", r"/videos", self._list_videos)
+        self._route("POST", r"/videos", self._upload)
+        self._route("GET", r"/videos/sorted", self._sorted)
+        self._route("GET", r"/videos/page", self._paginate)
+        self._route("GET", r"/videos/public", self._public)
+        self._route("GET", r"/videos/(?P<video_id>[^/]+)", self._get_video)
+        self._route("DELETE", r"/videos/(?P<video_id>[^/]+)", self._remove)
+        self._route(
+            "POST",
+            r"/videos/(?P<video_id>[^/]+)/(?P<action>[a-z_]+)",
+            self._action
+        )
+        self._route(
+            "DELETE",
+            r"/videos/(?P<video_id>[^/]+)/tags/(?P<tag>[^/]+)",
+            self._remove_tag
+        )
+        self._route(
+            "GET", r"/channels/(?P<channel_id>[^/]+)/videos", self._by_channel
+        )
+        self._route("GET", r"/channels", self._channels)
+        self._route("GET", r"/stats", self._stats)
+
+    async def _call(self, function: Callable, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, function, *args)
+
+    async def _read(self, request: Request, function: Callable, *args):
+        key = (request.path, tuple(sorted(request.query.items())))
+        future = self._inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            return await asyncio.shield(future)
+
+        future = asyncio.ensure_future(self._call(function, *args))
+        self._inflight[key] = future
+        try:
+            return await asyncio.shield(future)
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    # --- işleyiciler ---
+
+    async def _list_videos(self, request: Request) -> Stream:
+        query = request.query
+        status = VideoStatus(query["status"]) if "status" in query else None
+        visibility = (
+            VideoVisibility(query["visibility"])
+            if "visibility" in query else None
+        )
+        channel_id = query.get("channel_id")
+        call = self._resumable(
+            request, self.service.list_filtered, channel_id, status, visibility
+        )
+
+        def scan():
+            videos = call()
+            return encode_lines(videos), self._continuation(videos)
+
+        lines, headers = await self._read(request, scan)
+        return 200, Stream(lines), headers
+
+    @staticmethod
+    def _continuation(videos) -> Dict[str, str]:
+        # Bütçeyi aşan tarama kısaltılmış döner; devamı X-Next-Cursor
+        # başlığındaki değerle aynı uç noktaya ?cursor= verilerek istenir.
+        if isinstance(videos, TruncatedResult) and videos.cursor is not None:
+            return {"X-Next-Cursor": videos.cursor.to_token()}
+        return {}
+
+    def _resumable(self, request: Request, function: Callable, *args):
+        token = request.query.get("cursor")
+        if token is None:
+            return lambda: function(*args)
+        try:
+            cursor = ScanCursor.from_token(token)
+        except ValueError:
+            raise HttpError(400, "Geçersiz cursor")
+        return lambda: self.service.resume(cursor)
+
+    async def _sorted(self, request: Request) -> tuple:
+        key = request.query.get("by", "created")
+        reverse = request.query.get("reverse", "false") == "true"
+        if key == "title":
+            function = self.service.sort_by_title
+            args = ()
+        elif key == "created":
+            function, args = self.service.sort_by_created, (reverse,)
+        elif key == "updated":
+            function, args = self.service.sort_by_updated, (reverse,)
+        else:
+            raise HttpError(400, "Geçersiz sıralama")
+        call = self._resumable(request, function, *args)
+
+        def scan():
+            videos = call()
+            return encode_lines(videos), self._continuation(videos)
+
+        lines, headers = await self._read(request, scan)
+        return 200, Stream(lines), headers
+
+    async def _paginate(self, request: Request) -> tuple:
+        try:
+            page = int(request.query.get("page", "1"))
+            page_size = int(request.query.get("page_size", "20"))
+        except ValueError:
+            raise HttpError(400, "Geçersiz sayfa")
+        call = self._resumable(request, self.service.paginate, page, page_size)
+
+        def scan():
+            videos = call()
+            return [video_to_dict(v) for v in videos], self._continuation(videos)
+
+        body, headers = await self._read(request, scan)
+        return 200, body, headers
+
+    async def _public(self, request: Request) -> Stream:
+        def scan():
+            return encode_lines(self.service.list_public())
+
+        return Stream(await self._read(request, scan))
+
+    async def _by_channel(self, request: Request, channel_id: str) -> Stream:
+        def scan():
+            return encode_lines(self.service.list_by_channel(channel_id))
+
+        return Stream(await self._read(request, scan))
+
+    async def _channels(self, request: Request) -> list:
+        channels = await self._read(request, self.service.channels)
+        return sorted(channels)
+
+    async def _stats(self, request: Request) -> dict:
+        def counts():
+            repository = self.service.repository
+            return {
+                "videos": repository.count(),
+                "by_status": {
+                    k.value: v for k, v in repository.count_by_status().items()
+                },
+                "by_visibility": {
+                    k.value: v
+                    for k, v in repository.count_by_visibility().items()
+                },
+                "by_channel": repository.count_by_channel()
+            }
+
+        return await self._read(request, counts)
+
+    async def _get_video(self, request: Request, video_id: str) -> dict:
+        def lookup():
+            video = self.service.repository.find_by_id(video_id)
+            if video is None:
+                raise LookupError("Video yok")
+            return video_to_dict(video)
+
+        return await self._read(request, lookup)
+
+    async def _upload(self, request: Request) -> Tuple[int, dict]:
+        data = request.json()
+        try:
+            video = decode_video(data)
+        except (KeyError, TypeError):
+            raise HttpError(400, "Eksik video alanı")
+        await self._call(self.service.upload_video, video)
+        return 201, {"video_id": video.video_id}
+
+    async def _remove(self, request: Request, video_id: str) -> dict:
+        removed = await self._call(self.service.remove_video, video_id)
+        if not removed:
+            raise HttpError(404, "Video yok")
+        return {"removed": video_id}
+
+    async def _action(
+        self,
+        request: Request,
+        video_id: str,
+        action: str
+    ) -> dict:
+        data = request.json()
+        actions = {
+            "process": (self.service.start_processing, ()),
+            "publish": (self.service.publish_video, ()),
+            "process_and_publish": (self.service.process_and_publish, ()),
+            "unpublish": (self.service.unpublish_video, ()),
+            "block": (self.service.block_video, ()),
+            "watch": (
+                self.service.mark_video_watched, (data.get("viewer_id"),)
+            ),
+            "enable_subtitles": (self.service.enable_subtitles, ()),
+            "disable_subtitles": (self.service.disable_subtitles, ()),
+        }
+        if action == "visibility":
+            try:
+                visibility = VideoVisibility(data.get("visibility"))
+            except ValueError:
+                raise HttpError(400, "Geçersiz görünürlük")
+            function, args = self.service.change_visibility, (visibility,)
+        elif action == "tags":
+            if not data.get("tag"):
+                raise HttpError(400, "Etiket yok")
+            function, args = self.service.add_tag, (data["tag"],)
+        elif action in actions:
+            function, args = actions[action]
+        else:
+            raise HttpError(404, "Bilinmeyen işlem")
+
+        await self._call(function, video_id, *args)
+        return {"video_id": video_id, "action": action}
+
+    async def _remove_tag(
+        self,
+        request: Request,
+        video_id: str,
+        tag: str
+    ) -> dict:
+        await self._call(self.service.remove_tag, video_id, tag)
+        return {"video_id": video_id, "removed_tag": tag}
+
+    # --- HTTP ---
+
+    async def _dispatch(self, request: Request):
+        allowed = False
+        for method, pattern, handler in self._routes:
+            match = pattern.match(request.path)
+            if match is None:
+                continue
+            if method != request.method:
+                allowed = True
+                continue
+            params = {k: unquote(v) for k, v in match.groupdict().items()}
+            return await handler(request, **params)
+        if allowed:
+            raise HttpError(405, "İzin verilmeyen metot")
+        raise HttpError(404, "Bulunamadı")
+
+    @staticmethod
+    async def _read_request(reader: asyncio.StreamReader) -> Optional[Request]:
+        line = await reader.readline()
+        if not line:
+            return None
+        try:
+            method, target, _ = line.decode("latin-1").split(" ", 2)
+        except ValueError:
+            raise HttpError(400, "Geçersiz istek satırı")
+
+        headers = {}
+        while True:
+            header = await reader.readline()
+            if header in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = header.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        body = b""
+        try:
+            length = int(headers.get("content-length", "0") or 0)
+        except ValueError:
+            raise HttpError(400, "Geçersiz Content-Length")
+        if length < 0:
+            raise HttpError(400, "Geçersiz Content-Length")
+        if length:
+            body = await reader.readexactly(length)
+
+        parts = urlsplit(target)
+        return Request(
+            method.upper(),
+            parts.path.rstrip("/") or "/",
+            dict(parse_qsl(parts.query)),
+            headers,
+            body
+        )
+
+    @staticmethod
+    def _head(status: int, headers: Dict[str, str]) -> bytes:
+        lines = [f"HTTP/1.1 {status} {REASONS.get(status, '')}"]
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+    async def _respond(
+        self,
+        writer: asyncio.StreamWriter,
+        status: int,
+        result,
+        keep_alive: bool,
+        headers: Optional[Dict[str, str]] = None
+    ) -> None:
+        connection = "keep-alive" if keep_alive else "close"
+        headers = headers or {}
+        if isinstance(result, Stream):
+            writer.write(self._head(status, {
+                "Content-Type": "application/x-ndjson",
+                "Transfer-Encoding": "chunked",
+                "Connection": connection,
+                **headers
+            }))
+            lines = result.lines
+            for start in range(0, len(lines), STREAM_CHUNK):
+                chunk = b"".join(lines[start:start + STREAM_CHUNK])
+                writer.write(f"{len(chunk):x}\r\n".encode() + chunk + b"\r\n")
+                await writer.drain()
+            writer.write(b"0\r\n\r\n")
+        else:
+            body = dumps(result)
+            writer.write(self._head(status, {
+                "Content-Type": "application/json",
+                "Content-Length": str(len(body)),
+                "Connection": connection,
+                **headers
+            }) + body)
+        await writer.drain()
+
+    async def _handle(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except HttpError as exc:
+                    await self._respond(
+                        writer, exc.status, {"error": str(exc)}, False
+                    )
+                    break
+                if request is None:
+                    break
+
+                status = 200
+                headers = None
+                try:
+                    result = await self._dispatch(request)
+                    # İşleyici (durum, gövde) ya da (durum, gövde, başlıklar)
+                    # döndürebilir.
+                    if isinstance(result, tuple):
+                        status, result, *extra = result
+                        headers = extra[0] if extra else None
+                except HttpError as exc:
+                    status, result = exc.status, {"error": str(exc)}
+                except LookupError as exc:
+                    status, result = 404, {"error": str(exc)}
+                except ValueError as exc:
+                    status, result = 400, {"error": str(exc)}
+                except AdmissionRejected as exc:
+                    status, result = 503, {"error": str(exc)}
+                except RuntimeError as exc:
+                    status, result = 409, {"error": str(exc)}
+                except Exception:
+                    logger.exception(
+                        "İstek işlenemedi: %s %s", request.method, request.path
+                    )
+                    status, result = 500, {"error": "Sunucu hatası"}
+
+                await self._respond(
+                    writer, status, result, request.keep_alive, headers
+                )
+                if not request.keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:
+            # Sunucu kapanırken boşta bekleyen bağlantılar iptal edilir.
+            pass
+        finally:
+            writer.close()
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(
+            self._handle, self.host, self.port
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        self.executor.shutdown(wait=False)
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        await self._server.serve_forever()
+
+
+class AsyncVideoClient:
+    # Tek keep-alive bağlantı üzerinden çalışan küçük istemci.
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8080):
+        self.host = host
+        self.port = port
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+
+    async def connect(self) -> None:
+        self._reader, self._writer = await asyncio.open_connection(
+            self.host, self.port
+        )
+
+    async def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._reader = self._writer = None
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        body: Optional[dict] = None
+    ) -> Tuple[int, Dict[str, str], bytes]:
+        if self._writer is None:
+            await self.connect()
+
+        payload = dumps(body) if body is not None else b""
+        head = (
+            f"{method} {path} HTTP/1.1\r\n"
+            f"Host: {self.host}\r\n"
+            f"Content-Length: {len(payload)}\r\n"
+            "Connection: keep-alive\r\n\r\n"
+        )
+        self._writer.write(head.encode("latin-1") + payload)
+        await self._writer.drain()
+
+        status_line = await self._reader.readline()
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await self._reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get("transfer-encoding") == "chunked":
+            parts = []
+            while True:
+                size = int((await self._reader.readline()).strip(), 16)
+                if size == 0:
+                    await self._reader.readline()
+                    break
+                parts.append(await self._reader.readexactly(size))
+                await self._reader.readline()
+            data = b"".join(parts)
+        else:
+            data = await self._reader.readexactly(
+                int(headers.get("content-length", "0"))
+            )
+
+        if headers.get("connection") == "close":
+            await self.close()
+        return status, headers, data
+
+    async def get_json(self, path: str):
+        status, _, data = await self.request("GET", path)
+        return status, json.loads(data) if data else None
+
+    async def get_lines(self, path: str) -> Tuple[int, List[dict]]:
+        status, _, data = await self.request("GET", path)
+        return status, [json.loads(line) for line in data.splitlines() if line]
+
+    async def post_json(self, path: str, body: Optional[dict] = None):
+        status, _, data = await self.request("POST", path, body or {})
+        return status, json.loads(data) if data else None
+
+    async def delete(self, path: str):
+        status, _, data = await self.request("DELETE", path)
+        return status, json.loads(data) if data else None
+
+
+def main(host: str = "127.0.0.1", port: int = 8080) -> None:
+    server = VideoHttpServer(VideoService(VideoRepository()), host, port)
+    asyncio.run(server.serve_forever())
+
+
+if __name__ == "__main__":
+    main()
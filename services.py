@@ -1,133 +1,783 @@
+import sys
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
 from datetime import datetime
-from typing import List, Optional
+from enum import Enum
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 
-from base import VideoBase, VideoStatus, VideoVisibility
+from admission import AdmissionController, ScanCursor, TruncatedResult
+from base import ChangeType, VideoBase, VideoStatus, VideoVisibility
+from events import ChangeLog, Subscription
 from repository import VideoRepository
 
 
-
-class VideoService:
-    def __init__(self, repository: VideoRepository):
-        self.repository = repository
+class BulkOutcome(Enum):
+    APPLIED = "applied"
+    UNCHANGED = "unchanged"
+    INVALID_STATE = "invalid_state"
+    NOT_FOUND = "not_found"
+
+
+# Hedef durum -> bu duruma geçilebilecek durumlar (tekil servis çağrılarıyla aynı).
+ALLOWED_TRANSITIONS = {
+    VideoStatus.PROCESSING: {VideoStatus.UPLOADED, VideoStatus.PUBLISHED},
+    VideoStatus.PUBLISHED: {VideoStatus.UPLOADED, VideoStatus.PROCESSING},
+    VideoStatus.BLOCKED: {
+        VideoStatus.UPLOADED,
+        VideoStatus.PROCESSING,
+        VideoStatus.PUBLISHED
+    },
+    VideoStatus.UPLOADED: set()
+}
+
+
+class _Draft:
+    # Birim iş içinde bir videonun simüle edilen son hali. base_* alanları
+    # videonun kayda alındığı andaki halidir; commit'te eşzamanlı bir
+    # değişiklik olup olmadığı bunlarla kontrol edilir.
+    __slots__ = (
+        "video",
+        "is_new",
+        "removed",
+        "status",
+        "visibility",
+        "tags",
+        "has_subtitles",
+        "base_status",
+        "base_visibility",
+        "base_tags"
+    )
+
+    def __init__(self, video: VideoBase, is_new: bool):
+        self.video = video
+        self.is_new = is_new
+        self.removed = False
+        self.status = self.base_status = video.status
+        self.visibility = self.base_visibility = video.visibility
+        self.tags = list(video.tags)
+        self.base_tags = tuple(video.tags)
+        self.has_subtitles = video.has_subtitles
+
+
+class UnitOfWork:
+    # Değişiklikler hemen uygulanmaz; her adım sırayla, simüle edilen duruma
+    # karşı doğrulanır ve hata anında fırlatılır. commit() hepsini tek zaman
+    # damgası, tek indeks geçişi ve tek günlük yazımıyla uygular. Doğrulama
+    # hatası, eşzamanlı değişiklik ya da rollback() durumunda hiçbir değişiklik
+    # uygulanmaz.
+
+    def __init__(self, service: "VideoService"):
+        self.service = service
+        self._drafts: Dict[str, _Draft] = {}
+        self._closed = False
+
+    def __enter__(self) -> "UnitOfWork":
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> bool:
+        if self._closed:
+            return False
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+        return False
+
+    def _draft(self, video_id: str) -> _Draft:
+        if self._closed:
+            raise RuntimeError("İşlem kapandı")
+        draft = self._drafts.get(video_id)
+        if draft is None:
+            video = self.service._get(video_id)
+            draft = self._drafts[video_id] = _Draft(video, False)
+        if draft.removed:
+            raise LookupError("Video yok")
+        return draft
 
     def upload_video(self, video: VideoBase) -> None:
+        if self._closed:
+            raise RuntimeError("İşlem kapandı")
+        if (
+            video.video_id in self._drafts
+            or self.service.repository.exists(video.video_id)
+        ):
+            raise ValueError("Video zaten var")
         if not video.is_valid():
-            raise ValueError("Geçersiz video")
-        self.repository.save(video)
+            reasons = ", ".join(
+                failure.message for failure in video.validation_failures()
+            )
+            raise ValueError(f"Geçersiz video: {reasons}")
+        self._drafts[video.video_id] = _Draft(video, True)
 
     def start_processing(self, video_id: str) -> None:
-        video = self._get(video_id)
-        if video.status != VideoStatus.UPLOADED:
+        draft = self._draft(video_id)
+        if draft.status != VideoStatus.UPLOADED:
             raise RuntimeError("Geçersiz state")
-        video.process()
+        draft.status = VideoStatus.PROCESSING
 
     def publish_video(self, video_id: str) -> None:
-        video = self._get(video_id)
-        if video.status != VideoStatus.PROCESSING:
+        draft = self._draft(video_id)
+        if draft.status != VideoStatus.PROCESSING:
             raise RuntimeError("Geçersiz state")
-        video.publish()
+        draft.status = VideoStatus.PUBLISHED
 
     def process_and_publish(self, video_id: str) -> None:
-        video = self._get(video_id)
-        if video.status == VideoStatus.BLOCKED:
+        draft = self._draft(video_id)
+        if draft.status == VideoStatus.BLOCKED:
             raise RuntimeError("Bloklu video yayınlanamaz")
+        draft.status = VideoStatus.PUBLISHED
+
+    def unpublish_video(self, video_id: str) -> None:
+        draft = self._draft(video_id)
+        if draft.status != VideoStatus.PUBLISHED:
+            raise RuntimeError("Geçersiz state")
+        draft.status = VideoStatus.PROCESSING
+
+    def block_video(self, video_id: str) -> None:
+        self._draft(video_id).status = VideoStatus.BLOCKED
+
+    def change_visibility(
+        self,
+        video_id: str,
+        visibility: VideoVisibility
+    ) -> None:
+        self._draft(video_id).visibility = visibility
+
+    def enable_subtitles(self, video_id: str) -> None:
+        self._draft(video_id).has_subtitles = True
+
+    def disable_subtitles(self, video_id: str) -> None:
+        self._draft(video_id).has_subtitles = False
+
+    def add_tag(self, video_id: str, tag: str) -> None:
+        draft = self._draft(video_id)
+        if tag not in draft.tags:
+            draft.tags.append(tag)
+
+    def remove_tag(self, video_id: str, tag: str) -> None:
+        draft = self._draft(video_id)
+        if tag in draft.tags:
+            draft.tags.remove(tag)
+
+    def remove_video(self, video_id: str) -> bool:
+        try:
+            draft = self._draft(video_id)
+        except LookupError:
+            return False
+        draft.removed = True
+        return True
+
+    def rollback(self) -> None:
+        self._drafts.clear()
+        self._closed = True
+
+    def _check_conflicts(self) -> None:
+        repository = self.service.repository
+        for video_id, draft in self._drafts.items():
+            if draft.is_new:
+                if repository.exists(video_id):
+                    raise RuntimeError("Eşzamanlı değişiklik")
+                continue
+            video = draft.video
+            if (
+                not repository.exists(video_id)
+                or video.status != draft.base_status
+                or video.visibility != draft.base_visibility
+                or tuple(video.tags) != draft.base_tags
+            ):
+                raise RuntimeError("Eşzamanlı değişiklik")
+
+    def commit(self) -> Dict[str, BulkOutcome]:
+        if self._closed:
+            raise RuntimeError("İşlem kapandı")
+        try:
+            self._check_conflicts()
+            return self.service._scan(
+                "unit_of_work", lambda: len(self._drafts), self._apply
+            )
+        except Exception:
+            self.rollback()
+            raise
+
+    def _apply(self) -> Dict[str, BulkOutcome]:
+        # Önce hata verebilecek her şey (metin interning, olaylar, günlükte
+        # silmeler dahil tüm olaylar için yer) canlı videolara dokunmadan
+        # hazırlanır; ardından yalnızca atamalar ve indeks güncellemesi kalır. Dinleyici hatası ise tekil işlemlerde
+        # olduğu gibi commit'ten sonra yüzeye çıkar.
+        now = datetime.now()
+        created: List[VideoBase] = []
+        changed: List[Tuple[VideoBase, VideoStatus, VideoVisibility]] = []
+        updates: List[tuple] = []
+        removed: List[str] = []
+        events: List[Tuple[VideoBase, ChangeType, dict]] = []
+        outcomes: Dict[str, BulkOutcome] = {}
+
+        for video_id, draft in self._drafts.items():
+            video = draft.video
+            if draft.removed:
+                if not draft.is_new:
+                    removed.append(video_id)
+                    outcomes[video_id] = BulkOutcome.APPLIED
+                else:
+                    outcomes[video_id] = BulkOutcome.UNCHANGED
+                continue
+
+            if draft.is_new:
+                video.intern_fields()
+                created.append(video)
+                events.append((video, ChangeType.CREATED, {}))
+            touched = draft.is_new
+
+            if draft.status != video.status:
+                events.append((
+                    video,
+                    ChangeType.STATUS_CHANGED,
+                    {"old": video.status, "new": draft.status}
+                ))
+                touched = True
+            if draft.visibility != video.visibility:
+                events.append((
+                    video,
+                    ChangeType.VISIBILITY_CHANGED,
+                    {"old": video.visibility, "new": draft.visibility}
+                ))
+                touched = True
+            tags = video.tags
+            if draft.tags != video.tags:
+                tags = [sys.intern(tag) for tag in draft.tags]
+                kept = set(tags)
+                previous = set(video.tags)
+                for tag in video.tags:
+                    if tag not in kept:
+                        events.append(
+                            (video, ChangeType.TAG_REMOVED, {"tag": tag})
+                        )
+                for tag in tags:
+                    if tag not in previous:
+                        events.append(
+                            (video, ChangeType.TAG_ADDED, {"tag": tag})
+                        )
+                touched = True
+            if draft.has_subtitles != video.has_subtitles:
+                touched = True
+
+            if touched:
+                updates.append((video, draft, tags))
+                if not draft.is_new:
+                    changed.append(
+                        (video, draft.base_status, draft.base_visibility)
+                    )
+                outcomes[video_id] = BulkOutcome.APPLIED
+            else:
+                outcomes[video_id] = BulkOutcome.UNCHANGED
+
+        log = self.service.change_log
+        with self.service._reserve(len(events) + len(removed)):
+            for video, draft, tags in updates:
+                video.status = draft.status
+                video.visibility = draft.visibility
+                video.tags = tags
+                video.has_subtitles = draft.has_subtitles
+                video.updated_at = now
+
+            self._closed = True
+            with log.batch() if log is not None else nullcontext():
+                self.service.repository.apply_batch(
+                    created, changed, removed, events, now
+                )
+        return outcomes
 
-        if video.status == VideoStatus.UPLOADED:
+
+class VideoService:
+    def __init__(
+        self,
+        repository: VideoRepository,
+        change_log: Optional[ChangeLog] = None,
+        admission: Optional[AdmissionController] = None
+    ):
+        self.repository = repository
+        self.change_log = change_log
+        self.admission = admission
+        if change_log is not None:
+            repository.add_listener(change_log.record)
+
+    @contextmanager
+    def _point(self, op: str, events: int = 1):
+        # Tekil işlem, kabulden sonra değişikliğin üreteceği olaylar için
+        # günlükte yer ayırır; günlük doluysa video hiç değişmeden hata
+        # döner.
+        with self._admit_point(op), self._reserve(events):
+            yield
+
+    def _admit_point(self, op: str):
+        if self.admission is None:
+            return nullcontext()
+        return self.admission.admit(op, 1)
+
+    def _reserve(self, events: int):
+        if self.change_log is None:
+            return nullcontext()
+        return self.change_log.reserve(events)
+
+    def _scan(
+        self,
+        op: str,
+        cost: Callable[[], int],
+        call: Callable,
+        degrade: Optional[Callable] = None,
+        degrade_cost: Optional[Callable[[], int]] = None
+    ):
+        if self.admission is None:
+            return call()
+        return self.admission.run(
+            op,
+            cost(),
+            call,
+            degrade,
+            degrade_cost() if degrade_cost is not None else None
+        )
+
+    def _sort_cost(self) -> int:
+        return AdmissionController.sort_cost(self.repository.count())
+
+    def _degraded_cost(
+        self,
+        op: str,
+        offset: int = 0,
+        limit: Optional[int] = None
+    ) -> Callable[[], int]:
+        # Kısaltılmış parçanın maliyeti ofset derinliğiyle büyür: n log k.
+        def cost() -> int:
+            return self.admission.scan_cost(
+                op,
+                self.repository.count(),
+                offset + (limit or self.admission.degrade_limit)
+            )
+        return cost
+
+    def _degraded_scan(
+        self,
+        op: str,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        reverse: bool = False,
+        after: Optional[tuple] = None,
+        stop: Optional[int] = None
+    ) -> TruncatedResult:
+        return self.admission.scan(
+            iter(self.repository),
+            self.repository.count(),
+            op,
+            offset,
+            limit,
+            reverse,
+            after,
+            stop
+        )
+
+    def upload_video(self, video: VideoBase) -> None:
+        with self._point("upload_video"):
+            if not video.is_valid():
+                reasons = ", ".join(
+                    failure.message for failure in video.validation_failures()
+                )
+                raise ValueError(f"Geçersiz video: {reasons}")
+            self.repository.save(video)
+
+    def start_processing(self, video_id: str) -> None:
+        with self._point("start_processing"):
+            video = self._get(video_id)
+            if video.status != VideoStatus.UPLOADED:
+                raise RuntimeError("Geçersiz state")
             video.process()
 
-        if video.status == VideoStatus.PROCESSING:
+    def publish_video(self, video_id: str) -> None:
+        with self._point("publish_video"):
+            video = self._get(video_id)
+            if video.status != VideoStatus.PROCESSING:
+                raise RuntimeError("Geçersiz state")
             video.publish()
 
+    def process_and_publish(self, video_id: str) -> None:
+        with self._point("process_and_publish", events=2):
+            video = self._get(video_id)
+            if video.status == VideoStatus.BLOCKED:
+                raise RuntimeError("Bloklu video yayınlanamaz")
+
+            if video.status == VideoStatus.UPLOADED:
+                video.process()
+
+            if video.status == VideoStatus.PROCESSING:
+                video.publish()
+
 
     def unpublish_video(self, video_id: str) -> None:
-        video = self._get(video_id)
-        if video.status != VideoStatus.PUBLISHED:
-            raise RuntimeError("Geçersiz state")
-        video.unpublish()
+        with self._point("unpublish_video"):
+            video = self._get(video_id)
+            if video.status != VideoStatus.PUBLISHED:
+                raise RuntimeError("Geçersiz state")
+            video.unpublish()
 
     def block_video(self, video_id: str) -> None:
-        video = self._get(video_id)
-        video.block()
+        with self._point("block_video"):
+            video = self._get(video_id)
+            video.block()
 
     def change_visibility(
         self,
         video_id: str,
         visibility: VideoVisibility
     ) -> None:
-        video = self._get(video_id)
-        video.change_visibility(visibility)
+        with self._point("change_visibility"):
+            video = self._get(video_id)
+            video.change_visibility(visibility)
 
-    def mark_video_watched(self, video_id: str) -> None:
-        video = self._get(video_id)
-        if video.status == VideoStatus.PUBLISHED:
-            video.mark_watched()
+    def transition_many(
+        self,
+        video_ids: Iterable[str],
+        target_status: VideoStatus,
+        atomic: bool = False
+    ) -> Dict[str, BulkOutcome]:
+        video_ids = list(video_ids)
+        return self._scan(
+            "transition_many",
+            lambda: len(video_ids),
+            lambda: self._transition_many(video_ids, target_status, atomic)
+        )
+
+    def _transition_many(
+        self,
+        video_ids: List[str],
+        target_status: VideoStatus,
+        atomic: bool
+    ) -> Dict[str, BulkOutcome]:
+        allowed = ALLOWED_TRANSITIONS[target_status]
+        outcomes: Dict[str, BulkOutcome] = {}
+        changes: List[VideoBase] = []
+
+        for video_id in video_ids:
+            video = self.repository.find_by_id(video_id)
+            if video is None:
+                outcomes[video_id] = BulkOutcome.NOT_FOUND
+            elif video.status == target_status:
+                outcomes[video_id] = BulkOutcome.UNCHANGED
+            elif video.status not in allowed:
+                outcomes[video_id] = BulkOutcome.INVALID_STATE
+            else:
+                outcomes[video_id] = BulkOutcome.APPLIED
+                changes.append(video)
+
+        if atomic and any(
+            outcome in (BulkOutcome.NOT_FOUND, BulkOutcome.INVALID_STATE)
+            for outcome in outcomes.values()
+        ):
+            raise RuntimeError("Geçersiz state")
+
+        # UPLOADED -> PUBLISHED iki geçiştir.
+        with self._reserve(2 * len(changes)):
+            self.repository.apply_bulk(
+                changes, datetime.now(), status=target_status
+            )
+        # Alt sınıf kancası geçişi reddettiyse sonuç buna göre bildirilir.
+        for video in changes:
+            if video.status != target_status:
+                outcomes[video.video_id] = BulkOutcome.INVALID_STATE
+        return outcomes
+
+    def block_where(
+        self,
+        query: Optional[Callable[[VideoBase], bool]] = None,
+        channel_id: Optional[str] = None,
+        status: Optional[VideoStatus] = None,
+        visibility: Optional[VideoVisibility] = None
+    ) -> Dict[str, BulkOutcome]:
+        def block() -> Dict[str, BulkOutcome]:
+            candidates = self.repository.filter(
+                channel_id=channel_id,
+                status=status,
+                visibility=visibility
+            )
+            return self._transition_many(
+                [v.video_id for v in candidates if query is None or query(v)],
+                VideoStatus.BLOCKED,
+                False
+            )
+
+        return self._scan(
+            "block_where",
+            lambda: self.repository.index_size(channel_id, status, visibility),
+            block
+        )
+
+    def set_visibility_many(
+        self,
+        video_ids: Iterable[str],
+        visibility: VideoVisibility
+    ) -> Dict[str, BulkOutcome]:
+        video_ids = list(video_ids)
+        return self._scan(
+            "set_visibility_many",
+            lambda: len(video_ids),
+            lambda: self._set_visibility_many(video_ids, visibility)
+        )
+
+    def _set_visibility_many(
+        self,
+        video_ids: List[str],
+        visibility: VideoVisibility
+    ) -> Dict[str, BulkOutcome]:
+        outcomes: Dict[str, BulkOutcome] = {}
+        changes: List[VideoBase] = []
+
+        for video_id in video_ids:
+            video = self.repository.find_by_id(video_id)
+            if video is None:
+                outcomes[video_id] = BulkOutcome.NOT_FOUND
+            elif video.visibility == visibility:
+                outcomes[video_id] = BulkOutcome.UNCHANGED
+            else:
+                outcomes[video_id] = BulkOutcome.APPLIED
+                changes.append(video)
+
+        with self._reserve(len(changes)):
+            self.repository.apply_bulk(
+                changes, datetime.now(), visibility=visibility
+            )
+        return outcomes
+
+    def add_ratings(
+        self,
+        batch: Iterable[Tuple[str, int]]
+    ) -> Dict[str, BulkOutcome]:
+        batch = list(batch)
+        return self._scan(
+            "add_ratings",
+            lambda: len(batch),
+            lambda: self._add_ratings(batch)
+        )
+
+    def _add_ratings(
+        self,
+        batch: List[Tuple[str, int]]
+    ) -> Dict[str, BulkOutcome]:
+        grouped: Dict[str, List[int]] = defaultdict(list)
+        for video_id, rating in batch:
+            grouped[video_id].append(rating)
+
+        outcomes: Dict[str, BulkOutcome] = {}
+        for video_id, ratings in grouped.items():
+            video = self.repository.find_by_id(video_id)
+            if video is None:
+                outcomes[video_id] = BulkOutcome.NOT_FOUND
+                continue
+            with self._reserve(1):
+                applied = video.add_ratings(ratings)
+            outcomes[video_id] = (
+                BulkOutcome.APPLIED if applied else BulkOutcome.UNCHANGED
+            )
+        return outcomes
+
+    def mark_video_watched(
+        self,
+        video_id: str,
+        viewer_id: Optional[str] = None
+    ) -> None:
+        with self._point("mark_video_watched", events=2):
+            video = self._get(video_id)
+            if video.status == VideoStatus.PUBLISHED:
+                video.mark_watched(viewer_id)
+
+    def mark_videos_watched(
+        self,
+        items: Iterable[Tuple[str, Optional[str]]]
+    ) -> Dict[str, BulkOutcome]:
+        items = list(items)
+        return self._scan(
+            "mark_videos_watched",
+            lambda: len(items),
+            lambda: self._mark_videos_watched(items)
+        )
+
+    def _mark_videos_watched(
+        self,
+        items: List[Tuple[str, Optional[str]]]
+    ) -> Dict[str, BulkOutcome]:
+        grouped: Dict[str, List[Optional[str]]] = defaultdict(list)
+        for video_id, viewer_id in items:
+            grouped[video_id].append(viewer_id)
+
+        now = datetime.now()
+        outcomes: Dict[str, BulkOutcome] = {}
+        for video_id, viewer_ids in grouped.items():
+            video = self.repository.find_by_id(video_id)
+            if video is None:
+                outcomes[video_id] = BulkOutcome.NOT_FOUND
+            elif video.status != VideoStatus.PUBLISHED:
+                outcomes[video_id] = BulkOutcome.UNCHANGED
+            else:
+                with self._reserve(2):
+                    video.mark_watched_many(viewer_ids, now)
+                outcomes[video_id] = BulkOutcome.APPLIED
+        return outcomes
 
     def enable_subtitles(self, video_id: str) -> None:
-        video = self._get(video_id)
-        video.enable_subtitles()
+        with self._point("enable_subtitles", events=0):
+            video = self._get(video_id)
+            video.enable_subtitles()
 
     def disable_subtitles(self, video_id: str) -> None:
-        video = self._get(video_id)
-        video.disable_subtitles()
+        with self._point("disable_subtitles", events=0):
+            video = self._get(video_id)
+            video.disable_subtitles()
 
     def add_tag(self, video_id: str, tag: str) -> None:
-        video = self._get(video_id)
-        video.add_tag(tag)
+        with self._point("add_tag"):
+            video = self._get(video_id)
+            video.add_tag(tag)
+
+    def add_tags(
+        self,
+        items: Iterable[Tuple[str, str]]
+    ) -> Dict[str, BulkOutcome]:
+        items = list(items)
+        return self._scan(
+            "add_tags",
+            lambda: len(items),
+            lambda: self._add_tags(items)
+        )
+
+    def _add_tags(
+        self,
+        items: List[Tuple[str, str]]
+    ) -> Dict[str, BulkOutcome]:
+        grouped: Dict[str, List[str]] = defaultdict(list)
+        for video_id, tag in items:
+            grouped[video_id].append(tag)
+
+        outcomes: Dict[str, BulkOutcome] = {}
+        for video_id, tags in grouped.items():
+            video = self.repository.find_by_id(video_id)
+            if video is None:
+                outcomes[video_id] = BulkOutcome.NOT_FOUND
+                continue
+            before = len(video.tags)
+            with self._reserve(len(tags)):
+                for tag in tags:
+                    video.add_tag(tag)
+            outcomes[video_id] = (
+                BulkOutcome.APPLIED if len(video.tags) != before
+                else BulkOutcome.UNCHANGED
+            )
+        return outcomes
 
     def remove_tag(self, video_id: str, tag: str) -> None:
-        video = self._get(video_id)
-        video.remove_tag(tag)
+        with self._point("remove_tag"):
+            video = self._get(video_id)
+            video.remove_tag(tag)
 
     def list_all(self) -> List[VideoBase]:
-        return self.repository.find_all()
+        return self._scan(
+            "list_all",
+            self.repository.count,
+            self.repository.find_all,
+            lambda: self._degraded_scan("list_all"),
+            self._degraded_cost("list_all")
+        )
 
     def list_by_channel(self, channel_id: str) -> List[VideoBase]:
-        return self.repository.find_by_channel(channel_id)
+        return self._scan(
+            "list_by_channel",
+            lambda: self.repository.index_size(channel_id=channel_id),
+            lambda: self.repository.find_by_channel(channel_id)
+        )
 
     def list_by_status(self, status: VideoStatus) -> List[VideoBase]:
-        return self.repository.find_by_status(status)
+        return self._scan(
+            "list_by_status",
+            lambda: self.repository.index_size(status=status),
+            lambda: self.repository.find_by_status(status)
+        )
 
     def list_by_visibility(
         self,
         visibility: VideoVisibility
     ) -> List[VideoBase]:
-        return self.repository.find_by_visibility(visibility)
+        return self._scan(
+            "list_by_visibility",
+            lambda: self.repository.index_size(visibility=visibility),
+            lambda: self.repository.find_by_visibility(visibility)
+        )
 
     def list_public(self) -> List[VideoBase]:
-        return self.repository.find_public_videos()
+        return self.list_published_public()
 
     def list_uploaded_between(
         self,
         start: datetime,
         end: datetime
     ) -> List[VideoBase]:
-        return self.repository.find_uploaded_between(start, end)
+        return self._scan(
+            "list_uploaded_between",
+            self.repository.count,
+            lambda: self.repository.find_uploaded_between(start, end)
+        )
 
     def list_updated_between(
         self,
         start: datetime,
         end: datetime
     ) -> List[VideoBase]:
-        return self.repository.find_updated_between(start, end)
+        return self._scan(
+            "list_updated_between",
+            self.repository.count,
+            lambda: self.repository.find_updated_between(start, end)
+        )
 
     def list_published_public(
         self,
         channel_id: Optional[str] = None
     ) -> List[VideoBase]:
-        return self.repository.filter(
-            channel_id=channel_id,
-            status=VideoStatus.PUBLISHED,
-            visibility=VideoVisibility.PUBLIC
+        return self._scan(
+            "list_published_public",
+            lambda: self.repository.index_size(
+                channel_id,
+                VideoStatus.PUBLISHED,
+                VideoVisibility.PUBLIC
+            ),
+            lambda: self.repository.filter(
+                channel_id=channel_id,
+                status=VideoStatus.PUBLISHED,
+                visibility=VideoVisibility.PUBLIC
+            )
+        )
+
+    def list_filtered(
+        self,
+        channel_id: Optional[str] = None,
+        status: Optional[VideoStatus] = None,
+        visibility: Optional[VideoVisibility] = None
+    ) -> List[VideoBase]:
+        # Süzgeçsiz istek tam taramadır; list_all gibi kısaltılabilir.
+        if channel_id is None and status is None and visibility is None:
+            return self.list_all()
+        return self._scan(
+            "list_filtered",
+            lambda: self.repository.index_size(channel_id, status, visibility),
+            lambda: self.repository.filter(
+                channel_id=channel_id,
+                status=status,
+                visibility=visibility
+            )
         )
 
     def list_processing(self) -> List[VideoBase]:
-        return self.repository.find_by_status(VideoStatus.PROCESSING)
+        return self.list_by_status(VideoStatus.PROCESSING)
 
     def list_blocked(self) -> List[VideoBase]:
-        return self.repository.find_by_status(VideoStatus.BLOCKED)
+        return self.list_by_status(VideoStatus.BLOCKED)
 
     def list_unlisted(self) -> List[VideoBase]:
-        return self.repository.find_by_visibility(VideoVisibility.UNLISTED)
+        return self.list_by_visibility(VideoVisibility.UNLISTED)
 
     def any_blocked(self) -> bool:
         return self.repository.any_blocked()
@@ -136,23 +786,88 @@ class VideoService:
         return self.repository.any_published()
 
     def remove_video(self, video_id: str) -> bool:
-        return self.repository.remove(video_id)
+        with self._point("remove_video"):
+            return self.repository.remove(video_id)
 
     def paginate(
         self,
         page: int,
         page_size: int
     ) -> List[VideoBase]:
-        return self.repository.paginate(page, page_size)
+        if page < 1 or page_size < 1:
+            return []
+        offset = (page - 1) * page_size
+        limit = page_size
+        if self.admission is not None:
+            limit = min(page_size, self.admission.degrade_limit)
+        return self._scan(
+            "paginate",
+            self._sort_cost,
+            lambda: self.repository.paginate(page, page_size),
+            lambda: self._degraded_scan(
+                "paginate", offset, limit, stop=offset + page_size
+            ),
+            self._degraded_cost("paginate", offset, limit)
+        )
 
     def sort_by_created(self, reverse: bool = False) -> List[VideoBase]:
-        return self.repository.sort_by_created(reverse)
+        return self._scan(
+            "sort_by_created",
+            self._sort_cost,
+            lambda: self.repository.sort_by_created(reverse),
+            lambda: self._degraded_scan("sort_by_created", reverse=reverse),
+            self._degraded_cost("sort_by_created")
+        )
 
     def sort_by_updated(self, reverse: bool = False) -> List[VideoBase]:
-        return self.repository.sort_by_updated(reverse)
+        return self._scan(
+            "sort_by_updated",
+            self._sort_cost,
+            lambda: self.repository.sort_by_updated(reverse),
+            lambda: self._degraded_scan("sort_by_updated", reverse=reverse),
+            self._degraded_cost("sort_by_updated")
+        )
 
     def sort_by_title(self) -> List[VideoBase]:
-        return self.repository.sort_by_title()
+        return self._scan(
+            "sort_by_title",
+            self._sort_cost,
+            self.repository.sort_by_title,
+            lambda: self._degraded_scan("sort_by_title"),
+            self._degraded_cost("sort_by_title")
+        )
+
+    def resume(
+        self,
+        cursor: ScanCursor,
+        limit: Optional[int] = None
+    ) -> TruncatedResult:
+        # Kısaltılmış bir taramanın devamı; her parça yine bütçeden geçer.
+        # Anahtarlı cursor'da parça son anahtardan sonrasını seçer, maliyet
+        # derinlikle büyümez; bütçeyi aşan parça reddedilir.
+        if self.admission is None:
+            raise RuntimeError("Kabul kontrolü yok")
+        limit = limit or self.admission.degrade_limit
+        if cursor.stop is not None:
+            limit = max(1, min(limit, cursor.stop - cursor.offset))
+        depth = limit if cursor.after is not None else cursor.offset + limit
+        return self.admission.run(
+            cursor.op,
+            self.admission.scan_cost(cursor.op, self.repository.count(), depth),
+            lambda: self._degraded_scan(
+                cursor.op,
+                cursor.offset,
+                limit,
+                cursor.reverse,
+                cursor.after,
+                cursor.stop
+            )
+        )
+
+    def admission_metrics(self) -> dict:
+        if self.admission is None:
+            return {}
+        return self.admission.metrics()
 
     def channels(self) -> set[str]:
         return self.repository.channels()
@@ -163,6 +878,18 @@ class VideoService:
     def visibilities(self) -> set[VideoVisibility]:
         return self.repository.visibilities()
 
+    def unit_of_work(self) -> UnitOfWork:
+        return UnitOfWork(self)
+
+    def subscribe_changes(
+        self,
+        name: str,
+        from_seq: Optional[int] = None
+    ) -> Subscription:
+        if self.change_log is None:
+            raise RuntimeError("Değişiklik günlüğü yok")
+        return self.change_log.subscribe(name, from_seq)
+
     def _get(self, video_id: str) -> VideoBase:
         video = self.repository.find_by_id(video_id)
         if not video:
@@ -0,0 +1,371 @@
+import heapq
+import multiprocessing
+import threading
+import zlib
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from base import VideoBase, VideoStatus, VideoVisibility
+from repository import VideoRepository
+from services import VideoService
+
+
+def _shard_worker(conn) -> None:
+    repository = VideoRepository()
+    targets = {
+        "repository": repository,
+        "service": VideoService(repository)
+    }
+
+    while True:
+        message = conn.recv()
+        if message is None:
+            break
+
+        target, name, args = message
+        try:
+            if name == "upload_many":
+                result = []
+                for video in args[0]:
+                    try:
+                        targets["service"].upload_video(video)
+                    except ValueError:
+                        result.append(video.video_id)
+            else:
+                result = getattr(targets[target], name)(*args)
+            conn.send((True, result))
+        except Exception as exc:
+            conn.send((False, exc))
+
+    conn.close()
+
+
+class ShardedVideoService:
+    # Videolar channel_id hash'ine göre N işleme dağıtılır. Dönen videolar
+    # shard'daki nesnelerin kopyasıdır; değişiklikler servis üzerinden
+    # yapılmalıdır.
+
+    def __init__(
+        self,
+        shard_count: int = 4,
+        start_method: Optional[str] = None
+    ):
+        if shard_count < 1:
+            raise ValueError("Geçersiz shard sayısı")
+
+        context = multiprocessing.get_context(start_method)
+        self.shard_count = shard_count
+        self._connections = []
+        self._processes = []
+        self._locks = [threading.Lock() for _ in range(shard_count)]
+        self._directory: Dict[str, int] = {}
+
+        for _ in range(shard_count):
+            parent_conn, child_conn = context.Pipe()
+            process = context.Process(
+                target=_shard_worker,
+                args=(child_conn,),
+                daemon=True
+            )
+            process.start()
+            child_conn.close()
+            self._connections.append(parent_conn)
+            self._processes.append(process)
+
+    def shard_for(self, channel_id: str) -> int:
+        # hash() işlem başına tuzlandığı için sabit bir hash kullanılır.
+        return zlib.crc32(channel_id.encode("utf-8")) % self.shard_count
+
+    def _send(self, shard: int, target: str, name: str, args: tuple) -> None:
+        self._connections[shard].send((target, name, args))
+
+    def _receive(self, shard: int):
+        ok, result = self._connections[shard].recv()
+        if not ok:
+            raise result
+        return result
+
+    def _call(self, shard: int, target: str, name: str, *args):
+        with self._locks[shard]:
+            self._send(shard, target, name, args)
+            return self._receive(shard)
+
+    def _scatter(self, target: str, name: str, *args) -> list:
+        for lock in self._locks:
+            lock.acquire()
+        try:
+            for shard in range(self.shard_count):
+                self._send(shard, target, name, args)
+            results = []
+            error = None
+            for shard in range(self.shard_count):
+                try:
+                    results.append(self._receive(shard))
+                except Exception as exc:
+                    error = exc
+            if error is not None:
+                raise error
+            return results
+        finally:
+            for lock in self._locks:
+                lock.release()
+
+    def _route(self, video_id: str, name: str, *args):
+        shard = self._directory.get(video_id)
+        if shard is None:
+            raise LookupError("Video yok")
+        return self._call(shard, "service", name, video_id, *args)
+
+    @staticmethod
+    def _concat(results: List[list]) -> list:
+        merged = []
+        for result in results:
+            merged.extend(result)
+        return merged
+
+    @staticmethod
+    def _sum_counts(results: List[dict]) -> dict:
+        total = defaultdict(int)
+        for result in results:
+            for key, value in result.items():
+                total[key] += value
+        return dict(total)
+
+    def upload_video(self, video: VideoBase) -> None:
+        shard = self.shard_for(video.channel_id)
+        self._call(shard, "service", "upload_video", video)
+        self._directory[video.video_id] = shard
+
+    def upload_many(self, videos: Iterable[VideoBase]) -> List[str]:
+        groups: Dict[int, List[VideoBase]] = defaultdict(list)
+        for video in videos:
+            groups[self.shard_for(video.channel_id)].append(video)
+
+        rejected: List[str] = []
+        for lock in self._locks:
+            lock.acquire()
+        try:
+            for shard, group in groups.items():
+                self._send(shard, "service", "upload_many", (group,))
+            # Bir shard hata verse de diğerlerinin cevapları okunur; aksi
+            # halde bağlantıda kalan cevap sonraki çağrıya karışır.
+            error = None
+            for shard, group in groups.items():
+                try:
+                    rejected_ids = set(self._receive(shard))
+                except Exception as exc:
+                    error = exc
+                    continue
+                rejected.extend(rejected_ids)
+                for video in group:
+                    if video.video_id not in rejected_ids:
+                        self._directory[video.video_id] = shard
+            if error is not None:
+                raise error
+        finally:
+            for lock in self._locks:
+                lock.release()
+        return rejected
+
+    def start_processing(self, video_id: str) -> None:
+        self._route(video_id, "start_processing")
+
+    def publish_video(self, video_id: str) -> None:
+        self._route(video_id, "publish_video")
+
+    def process_and_publish(self, video_id: str) -> None:
+        self._route(video_id, "process_and_publish")
+
+    def unpublish_video(self, video_id: str) -> None:
+        self._route(video_id, "unpublish_video")
+
+    def block_video(self, video_id: str) -> None:
+        self._route(video_id, "block_video")
+
+    def change_visibility(
+        self,
+        video_id: str,
+        visibility: VideoVisibility
+    ) -> None:
+        self._route(video_id, "change_visibility", visibility)
+
+    def mark_video_watched(
+        self,
+        video_id: str,
+        viewer_id: Optional[str] = None
+    ) -> None:
+        self._route(video_id, "mark_video_watched", viewer_id)
+
+    def enable_subtitles(self, video_id: str) -> None:
+        self._route(video_id, "enable_subtitles")
+
+    def disable_subtitles(self, video_id: str) -> None:
+        self._route(video_id, "disable_subtitles")
+
+    def add_tag(self, video_id: str, tag: str) -> None:
+        self._route(video_id, "add_tag", tag)
+
+    def remove_tag(self, video_id: str, tag: str) -> None:
+        self._route(video_id, "remove_tag", tag)
+
+    def remove_video(self, video_id: str) -> bool:
+        if video_id not in self._directory:
+            return False
+        removed = self._route(video_id, "remove_video")
+        del self._directory[video_id]
+        return removed
+
+    def get_video(self, video_id: str) -> Optional[VideoBase]:
+        shard = self._directory.get(video_id)
+        if shard is None:
+            return None
+        return self._call(shard, "repository", "find_by_id", video_id)
+
+    def list_all(self) -> List[VideoBase]:
+        return self._concat(self._scatter("service", "list_all"))
+
+    def list_by_channel(self, channel_id: str) -> List[VideoBase]:
+        return self._call(
+            self.shard_for(channel_id),
+            "service",
+            "list_by_channel",
+            channel_id
+        )
+
+    def list_by_status(self, status: VideoStatus) -> List[VideoBase]:
+        return self._concat(self._scatter("service", "list_by_status", status))
+
+    def list_by_visibility(
+        self,
+        visibility: VideoVisibility
+    ) -> List[VideoBase]:
+        return self._concat(
+            self._scatter("service", "list_by_visibility", visibility)
+        )
+
+    def list_public(self) -> List[VideoBase]:
+        return self._concat(self._scatter("service", "list_public"))
+
+    def list_uploaded_between(
+        self,
+        start: datetime,
+        end: datetime
+    ) -> List[VideoBase]:
+        return self._concat(
+            self._scatter("service", "list_uploaded_between", start, end)
+        )
+
+    def list_updated_between(
+        self,
+        start: datetime,
+        end: datetime
+    ) -> List[VideoBase]:
+        return self._concat(
+            self._scatter("service", "list_updated_between", start, end)
+        )
+
+    def list_published_public(
+        self,
+        channel_id: Optional[str] = None
+    ) -> List[VideoBase]:
+        if channel_id is not None:
+            return self._call(
+                self.shard_for(channel_id),
+                "service",
+                "list_published_public",
+                channel_id
+            )
+        return self._concat(self._scatter("service", "list_published_public"))
+
+    def list_processing(self) -> List[VideoBase]:
+        return self.list_by_status(VideoStatus.PROCESSING)
+
+    def list_blocked(self) -> List[VideoBase]:
+        return self.list_by_status(VideoStatus.BLOCKED)
+
+    def list_unlisted(self) -> List[VideoBase]:
+        return self.list_by_visibility(VideoVisibility.UNLISTED)
+
+    def any_blocked(self) -> bool:
+        return any(self._scatter("service", "any_blocked"))
+
+    def any_published(self) -> bool:
+        return any(self._scatter("service", "any_published"))
+
+    def paginate(self, page: int, page_size: int) -> List[VideoBase]:
+        if page < 1 or page_size < 1:
+            return []
+
+        # Her shard yalnızca kendi ilk page * page_size videosunu döner.
+        start = (page - 1) * page_size
+        shard_results = self._scatter("repository", "oldest", start + page_size)
+        merged = heapq.merge(*shard_results, key=lambda v: v.created_at)
+        return list(merged)[start:start + page_size]
+
+    def sort_by_created(self, reverse: bool = False) -> List[VideoBase]:
+        return list(heapq.merge(
+            *self._scatter("service", "sort_by_created", reverse),
+            key=lambda v: v.created_at,
+            reverse=reverse
+        ))
+
+    def sort_by_updated(self, reverse: bool = False) -> List[VideoBase]:
+        return list(heapq.merge(
+            *self._scatter("service", "sort_by_updated", reverse),
+            key=lambda v: v.updated_at or v.created_at,
+            reverse=reverse
+        ))
+
+    def sort_by_title(self) -> List[VideoBase]:
+        return list(heapq.merge(
+            *self._scatter("service", "sort_by_title"),
+            key=lambda v: v.title.lower()
+        ))
+
+    def channels(self) -> set[str]:
+        return set().union(*self._scatter("service", "channels"))
+
+    def statuses(self) -> set[VideoStatus]:
+        return set().union(*self._scatter("service", "statuses"))
+
+    def visibilities(self) -> set[VideoVisibility]:
+        return set().union(*self._scatter("service", "visibilities"))
+
+    def count(self) -> int:
+        return sum(self._scatter("repository", "count"))
+
+    def count_by_channel(self) -> Dict[str, int]:
+        return self._sum_counts(self._scatter("repository", "count_by_channel"))
+
+    def count_by_status(self) -> Dict[VideoStatus, int]:
+        return self._sum_counts(self._scatter("repository", "count_by_status"))
+
+    def count_by_visibility(self) -> Dict[VideoVisibility, int]:
+        return self._sum_counts(
+            self._scatter("repository", "count_by_visibility")
+        )
+
+    def close(self) -> None:
+        for shard, conn in enumerate(self._connections):
+            with self._locks[shard]:
+                try:
+                    conn.send(None)
+                except (BrokenPipeError, OSError):
+                    pass
+                conn.close()
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self._connections = []
+        self._processes = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __len__(self):
+        return self.count()
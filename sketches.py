@@ -0,0 +1,248 @@
+import math
+import struct
+from array import array
+from hashlib import blake2b
+from typing import Dict, List, Optional, Tuple
+
+from base import ChangeType, VideoBase
+from repository import VideoRepository
+
+
+def _hash64(item: str) -> int:
+    return int.from_bytes(
+        blake2b(item.encode("utf-8"), digest_size=8).digest(), "big"
+    )
+
+
+def _hash128(item: str) -> Tuple[int, int]:
+    digest = blake2b(item.encode("utf-8"), digest_size=16).digest()
+    return (
+        int.from_bytes(digest[:8], "big"),
+        int.from_bytes(digest[8:], "big") | 1
+    )
+
+
+class HyperLogLog:
+
+    def __init__(self, precision: int = 12):
+        if not 4 <= precision <= 16:
+            raise ValueError("Geçersiz hassasiyet")
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    def add(self, item: str) -> None:
+        value = _hash64(item)
+        index = value >> (64 - self.precision)
+        rest = value & ((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def count(self) -> int:
+        m = len(self.registers)
+        if m == 16:
+            alpha = 0.673
+        elif m == 32:
+            alpha = 0.697
+        elif m == 64:
+            alpha = 0.709
+        else:
+            alpha = 0.7213 / (1 + 1.079 / m)
+
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            # Küçük kümelerde linear counting daha isabetli.
+            estimate = m * math.log(m / zeros)
+        return round(estimate)
+
+    def merge(self, other: "HyperLogLog") -> None:
+        if other.precision != self.precision:
+            raise ValueError("Hassasiyetler uyuşmuyor")
+        for i, rank in enumerate(other.registers):
+            if rank > self.registers[i]:
+                self.registers[i] = rank
+
+    def to_bytes(self) -> bytes:
+        return bytes([self.precision]) + bytes(self.registers)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "HyperLogLog":
+        sketch = cls(data[0])
+        if len(data) - 1 != len(sketch.registers):
+            raise ValueError("Geçersiz sketch verisi")
+        sketch.registers[:] = data[1:]
+        return sketch
+
+    def memory_bytes(self) -> int:
+        return len(self.registers)
+
+    def __len__(self):
+        return self.count()
+
+
+class CountMinSketch:
+
+    HEADER = struct.Struct(">II")
+
+    def __init__(self, width: int = 2048, depth: int = 4):
+        if width < 1 or depth < 1:
+            raise ValueError("Geçersiz boyut")
+        self.width = width
+        self.depth = depth
+        self.table = array("q", [0]) * (width * depth)
+
+    def _slots(self, item: str) -> List[int]:
+        h1, h2 = _hash128(item)
+        return [
+            row * self.width + (h1 + row * h2) % self.width
+            for row in range(self.depth)
+        ]
+
+    def add(self, item: str, count: int = 1) -> int:
+        estimate = None
+        for slot in self._slots(item):
+            self.table[slot] += count
+            value = self.table[slot]
+            if estimate is None or value < estimate:
+                estimate = value
+        return estimate
+
+    def estimate(self, item: str) -> int:
+        return min(self.table[slot] for slot in self._slots(item))
+
+    def merge(self, other: "CountMinSketch") -> None:
+        if (other.width, other.depth) != (self.width, self.depth):
+            raise ValueError("Boyutlar uyuşmuyor")
+        for i, value in enumerate(other.table):
+            self.table[i] += value
+
+    def to_bytes(self) -> bytes:
+        return self.HEADER.pack(self.width, self.depth) + self.table.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "CountMinSketch":
+        width, depth = cls.HEADER.unpack_from(data)
+        sketch = cls(width, depth)
+        table = array("q")
+        table.frombytes(data[cls.HEADER.size:])
+        if len(table) != width * depth:
+            raise ValueError("Geçersiz sketch verisi")
+        sketch.table = table
+        return sketch
+
+    def memory_bytes(self) -> int:
+        return self.table.itemsize * len(self.table)
+
+
+class HeavyHitters:
+    # Count-min tahminine göre en yüksek k adayı tutar.
+
+    def __init__(self, k: int = 20, width: int = 2048, depth: int = 4):
+        self.k = k
+        self.sketch = CountMinSketch(width, depth)
+        self._candidates: Dict[str, int] = {}
+
+    def add(self, item: str, count: int = 1) -> None:
+        estimate = self.sketch.add(item, count)
+        if item in self._candidates or len(self._candidates) < self.k:
+            self._candidates[item] = estimate
+            return
+
+        weakest = min(self._candidates, key=self._candidates.get)
+        if estimate > self._candidates[weakest]:
+            del self._candidates[weakest]
+            self._candidates[item] = estimate
+
+    def estimate(self, item: str) -> int:
+        return self.sketch.estimate(item)
+
+    def top(self, n: Optional[int] = None) -> List[Tuple[str, int]]:
+        ranked = sorted(
+            self._candidates.items(),
+            key=lambda pair: pair[1],
+            reverse=True
+        )
+        return ranked[:n] if n is not None else ranked
+
+    def merge(self, other: "HeavyHitters") -> None:
+        self.sketch.merge(other.sketch)
+        items = set(self._candidates) | set(other._candidates)
+        estimates = {item: self.sketch.estimate(item) for item in items}
+        self._candidates = dict(
+            sorted(estimates.items(), key=lambda pair: pair[1], reverse=True)
+            [:self.k]
+        )
+
+
+class SketchLayer:
+
+    def __init__(self, precision: int = 10, top_k: int = 20):
+        self.precision = precision
+        self._videos: Dict[str, HyperLogLog] = {}
+        self._channels: Dict[str, HyperLogLog] = {}
+        self.tags = HeavyHitters(top_k)
+        self.channel_popularity = HeavyHitters(top_k)
+
+    def attach(self, repository: VideoRepository) -> None:
+        repository.add_listener(self._on_change)
+
+    def detach(self, repository: VideoRepository) -> None:
+        repository.remove_listener(self._on_change)
+
+    def _on_change(
+        self,
+        video: VideoBase,
+        change_type: ChangeType,
+        payload: dict
+    ) -> None:
+        if change_type == ChangeType.VIEWERS_SEEN:
+            for viewer_id in payload["viewer_ids"]:
+                self.record_view(video, viewer_id)
+        elif change_type == ChangeType.REMOVED:
+            self._videos.pop(video.video_id, None)
+
+    def record_view(self, video: VideoBase, viewer_id: str) -> None:
+        sketch = self._videos.get(video.video_id)
+        if sketch is None:
+            sketch = self._videos[video.video_id] = HyperLogLog(self.precision)
+        sketch.add(viewer_id)
+
+        sketch = self._channels.get(video.channel_id)
+        if sketch is None:
+            sketch = self._channels[video.channel_id] = HyperLogLog(
+                self.precision
+            )
+        sketch.add(viewer_id)
+
+        for tag in video.tags:
+            self.tags.add(tag)
+        self.channel_popularity.add(video.channel_id)
+
+    def distinct_viewers(self, video_id: str) -> int:
+        sketch = self._videos.get(video_id)
+        return sketch.count() if sketch is not None else 0
+
+    def channel_distinct_viewers(self, channel_id: str) -> int:
+        sketch = self._channels.get(channel_id)
+        return sketch.count() if sketch is not None else 0
+
+    def video_sketch(self, video_id: str) -> Optional[HyperLogLog]:
+        return self._videos.get(video_id)
+
+    def channel_sketch(self, channel_id: str) -> Optional[HyperLogLog]:
+        return self._channels.get(channel_id)
+
+    def top_tags(self, n: int = 10) -> List[Tuple[str, int]]:
+        return self.tags.top(n)
+
+    def top_channels(self, n: int = 10) -> List[Tuple[str, int]]:
+        return self.channel_popularity.top(n)
+
+    def memory_bytes(self) -> int:
+        return (
+            sum(s.memory_bytes() for s in self._videos.values())
+            + sum(s.memory_bytes() for s in self._channels.values())
+            + self.tags.sketch.memory_bytes()
+            + self.channel_popularity.sketch.memory_bytes()
+        )
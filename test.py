@@ -1,14 +1,46 @@
+import asyncio
+import gc
+import json
+import os
+import tempfile
+import time
 import unittest
 from datetime import datetime, timedelta
+from urllib.parse import quote
 
-from base import VideoStatus, VideoVisibility
+from admission import AdmissionController, AdmissionRejected
+from async_service import AsyncVideoService
+from base import ChangeType, VideoBase, VideoStatus, VideoVisibility
+from events import ChangeLog
 from implementations import (
     StandardVideo,
     ShortVideo,
     LiveStreamVideo
 )
+from related import RelatedIndex
 from repository import VideoRepository
-from services import VideoService
+from ratings import RatingIndex
+from retention import RetentionRunner, blocked_for, never_processed_for
+from rollups import RollupStore
+from scheduler import ManualClock, StreamScheduler
+from server import AsyncVideoClient, VideoHttpServer
+from services import BulkOutcome, VideoService
+from sharding import ShardedVideoService
+from sketches import CountMinSketch, HyperLogLog, SketchLayer
+from tiered import TieredVideoRepository
+from trending import TrendingEngine
+from validation import (
+    Rule,
+    ValidationRegistry,
+    validate_parallel,
+    validate_stream
+)
+from workload import (
+    ReplayDriver,
+    WorkloadRecorder,
+    generate_demo_mix,
+    load_trace
+)
 
 
 class TestVideoCreation(unittest.TestCase):
@@ -142,5 +174,1733 @@ class TestRepositoryFilters(unittest.TestCase):
         videos = self.repo.find_uploaded_between(start, end)
         self.assertEqual(len(videos), 3)
 
+class TestChangeEvents(unittest.TestCase):
+
+    def setUp(self):
+        self.repo = VideoRepository()
+        self.log = ChangeLog(capacity=8)
+        self.service = VideoService(self.repo, change_log=self.log)
+
+        self.video = StandardVideo(
+            channel_id="channel_1",
+            title="Olay Testi",
+            duration_seconds=300,
+            visibility=VideoVisibility.PUBLIC
+        )
+
+    def test_mutations_emit_typed_events(self):
+        sub = self.service.subscribe_changes("search")
+
+        self.service.upload_video(self.video)
+        self.service.process_and_publish(self.video.video_id)
+        self.service.add_tag(self.video.video_id, "python")
+        self.service.mark_video_watched(self.video.video_id)
+        self.service.change_visibility(
+            self.video.video_id, VideoVisibility.PRIVATE
+        )
+        self.service.remove_video(self.video.video_id)
+
+        events = sub.poll(100)
+        self.assertEqual(
+            [e.change_type for e in events],
+            [
+                ChangeType.CREATED,
+                ChangeType.STATUS_CHANGED,
+                ChangeType.STATUS_CHANGED,
+                ChangeType.TAG_ADDED,
+                ChangeType.STATS_DELTA,
+                ChangeType.VISIBILITY_CHANGED,
+                ChangeType.REMOVED
+            ]
+        )
+        self.assertEqual(
+            [e.seq for e in events], list(range(1, len(events) + 1))
+        )
+        self.assertEqual(events[2].payload["new"], VideoStatus.PUBLISHED)
+
+    def test_subscribers_read_at_own_offsets(self):
+        fast = self.log.subscribe("fast")
+        slow = self.log.subscribe("slow")
+
+        self.service.upload_video(self.video)
+        self.service.add_tag(self.video.video_id, "a")
+
+        self.assertEqual(len(fast.poll(1)), 1)
+        self.assertEqual(len(fast.poll(10)), 1)
+        self.assertEqual(fast.poll(10), [])
+        self.assertEqual(slow.lag(), 2)
+        self.assertEqual(len(slow.poll(10)), 2)
+
+    def test_overflow_skips_lagging_subscriber(self):
+        sub = self.log.subscribe("lagging")
+        self.service.upload_video(self.video)
+        for i in range(10):
+            self.service.add_tag(self.video.video_id, f"tag{i}")
+
+        events = sub.poll(100)
+        self.assertEqual(sub.missed, 3)
+        self.assertEqual(len(events), 8)
+        self.assertEqual(events[-1].seq, 11)
+
+    def test_blocking_log_applies_backpressure(self):
+        log = ChangeLog(capacity=2, block_timeout=0.01)
+        log.subscribe("slow")
+        log.append(ChangeType.CREATED, "v1", "c", "StandardVideo")
+        log.append(ChangeType.CREATED, "v2", "c", "StandardVideo")
+
+        with self.assertRaises(BufferError):
+            log.append(ChangeType.CREATED, "v3", "c", "StandardVideo")
+
+    def test_full_log_rejects_service_calls_before_the_change(self):
+        log = ChangeLog(capacity=2, block_timeout=0.01)
+        service = VideoService(VideoRepository(), change_log=log)
+        sub = log.subscribe("slow")
+        service.upload_video(self.video)
+
+        # İki durum olayı için yer yok: video ve indeksler değişmez.
+        with self.assertRaises(BufferError):
+            service.process_and_publish(self.video.video_id)
+        self.assertEqual(self.video.status, VideoStatus.UPLOADED)
+        self.assertEqual(
+            service.repository.find_by_status(VideoStatus.UPLOADED),
+            [self.video]
+        )
+        self.assertEqual(log.last_seq, 1)
+
+        self.assertEqual(len(sub.poll()), 1)
+        service.process_and_publish(self.video.video_id)
+        self.assertEqual(
+            [e.change_type for e in sub.poll()],
+            [ChangeType.STATUS_CHANGED, ChangeType.STATUS_CHANGED]
+        )
+        self.assertEqual(log._reserved, 0)
+
+
+class TestShardedService(unittest.TestCase):
+
+    def setUp(self):
+        self.service = ShardedVideoService(shard_count=3)
+        self.videos = []
+        started = datetime(2024, 1, 1)
+        for i in range(12):
+            video = StandardVideo(
+                channel_id=f"channel_{i % 4}",
+                title=f"Shard {i:02d}",
+                duration_seconds=100 + i,
+                visibility=VideoVisibility.PUBLIC
+            )
+            # Aynı saat tikinde oluşan videoların sırası belirsiz kalmasın.
+            video.created_at = started + timedelta(seconds=i)
+            self.videos.append(video)
+        self.service.upload_many(self.videos)
+
+    def tearDown(self):
+        self.service.close()
+
+    def test_per_channel_calls_hit_one_shard(self):
+        videos = self.service.list_by_channel("channel_1")
+        self.assertEqual(len(videos), 3)
+
+        video_id = self.videos[0].video_id
+        self.service.process_and_publish(video_id)
+        self.assertEqual(
+            self.service.get_video(video_id).status, VideoStatus.PUBLISHED
+        )
+
+    def test_scatter_gather_matches_single_repository(self):
+        self.service.block_video(self.videos[5].video_id)
+
+        self.assertEqual(self.service.count(), 12)
+        self.assertEqual(
+            self.service.count_by_status(),
+            {VideoStatus.UPLOADED: 11, VideoStatus.BLOCKED: 1}
+        )
+        self.assertEqual(
+            [v.video_id for v in self.service.sort_by_created()],
+            [v.video_id for v in self.videos]
+        )
+        self.assertEqual(
+            [v.video_id for v in self.service.paginate(2, 5)],
+            [v.video_id for v in self.videos[5:10]]
+        )
+        self.assertEqual(
+            [v.title for v in self.service.sort_by_title()],
+            sorted(v.title for v in self.videos)
+        )
+
+    def test_unknown_video_raises(self):
+        with self.assertRaises(LookupError):
+            self.service.block_video("yok")
+
+    def test_failed_bulk_upload_keeps_shards_in_sync(self):
+        broken = StandardVideo(
+            channel_id="channel_1",
+            title="Bozuk",
+            duration_seconds=100,
+            visibility=VideoVisibility.PUBLIC
+        )
+        broken.tags = None
+        broken_shard = self.service.shard_for("channel_1")
+        fresh = [
+            StandardVideo(
+                channel_id=f"yeni_{i}",
+                title=f"Yeni {i}",
+                duration_seconds=100,
+                visibility=VideoVisibility.PUBLIC
+            )
+            for i in range(20)
+        ]
+        fresh = [
+            video for video in fresh
+            if self.service.shard_for(video.channel_id) != broken_shard
+        ]
+        with self.assertRaises(TypeError):
+            self.service.upload_many([broken] + fresh)
+
+        # Hata veren shard'dan sonraki cevaplar da okunduğu için sonraki
+        # çağrılar kendi cevaplarını alır.
+        self.assertEqual(self.service.count(), 12 + len(fresh))
+        video_id = fresh[0].video_id
+        self.assertEqual(self.service.get_video(video_id).video_id, video_id)
+
+
+class TestStreamScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.repo = VideoRepository()
+        self.service = VideoService(self.repo)
+        self.clock = ManualClock(datetime(2026, 1, 1, 12, 0))
+        self.scheduler = StreamScheduler(clock=self.clock, batch_size=2)
+        self.scheduler.attach(self.repo)
+
+        self.streams = []
+        for hours in (3, 1, 2):
+            video = LiveStreamVideo(
+                channel_id="live_channel",
+                title=f"Yayın {hours}",
+                scheduled_time=self.clock.now + timedelta(hours=hours)
+            )
+            self.service.upload_video(video)
+            self.streams.append(video)
+
+    def test_upcoming_in_schedule_order(self):
+        upcoming = self.scheduler.upcoming(2)
+        self.assertEqual(upcoming, [self.streams[1], self.streams[2]])
+        self.assertEqual(self.scheduler.next_due(), self.streams[1])
+
+    def test_tick_starts_due_streams_in_batches(self):
+        self.assertEqual(self.scheduler.tick(), [])
+
+        self.clock.advance(timedelta(hours=5))
+        self.assertEqual(len(self.scheduler.tick()), 2)
+        self.assertEqual(len(self.scheduler.tick()), 1)
+
+        self.assertTrue(all(v.is_live for v in self.streams))
+        self.assertEqual(self.scheduler.pending_count(), 0)
+        self.assertEqual(
+            self.scheduler.live_ids(), {v.video_id for v in self.streams}
+        )
+
+        self.scheduler.end_stream(self.streams[0].video_id, 3600)
+        self.assertFalse(self.streams[0].is_live)
+        self.assertEqual(len(self.scheduler.live_streams()), 2)
+
+    def test_reschedule_cancel_and_remove(self):
+        self.scheduler.reschedule(
+            self.streams[0].video_id,
+            self.clock.now + timedelta(minutes=10)
+        )
+        self.scheduler.cancel(self.streams[2].video_id)
+        self.service.remove_video(self.streams[1].video_id)
+
+        self.clock.advance(timedelta(hours=4))
+        self.assertEqual(self.scheduler.run_pending(), [self.streams[0]])
+
+
+class TestRollupStore(unittest.TestCase):
+
+    def setUp(self):
+        self.repo = VideoRepository()
+        self.service = VideoService(self.repo)
+        self.clock = ManualClock(datetime(2026, 1, 1, 12, 0))
+        self.rollups = RollupStore(clock=self.clock)
+        self.rollups.attach(self.repo)
+
+        self.video = StandardVideo(
+            channel_id="channel_1",
+            title="Rollup",
+            duration_seconds=300,
+            visibility=VideoVisibility.PUBLIC
+        )
+        self.service.upload_video(self.video)
+        self.service.process_and_publish(self.video.video_id)
+
+    def test_windowed_views_and_ratings(self):
+        self.service.mark_video_watched(self.video.video_id)
+        self.clock.advance(timedelta(minutes=30))
+        self.service.mark_video_watched(self.video.video_id)
+        self.video.add_watch_time(120)
+        self.video.add_rating(4)
+        self.video.add_rating(2)
+
+        vid = self.video.video_id
+        self.assertEqual(self.rollups.video_views(vid, timedelta(minutes=5)), 1)
+        self.assertEqual(self.rollups.video_views(vid, timedelta(hours=1)), 2)
+        self.assertEqual(self.rollups.channel_views("channel_1", timedelta(days=1)), 2)
+        self.assertEqual(
+            self.rollups.video_total(vid, "watch_time_seconds", timedelta(hours=1)),
+            120
+        )
+        self.assertEqual(self.rollups.average_rating(vid, timedelta(hours=1)), 3.0)
+
+    def test_old_buckets_roll_over(self):
+        self.video.increment_views(5)
+        self.clock.advance(timedelta(hours=2))
+        self.video.increment_views(1)
+
+        vid = self.video.video_id
+        self.assertEqual(self.rollups.video_views(vid, timedelta(hours=1)), 1)
+        self.assertEqual(self.rollups.video_views(vid, timedelta(hours=3)), 6)
+
+        self.clock.advance(timedelta(days=40))
+        self.assertEqual(self.rollups.video_views(vid, timedelta(days=30)), 0)
+        self.assertEqual(
+            len(self.rollups.video_series(vid, "views", "hour")), 24
+        )
+
+    def test_series_store_only_written_buckets(self):
+        vid = self.video.video_id
+        self.video.increment_views(1)
+        minute, hour, day = self.rollups._videos[vid]
+        self.assertEqual(
+            [len(s.epochs) for s in (minute, hour, day)], [1, 1, 1]
+        )
+
+        for _ in range(90):
+            self.clock.advance(timedelta(minutes=1))
+            self.video.increment_views(1)
+        self.assertEqual(len(minute.epochs), 60)
+        self.assertEqual(len(minute.values), 60 * 4)
+
+        # Pencere içindeki geç kayıt kendi dilimine, dışındaki atılır.
+        now = self.clock()
+        self.rollups.record(
+            vid, "channel_1", "views", 10, now - timedelta(minutes=5)
+        )
+        self.rollups.record(
+            vid, "channel_1", "views", 99, now - timedelta(hours=2)
+        )
+        self.assertEqual(self.rollups.video_views(vid, timedelta(minutes=10)), 20)
+        series = self.rollups.video_series(vid, "views")
+        self.assertEqual(series[-6], 11)
+        self.assertEqual(self.rollups.video_views(vid, timedelta(hours=1)), 70)
+        self.assertEqual(self.rollups.video_views(vid, timedelta(hours=3)), 200)
+
+
+class TestTrendingEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.repo = VideoRepository()
+        self.service = VideoService(self.repo)
+        self.clock = ManualClock(datetime(2026, 1, 1, 12, 0))
+        self.engine = TrendingEngine(
+            half_life=timedelta(hours=1), capacity=3, clock=self.clock
+        )
+        self.engine.attach(self.repo)
+
+        self.videos = []
+        for i in range(5):
+            video = ShortVideo(
+                channel_id=f"channel_{i % 2}",
+                title=f"Trend {i}",
+                duration_seconds=30,
+                visibility=VideoVisibility.PUBLIC
+            )
+            self.service.upload_video(video)
+            self.videos.append(video)
+
+    def test_top_k_matches_brute_force(self):
+        for i, video in enumerate(self.videos):
+            video.increment_views(i + 1)
+        self.videos[0].increment_shares(2)
+        self.videos[1].increment_loop()
+
+        expected = sorted(
+            self.videos,
+            key=lambda v: -self.engine.score(v.video_id)
+        )[:3]
+        self.assertEqual(
+            [vid for vid, _ in self.engine.trending(3)],
+            [v.video_id for v in expected]
+        )
+        self.assertAlmostEqual(
+            self.engine.score(self.videos[0].video_id), 7.0
+        )
+
+    def test_decay_favours_recent_activity(self):
+        old, recent = self.videos[0], self.videos[2]
+        old.increment_views(10)
+        self.clock.advance(timedelta(hours=3))
+        recent.increment_views(3)
+
+        top = self.engine.trending(1, "channel", "channel_0")
+        self.assertEqual(top[0][0], recent.video_id)
+        self.assertAlmostEqual(self.engine.score(old.video_id), 1.25)
+
+    def test_scopes_and_removal(self):
+        self.videos[1].increment_views(5)
+        self.videos[3].increment_views(2)
+
+        self.assertEqual(
+            [vid for vid, _ in self.engine.trending(5, "channel", "channel_1")],
+            [self.videos[1].video_id, self.videos[3].video_id]
+        )
+        self.assertEqual(len(self.engine.trending(5, "type", "ShortVideo")), 2)
+
+        self.service.remove_video(self.videos[1].video_id)
+        self.assertEqual(
+            [vid for vid, _ in self.engine.trending(5)],
+            [self.videos[3].video_id]
+        )
+
+    def test_removal_refills_from_outside_the_board(self):
+        for i, video in enumerate(self.videos):
+            video.increment_views(i + 1)
+        self.service.remove_video(self.videos[4].video_id)
+        self.service.remove_video(self.videos[2].video_id)
+
+        self.assertEqual(
+            [vid for vid, _ in self.engine.trending(3)],
+            [self.videos[i].video_id for i in (3, 1, 0)]
+        )
+        self.assertEqual(
+            [vid for vid, _ in self.engine.trending(3, "channel", "channel_0")],
+            [self.videos[0].video_id]
+        )
+
+
+    def test_removals_refill_from_reserve_without_full_scans(self):
+        class CountingScores(dict):
+            scans = 0
+
+            def __iter__(self):
+                CountingScores.scans += 1
+                return super().__iter__()
+
+            def items(self):
+                CountingScores.scans += 1
+                return super().items()
+
+        engine = TrendingEngine(
+            half_life=timedelta(hours=1), capacity=3, clock=self.clock
+        )
+        engine._scores = CountingScores()
+        ids = [f"v{i}" for i in range(40)]
+        for i, video_id in enumerate(ids):
+            engine.record(video_id, f"c{i % 4}", "ShortVideo", (i * 7) % 40 + 1)
+
+        removed = []
+        for video_id in sorted(ids, key=engine.score, reverse=True)[:12]:
+            engine.forget(video_id)
+            removed.append(video_id)
+            for scope, key, members in (
+                ("global", None, ids),
+                ("channel", "c1", ids[1::4]),
+            ):
+                expected = sorted(
+                    (vid for vid in members if vid not in removed),
+                    key=lambda vid: (-engine.score(vid), vid)
+                )[:3]
+                self.assertEqual(
+                    [vid for vid, _ in engine.trending(3, scope, key)],
+                    expected
+                )
+
+        self.assertLessEqual(CountingScores.scans, 4)
+
+class TestSketches(unittest.TestCase):
+
+    def setUp(self):
+        self.repo = VideoRepository()
+        self.service = VideoService(self.repo)
+        self.sketches = SketchLayer(precision=10)
+        self.sketches.attach(self.repo)
+
+        self.video = StandardVideo(
+            channel_id="channel_1",
+            title="Sketch",
+            duration_seconds=300,
+            visibility=VideoVisibility.PUBLIC
+        )
+        self.service.upload_video(self.video)
+        self.service.process_and_publish(self.video.video_id)
+        self.service.add_tag(self.video.video_id, "python")
+
+    def test_distinct_viewers_ignore_repeat_views(self):
+        for i in range(300):
+            self.service.mark_video_watched(
+                self.video.video_id, viewer_id=f"viewer_{i % 100}"
+            )
+        self.service.mark_video_watched(self.video.video_id)
+
+        self.assertEqual(self.video.view_count, 301)
+        self.assertAlmostEqual(
+            self.sketches.distinct_viewers(self.video.video_id), 100, delta=5
+        )
+        self.assertEqual(self.sketches.top_tags(1)[0], ("python", 300))
+        self.assertEqual(self.sketches.top_channels(1)[0][0], "channel_1")
+
+    def test_viewer_ids_travel_outside_stats_delta(self):
+        events = []
+        self.repo.add_listener(
+            lambda video, change_type, payload: events.append(
+                (change_type, payload)
+            )
+        )
+        self.service.mark_video_watched(self.video.video_id, "viewer_1")
+        self.service.mark_videos_watched([
+            (self.video.video_id, "viewer_2"),
+            (self.video.video_id, None)
+        ])
+
+        self.assertEqual(events, [
+            (ChangeType.STATS_DELTA, {"views": 1}),
+            (ChangeType.VIEWERS_SEEN, {"viewer_ids": ["viewer_1"]}),
+            (ChangeType.STATS_DELTA, {"views": 2}),
+            (ChangeType.VIEWERS_SEEN, {"viewer_ids": ["viewer_2"]})
+        ])
+        self.assertEqual(self.sketches.distinct_viewers(self.video.video_id), 2)
+
+    def test_hyperloglog_merge_and_serialize(self):
+        first, second = HyperLogLog(12), HyperLogLog(12)
+        for i in range(5000):
+            first.add(f"u{i}")
+            second.add(f"u{i + 2500}")
+        first.merge(second)
+
+        restored = HyperLogLog.from_bytes(first.to_bytes())
+        self.assertEqual(restored.count(), first.count())
+        self.assertAlmostEqual(first.count(), 7500, delta=7500 * 0.05)
+
+    def test_count_min_never_underestimates(self):
+        sketch = CountMinSketch(width=64, depth=3)
+        for i in range(1000):
+            sketch.add(f"tag{i % 50}")
+
+        restored = CountMinSketch.from_bytes(sketch.to_bytes())
+        for i in range(50):
+            self.assertGreaterEqual(restored.estimate(f"tag{i}"), 20)
+
+
+class TestBulkTransitions(unittest.TestCase):
+
+    def setUp(self):
+        self.repo = VideoRepository()
+        self.log = ChangeLog()
+        self.service = VideoService(self.repo, change_log=self.log)
+
+        self.videos = []
+        for i in range(6):
+            video = StandardVideo(
+                channel_id=f"channel_{i % 2}",
+                title=f"Toplu {i}",
+                duration_seconds=300,
+                visibility=VideoVisibility.PUBLIC
+            )
+            self.service.upload_video(video)
+            self.videos.append(video)
+        self.service.process_and_publish(self.videos[0].video_id)
+        self.service.block_video(self.videos[1].video_id)
+
+    def test_transition_many_reports_per_item_outcomes(self):
+        ids = [v.video_id for v in self.videos[:3]] + ["yok"]
+        outcomes = self.service.transition_many(ids, VideoStatus.PROCESSING)
+
+        self.assertEqual(outcomes[self.videos[0].video_id], BulkOutcome.APPLIED)
+        self.assertEqual(
+            outcomes[self.videos[1].video_id], BulkOutcome.INVALID_STATE
+        )
+        self.assertEqual(outcomes[self.videos[2].video_id], BulkOutcome.APPLIED)
+        self.assertEqual(outcomes["yok"], BulkOutcome.NOT_FOUND)
+
+        self.assertEqual(
+            self.videos[0].updated_at, self.videos[2].updated_at
+        )
+        self.assertEqual(len(self.repo.find_by_status(VideoStatus.PROCESSING)), 2)
+        self.assertEqual(len(self.repo.find_by_status(VideoStatus.UPLOADED)), 3)
+
+    def test_queries_keep_insertion_order(self):
+        ids = [v.video_id for v in reversed(self.videos)]
+        self.service.transition_many(ids, VideoStatus.BLOCKED)
+        self.assertEqual(
+            self.repo.find_by_status(VideoStatus.BLOCKED), self.videos
+        )
+        self.assertEqual(
+            self.repo.filter(channel_id="channel_1", status=VideoStatus.BLOCKED),
+            self.videos[1::2]
+        )
+
+    def test_bulk_goes_through_model_hooks(self):
+        calls = []
+
+        class AuditedVideo(StandardVideo):
+            def block(self):
+                calls.append("block")
+                super().block()
+
+            def publish(self):
+                # Altyazısız video yayınlanmaz.
+                calls.append("publish")
+                if self.has_subtitles:
+                    super().publish()
+
+        audited = AuditedVideo("channel_0", "Denetim", 300, VideoVisibility.PUBLIC)
+        captioned = AuditedVideo("channel_0", "Altyazılı", 300, VideoVisibility.PUBLIC)
+        captioned.enable_subtitles()
+        for video in (audited, captioned):
+            self.service.upload_video(video)
+
+        outcomes = self.service.transition_many(
+            [audited.video_id, captioned.video_id], VideoStatus.PUBLISHED
+        )
+        self.assertEqual(calls, ["publish", "publish"])
+        self.assertEqual(outcomes[audited.video_id], BulkOutcome.INVALID_STATE)
+        self.assertEqual(outcomes[captioned.video_id], BulkOutcome.APPLIED)
+        self.assertEqual(audited.status, VideoStatus.PROCESSING)
+        self.assertIn(
+            captioned, self.repo.find_by_status(VideoStatus.PUBLISHED)
+        )
+        self.assertIn(
+            audited, self.repo.find_by_status(VideoStatus.PROCESSING)
+        )
+
+        self.service.transition_many([audited.video_id], VideoStatus.BLOCKED)
+        self.assertEqual(calls[-1], "block")
+        self.assertEqual(len(self.repo.find_by_status(VideoStatus.BLOCKED)), 2)
+
+    def test_live_stream_transitions_stamp_updated_at(self):
+        stream = LiveStreamVideo("channel_0", "Canlı", datetime.now())
+        self.service.upload_video(stream)
+        started = datetime(2026, 1, 1, 20, 0)
+        stream.start_stream(started)
+        self.assertEqual(stream.updated_at, started)
+        self.assertIn(
+            (stream.video_id, started),
+            list(self.repo.status_entries(VideoStatus.PUBLISHED))
+        )
+        stream.end_stream(3600, started + timedelta(hours=1))
+        self.assertEqual(stream.updated_at, started + timedelta(hours=1))
+
+    def test_atomic_batch_applies_nothing_on_error(self):
+        ids = [v.video_id for v in self.videos[:3]]
+        with self.assertRaises(RuntimeError):
+            self.service.transition_many(
+                ids, VideoStatus.PROCESSING, atomic=True
+            )
+        self.assertEqual(self.videos[2].status, VideoStatus.UPLOADED)
+
+    def test_block_where_and_visibility_many(self):
+        sub = self.log.subscribe("moderation")
+        outcomes = self.service.block_where(channel_id="channel_0")
+
+        self.assertEqual(len(outcomes), 3)
+        self.assertEqual(
+            self.repo.count_by_status()[VideoStatus.BLOCKED], 4
+        )
+        self.assertEqual(
+            [e.change_type for e in sub.poll()],
+            [ChangeType.STATUS_CHANGED] * 3
+        )
+
+        self.service.set_visibility_many(
+            [v.video_id for v in self.videos], VideoVisibility.PRIVATE
+        )
+        self.assertEqual(
+            self.repo.count_by_visibility(), {VideoVisibility.PRIVATE: 6}
+        )
+        self.assertEqual(self.repo.filter(
+            channel_id="channel_1",
+            status=VideoStatus.BLOCKED,
+            visibility=VideoVisibility.PRIVATE
+        ), [self.videos[1]])
+
+
+class TestMemoryReport(unittest.TestCase):
+
+    def setUp(self):
+        self.repo = VideoRepository()
+        self.service = VideoService(self.repo)
+
+    def _upload(self, index):
+        video = StandardVideo(
+            channel_id="".join(["channel_", str(index % 2)]),
+            title=f"Bellek {index}",
+            duration_seconds=300,
+            visibility=VideoVisibility.PUBLIC
+        )
+        self.service.upload_video(video)
+        return video
+
+    def test_repeated_fields_are_interned(self):
+        first, second, third = (self._upload(i) for i in (0, 2, 4))
+        self.assertIs(first.channel_id, second.channel_id)
+
+        first.add_tag("".join(["py", "thon"]))
+        third.add_tag("".join(["pyt", "hon"]))
+        first.add_metadata("".join(["so", "urce"]), "a")
+        third.add_metadata("".join(["sou", "rce"]), "b")
+
+        self.assertIs(first.tags[0], third.tags[0])
+        self.assertIs(list(first.metadata)[0], list(third.metadata)[0])
+
+    def test_report_breaks_down_fields_types_and_indexes(self):
+        for i in range(4):
+            self._upload(i)
+        self.repo.save(ShortVideo(
+            channel_id="channel_0",
+            title="Kısa",
+            duration_seconds=30,
+            visibility=VideoVisibility.PUBLIC
+        ))
+
+        report = self.repo.memory_report()
+        self.assertEqual(report["videos"], 5)
+        self.assertEqual(
+            set(report["by_type"]), {"StandardVideo", "ShortVideo"}
+        )
+        self.assertIn("channel_id", report["by_field"])
+        self.assertEqual(
+            set(report["by_index"]),
+            {"videos", "status", "visibility", "channel", "order"}
+        )
+        self.assertEqual(
+            report["total_bytes"],
+            sum(report["by_type"].values()) + sum(report["by_index"].values())
+        )
+
+
+class TestRatingIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.repo = VideoRepository()
+        self.service = VideoService(self.repo)
+        self.index = RatingIndex(prior_mean=3.0, prior_weight=2)
+        self.index.attach(self.repo)
+
+        self.videos = []
+        for i in range(8):
+            video = StandardVideo(
+                channel_id=f"channel_{i % 2}",
+                title=f"Puan {i}",
+                duration_seconds=300,
+                visibility=VideoVisibility.PUBLIC
+            )
+            self.service.upload_video(video)
+            self.videos.append(video)
+
+    def _brute_force(self, k, channel_id=None, min_count=1):
+        candidates = [
+            v for v in self.videos
+            if v.rating_count >= min_count
+            and (channel_id is None or v.channel_id == channel_id)
+        ]
+        candidates.sort(key=lambda v: (
+            -self.index.smoothed(v.rating_total, v.rating_count), v.video_id
+        ))
+        return [v.video_id for v in candidates[:k]]
+
+    def test_batched_ratings_match_brute_force(self):
+        batch = []
+        for i, video in enumerate(self.videos):
+            for j in range(i + 1):
+                batch.append((video.video_id, (i + j) % 5 + 1))
+        batch.append((self.videos[0].video_id, 9))
+        batch.append(("yok", 5))
+
+        outcomes = self.service.add_ratings(batch)
+        self.assertEqual(outcomes["yok"], BulkOutcome.NOT_FOUND)
+        self.assertEqual(self.videos[0].rating_count, 1)
+
+        self.videos[3].add_rating(5)
+        for k, channel_id, min_count in (
+            (3, None, 1), (8, None, 4), (2, "channel_1", 1), (5, "channel_0", 3)
+        ):
+            self.assertEqual(
+                [vid for vid, _ in self.index.top_rated(k, channel_id, min_count)],
+                self._brute_force(k, channel_id, min_count)
+            )
+
+    def test_reset_and_remove_leave_index(self):
+        self.service.add_ratings([(v.video_id, 4) for v in self.videos[:3]])
+        self.videos[0].reset_stats()
+        self.service.remove_video(self.videos[1].video_id)
+
+        self.assertEqual(
+            [vid for vid, _ in self.index.top_rated(10)],
+            [self.videos[2].video_id]
+        )
+
+
+class TestTieredRepository(unittest.TestCase):
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp()
+        os.close(handle)
+        self.repo = TieredVideoRepository(self.path, max_hot_videos=3)
+        self.service = VideoService(self.repo)
+
+        self.videos = []
+        for i in range(10):
+            video = StandardVideo(
+                channel_id=f"channel_{i % 2}",
+                title=f"Katman {i}",
+                duration_seconds=300,
+                visibility=VideoVisibility.PUBLIC
+            )
+            self.service.upload_video(video)
+            self.videos.append(video)
+
+    def tearDown(self):
+        self.repo.close()
+        os.remove(self.path)
+
+    def test_cold_videos_rehydrate_transparently(self):
+        metrics = self.repo.metrics()
+        self.assertEqual(metrics["hot_videos"], 3)
+        self.assertEqual(metrics["cold_videos"], 7)
+
+        # Referans tutulmayan soğuk videolar diskten okunur.
+        ids = [video.video_id for video in self.videos]
+        self.videos = []
+        first_id = ids[0]
+        self.service.process_and_publish(first_id)
+        self.service.add_tag(first_id, "soğuk")
+
+        for video_id in ids[5:]:
+            self.repo.find_by_id(video_id)
+
+        reloaded = self.repo.find_by_id(first_id)
+        self.assertEqual(reloaded.status, VideoStatus.PUBLISHED)
+        self.assertEqual(reloaded.tags, ["soğuk"])
+        self.assertGreater(self.repo.metrics()["rehydrations"], 0)
+        self.assertIsNone(self.repo.find_by_id("yok"))
+
+    def test_handed_out_cold_videos_keep_identity_and_changes(self):
+        held = self.videos[0]
+        self.assertNotIn(held.video_id, self.repo._videos)
+        self.assertIs(self.repo.find_by_channel("channel_0")[0], held)
+
+        # Soğuktayken yapılan değişiklik kaybolmaz, indeks de güncellenir.
+        held.add_tag("soğuk")
+        held.increment_views(3)
+        for video in self.videos[5:]:
+            self.repo.find_by_id(video.video_id)
+        self.assertIs(self.repo.find_by_id(held.video_id), held)
+        self.assertEqual(held.tags, ["soğuk"])
+
+        other = self.videos[1]
+        self.assertNotIn(other.video_id, self.repo._videos)
+        other.block()
+        self.assertEqual(self.repo.find_by_status(VideoStatus.BLOCKED), [other])
+
+    def test_unnotified_changes_to_cold_videos_are_written_back(self):
+        ids = [video.video_id for video in self.videos]
+        self.videos = []
+        for video in self.repo.find_by_channel("channel_0"):
+            video.enable_subtitles()
+            video.update_duration(500)
+            video.add_flag("incelendi")
+        del video
+        gc.collect()
+
+        for video_id in ids[::2]:
+            video = self.repo.find_by_id(video_id)
+            self.assertTrue(video.has_subtitles)
+            self.assertEqual(video.duration_seconds, 500)
+            self.assertEqual(video.flags, ["incelendi"])
+        self.assertFalse(self.repo.find_by_id(ids[1]).has_subtitles)
+
+    def test_close_removes_owned_temp_file(self):
+        repo = TieredVideoRepository(max_hot_videos=1)
+        for i in range(3):
+            repo.save(StandardVideo(
+                "channel_1", f"Geçici {i}", 300, VideoVisibility.PUBLIC
+            ))
+        self.assertTrue(os.path.exists(repo.path))
+        repo.close()
+        repo.close()
+        self.assertFalse(os.path.exists(repo.path))
+
+    def test_empty_hot_tier_is_rejected(self):
+        with self.assertRaises(ValueError):
+            TieredVideoRepository(self.path, max_hot_videos=0)
+        with self.assertRaises(ValueError):
+            TieredVideoRepository(self.path, eviction_sample=0)
+
+    def test_index_queries_do_not_rehydrate(self):
+        before = self.repo.metrics()["rehydrations"]
+
+        self.assertEqual(self.repo.count(), 10)
+        self.assertEqual(
+            self.repo.count_by_channel(), {"channel_0": 5, "channel_1": 5}
+        )
+        self.assertEqual(self.repo.count_by_status(), {VideoStatus.UPLOADED: 10})
+        self.assertTrue(self.repo.exists(self.videos[0].video_id))
+        self.assertEqual(self.repo.metrics()["rehydrations"], before)
+
+        self.assertEqual(len(self.repo.find_by_channel("channel_0")), 5)
+        self.assertEqual(
+            [v.video_id for v in self.repo.sort_by_created()],
+            [v.video_id for v in self.videos]
+        )
+
+    def test_bulk_and_remove_keep_cold_store_consistent(self):
+        self.service.transition_many(
+            [v.video_id for v in self.videos], VideoStatus.BLOCKED
+        )
+        self.assertEqual(
+            {v.status for v in self.repo.find_all()}, {VideoStatus.BLOCKED}
+        )
+
+        self.assertTrue(self.service.remove_video(self.videos[0].video_id))
+        self.assertEqual(self.repo.count(), 9)
+        self.assertGreater(self.repo.compact(), 0)
+        self.assertEqual(len(self.repo.find_by_status(VideoStatus.BLOCKED)), 9)
+
+
+class TestRetention(unittest.TestCase):
+
+    def setUp(self):
+        self.repo = VideoRepository()
+        self.service = VideoService(self.repo)
+        self.now = datetime.now()
+
+        self.old_blocked = [self._save(VideoStatus.BLOCKED, 40) for _ in range(5)]
+        self.recent_blocked = self._save(VideoStatus.BLOCKED, 2)
+        self.stale_upload = self._save(VideoStatus.UPLOADED, 10)
+        self.fresh_upload = self._save(VideoStatus.UPLOADED, 1)
+        self.published = self._save(VideoStatus.PUBLISHED, 90)
+
+        self.runner = RetentionRunner(
+            self.repo,
+            [blocked_for(30), never_processed_for(7)],
+            clock=lambda: self.now
+        )
+
+    def _save(self, status, days_ago):
+        video = StandardVideo(
+            channel_id="channel_1",
+            title=f"Saklama {status.value}",
+            duration_seconds=300,
+            visibility=VideoVisibility.PUBLIC
+        )
+        video.status = status
+        video.updated_at = self.now - timedelta(days=days_ago)
+        self.repo.save(video)
+        return video
+
+    def test_runs_in_bounded_slices(self):
+        self.assertEqual(
+            self.runner.pending(), {"blocked_30d": 5, "unprocessed_7d": 1}
+        )
+
+        first = self.runner.run(max_items=4)
+        self.assertFalse(first.complete)
+        self.assertEqual(first.total_removed, 4)
+
+        second = self.runner.run(max_items=4)
+        self.assertTrue(second.complete)
+        self.assertEqual(
+            second.removed, {"blocked_30d": 1, "unprocessed_7d": 1}
+        )
+        self.assertGreater(second.bytes_reclaimed, 0)
+
+        self.assertEqual(self.repo.count(), 3)
+        self.assertEqual(
+            self.repo.count_by_status(),
+            {
+                VideoStatus.BLOCKED: 1,
+                VideoStatus.UPLOADED: 1,
+                VideoStatus.PUBLISHED: 1
+            }
+        )
+
+    def test_out_of_order_saves_are_not_skipped(self):
+        repo = VideoRepository()
+        self.repo = repo
+        recent = self._save(VideoStatus.BLOCKED, 2)
+        old = self._save(VideoStatus.BLOCKED, 40)
+        runner = RetentionRunner(repo, [blocked_for(30)], clock=lambda: self.now)
+
+        self.assertEqual(runner.pending(), {"blocked_30d": 1})
+        self.assertEqual(runner.run().total_removed, 1)
+        self.assertIsNone(repo.find_by_id(old.video_id))
+        self.assertIs(repo.find_by_id(recent.video_id), recent)
+
+    def test_run_until_complete(self):
+        report = self.runner.run_until_complete(slice_items=2)
+        self.assertEqual(report.total_removed, 6)
+        self.assertTrue(report.complete)
+        self.assertTrue(self.repo.exists(self.recent_blocked.video_id))
+        self.assertFalse(self.repo.exists(self.stale_upload.video_id))
+
+
+class TestWorkloadReplay(unittest.TestCase):
+
+    def test_recorded_trace_replays_against_new_backend(self):
+        handle, path = tempfile.mkstemp()
+        os.close(handle)
+        self.addCleanup(os.remove, path)
+
+        recorder = WorkloadRecorder(VideoService(VideoRepository()), path)
+        video = StandardVideo(
+            channel_id="channel_1",
+            title="Kayıt",
+            duration_seconds=300,
+            visibility=VideoVisibility.PUBLIC
+        )
+        recorder.upload_video(video)
+        recorder.process_and_publish(video.video_id)
+        recorder.change_visibility(video.video_id, VideoVisibility.UNLISTED)
+        recorder.mark_video_watched(video.video_id)
+        with self.assertRaises(LookupError):
+            recorder.block_video("yok")
+        recorder.close()
+
+        trace = load_trace(path)
+        self.assertEqual(len(trace), 5)
+        self.assertEqual(trace[1]["args"], [{"id": video.video_id}])
+        self.assertFalse(trace[4]["ok"])
+
+        repo = VideoRepository()
+        report = ReplayDriver(VideoService(repo), workers=2).run(trace)
+        replayed = repo.find_all()[0]
+
+        self.assertNotEqual(replayed.video_id, video.video_id)
+        self.assertEqual(replayed.status, VideoStatus.PUBLISHED)
+        self.assertEqual(replayed.visibility, VideoVisibility.UNLISTED)
+        self.assertEqual(replayed.view_count, 1)
+        self.assertEqual(report.requests, 5)
+        self.assertEqual(report.errors, {"block_video": 1})
+
+    def test_generated_mix_reports_latency_percentiles(self):
+        repo = VideoRepository()
+        report = ReplayDriver(
+            VideoService(repo), target_qps=5000, workers=4
+        ).run(generate_demo_mix(300, seed=3))
+
+        summary = report.summary()
+        self.assertEqual(summary["requests"], 300)
+        self.assertLessEqual(summary["p50_ms"], summary["p99_ms"])
+        self.assertLessEqual(summary["p99_ms"], summary["p999_ms"])
+        self.assertGreater(repo.count(), 0)
+        self.assertGreater(report.throughput, 0)
+
+    def test_calls_into_service_are_serialized(self):
+        class Probe:
+            active = 0
+            overlaps = 0
+
+            def list_public(self):
+                Probe.active += 1
+                if Probe.active > 1:
+                    Probe.overlaps += 1
+                time.sleep(0.0005)
+                Probe.active -= 1
+
+        trace = [{"op": "list_public"}] * 200
+        report = ReplayDriver(Probe(), workers=8).run(trace)
+        self.assertEqual(Probe.overlaps, 0)
+        self.assertEqual(report.errors, {})
+
+        ReplayDriver(Probe(), workers=8, thread_safe=True).run(trace)
+        self.assertGreater(Probe.overlaps, 0)
+
+
+class TestHttpServer(unittest.TestCase):
+
+    def setUp(self):
+        self.repo = VideoRepository()
+        self.server = VideoHttpServer(VideoService(self.repo), port=0)
+
+    def _run(self, scenario):
+        async def main():
+            await self.server.start()
+            client = AsyncVideoClient(port=self.server.port)
+            try:
+                return await scenario(client)
+            finally:
+                await client.close()
+                await self.server.stop()
+
+        return asyncio.run(main())
+
+    def test_json_endpoints_over_keep_alive(self):
+        async def scenario(client):
+            status, body = await client.post_json("/videos", {
+                "type": "StandardVideo",
+                "channel_id": "channel_1",
+                "title": "HTTP",
+                "duration_seconds": 300,
+                "visibility": "public"
+            })
+            self.assertEqual(status, 201)
+            video_id = body["video_id"]
+
+            status, _ = await client.post_json(
+                f"/videos/{video_id}/process_and_publish"
+            )
+            self.assertEqual(status, 200)
+            await client.post_json(f"/videos/{video_id}/tags", {"tag": "api"})
+
+            status, video = await client.get_json(f"/videos/{video_id}")
+            self.assertEqual(video["status"], "published")
+            self.assertEqual(video["tags"], ["api"])
+
+            status, _ = await client.post_json(f"/videos/{video_id}/publish")
+            self.assertEqual(status, 409)
+            status, _ = await client.get_json("/videos/yok")
+            self.assertEqual(status, 404)
+            status, _, _ = await client.request("PUT", "/stats")
+            self.assertEqual(status, 405)
+
+            status, stats = await client.get_json("/stats")
+            self.assertEqual(stats["by_status"], {"published": 1})
+
+        self._run(scenario)
+
+    def test_malformed_requests_get_400(self):
+        async def scenario(client):
+            status, _, _ = await client.request("POST", "/videos", [])
+            self.assertEqual(status, 400)
+            status, _, _ = await client.request("POST", "/videos/x/watch", [1])
+            self.assertEqual(status, 400)
+
+            reader, writer = await asyncio.open_connection(
+                "127.0.0.1", self.server.port
+            )
+            writer.write(
+                b"POST /videos HTTP/1.1\r\nContent-Length: abc\r\n\r\n"
+            )
+            await writer.drain()
+            status_line = await reader.readline()
+            writer.close()
+            self.assertEqual(int(status_line.split()[1]), 400)
+
+        self._run(scenario)
+
+    def test_unexpected_errors_get_500(self):
+        def broken(video_id):
+            raise ZeroDivisionError(video_id)
+
+        self.repo.find_by_id = broken
+
+        async def scenario(client):
+            with self.assertLogs("server", level="ERROR"):
+                status, body = await client.get_json("/videos/abc")
+            self.assertEqual(status, 500)
+            self.assertIn("error", body)
+            # Bağlantı açık kalır.
+            status, _ = await client.get_json("/stats")
+            self.assertEqual(status, 200)
+
+        self._run(scenario)
+
+    def test_large_lists_stream_as_json_lines(self):
+        for i in range(1200):
+            self.repo.save(ShortVideo(
+                channel_id=f"channel_{i % 3}",
+                title=f"Akış {i}",
+                duration_seconds=30,
+                visibility=VideoVisibility.PUBLIC
+            ))
+
+        async def scenario(client):
+            status, headers, _ = await client.request("GET", "/videos")
+            self.assertEqual(headers["transfer-encoding"], "chunked")
+
+            status, videos = await client.get_lines("/videos?channel_id=channel_1")
+            self.assertEqual(len(videos), 400)
+            status, videos = await client.get_lines("/videos/sorted?by=title")
+            self.assertEqual(videos[0]["title"], "Akış 0")
+
+            clients = [AsyncVideoClient(port=self.server.port) for _ in range(5)]
+            results = await asyncio.gather(
+                *(c.get_lines("/videos/sorted?by=created") for c in clients)
+            )
+            for c in clients:
+                await c.close()
+            self.assertTrue(all(len(r[1]) == 1200 for r in results))
+            self.assertGreater(self.server.coalesced, 0)
+
+        self._run(scenario)
+
+
+class TestAsyncVideoService(unittest.TestCase):
+
+    def setUp(self):
+        self.repo = VideoRepository()
+        self.service = VideoService(self.repo)
+        self.video = StandardVideo(
+            channel_id="channel_1",
+            title="Async",
+            duration_seconds=300,
+            visibility=VideoVisibility.PUBLIC
+        )
+        self.service.upload_video(self.video)
+        self.service.process_and_publish(self.video.video_id)
+
+    def test_same_tick_calls_are_batched(self):
+        async def main():
+            async with AsyncVideoService(self.service) as service:
+                await asyncio.gather(*(
+                    service.mark_video_watched(self.video.video_id, f"u{i}")
+                    for i in range(10)
+                ), service.add_tag(self.video.video_id, "async"))
+                with self.assertRaises(LookupError):
+                    await service.mark_video_watched("missing")
+                titles = await service.sort_by_title()
+                return service.metrics(), titles
+
+        metrics, titles = asyncio.run(main())
+        self.assertEqual(self.video.view_count, 10)
+        self.assertIn("async", self.video.tags)
+        self.assertEqual(metrics["batches"], 2)
+        self.assertEqual(metrics["batched_calls"], 12)
+        self.assertEqual(metrics["offloaded_calls"], 1)
+        self.assertEqual(titles, [self.video])
+
+    def test_cancelled_call_is_not_applied(self):
+        async def main():
+            async with AsyncVideoService(self.service) as service:
+                task = asyncio.ensure_future(
+                    service.mark_video_watched(self.video.video_id)
+                )
+                await asyncio.sleep(0)
+                task.cancel()
+                await service.mark_video_watched(self.video.video_id)
+                await asyncio.sleep(0)
+                return service.metrics()
+
+        metrics = asyncio.run(main())
+        self.assertEqual(self.video.view_count, 1)
+        self.assertEqual(metrics["cancelled_calls"], 1)
+
+    def test_timeout_on_offloaded_scan(self):
+        async def main():
+            async with AsyncVideoService(self.service) as service:
+                service._lock.acquire()
+                try:
+                    with self.assertRaises(asyncio.TimeoutError):
+                        await service.list_all(timeout=0.05)
+                finally:
+                    service._lock.release()
+                return await service.list_all(timeout=1)
+
+        self.assertEqual(asyncio.run(main()), [self.video])
+
+
+    def test_every_service_method_is_wrapped(self):
+        async def main():
+            async with AsyncVideoService(self.service) as service:
+                for name in dir(VideoService):
+                    if not name.startswith("_"):
+                        self.assertTrue(hasattr(service, name), name)
+                outcomes = await service.mark_videos_watched(
+                    [(self.video.video_id, "u1"), ("yok", None)]
+                )
+
+                def build(uow):
+                    uow.add_tag(self.video.video_id, "uow")
+                    uow.block_video(self.video.video_id)
+
+                applied = await service.unit_of_work(build)
+                return outcomes, applied
+
+        outcomes, applied = asyncio.run(main())
+        self.assertEqual(outcomes["yok"], BulkOutcome.NOT_FOUND)
+        self.assertEqual(applied[self.video.video_id], BulkOutcome.APPLIED)
+        self.assertEqual(self.video.status, VideoStatus.BLOCKED)
+        self.assertEqual(self.video.view_count, 1)
+
+class TestValidation(unittest.TestCase):
+
+    def setUp(self):
+        self.videos = [
+            StandardVideo("channel_1", "Uzun", 300, VideoVisibility.PUBLIC),
+            StandardVideo("channel_1", "", 30, VideoVisibility.PUBLIC),
+            ShortVideo("channel_2", "Short", 45, VideoVisibility.PUBLIC),
+            ShortVideo("channel_2", "Uzun short", 120, VideoVisibility.PUBLIC),
+            LiveStreamVideo("channel_3", "Canlı", datetime.now())
+        ]
+
+    def test_structured_failure_reasons(self):
+        failures = self.videos[1].validation_failures()
+        self.assertEqual(
+            [failure.rule for failure in failures], ["title", "min_duration"]
+        )
+        self.assertEqual(failures[0].video_type, "StandardVideo")
+        self.assertEqual(
+            [video.is_valid() for video in self.videos],
+            [True, False, True, False, True]
+        )
+        with self.assertRaisesRegex(ValueError, "60 saniye"):
+            VideoService(VideoRepository()).upload_video(self.videos[3])
+
+    def test_stream_is_lazy_and_matches_parallel(self):
+        stream = validate_stream(self.videos)
+        self.assertTrue(next(stream).ok)
+        serial = [result.ok for result in validate_stream(self.videos * 10)]
+        parallel = list(
+            validate_parallel(self.videos * 10, workers=2, chunk_size=7)
+        )
+        self.assertEqual([result.ok for result in parallel], serial)
+        self.assertIs(parallel[5].video, self.videos[0])
+        self.assertEqual(parallel[3].failures[0].rule, "duration")
+
+    def test_unregistered_subclass_keeps_base_rules(self):
+        class PodcastVideo(VideoBase):
+            def get_video_type(self) -> str:
+                return "PodcastVideo"
+
+            def validate_specific_rules(self) -> bool:
+                return self.duration_seconds <= 3600
+
+        valid = PodcastVideo("channel_1", "Podcast", 1800)
+        empty = PodcastVideo("channel_1", "Podcast", 0)
+        long = PodcastVideo("channel_1", "Podcast", 7200)
+        self.assertTrue(valid.is_valid())
+        self.assertEqual(
+            [failure.rule for failure in empty.validation_failures()],
+            ["duration"]
+        )
+        self.assertEqual(
+            [failure.rule for failure in long.validation_failures()],
+            ["specific_rules"]
+        )
+        # Canlı yayının süresi sıfır olabilir.
+        self.assertEqual(self.videos[4].duration_seconds, 0)
+        self.assertTrue(self.videos[4].is_valid())
+
+    def test_overridden_checks_in_subclasses_are_used(self):
+        class StrictVideo(StandardVideo):
+            def validate_specific_rules(self) -> bool:
+                return self.duration_seconds >= 600
+
+        class TinyShort(ShortVideo):
+            def validate_duration(self) -> bool:
+                return 0 < self.duration_seconds <= 30
+
+        public = VideoVisibility.PUBLIC
+        self.assertFalse(StrictVideo("channel_1", "Sıkı", 100, public).is_valid())
+        self.assertTrue(StrictVideo("channel_1", "Sıkı", 900, public).is_valid())
+        long_short = TinyShort("channel_1", "Kısa", 45, public)
+        self.assertEqual(
+            [f.rule for f in long_short.validation_failures()], ["duration"]
+        )
+        self.assertTrue(TinyShort("channel_1", "Kısa", 20, public).is_valid())
+
+    def test_subclass_rules_override_by_name(self):
+        registry = ValidationRegistry()
+        registry.register(StandardVideo, [
+            Rule("title", lambda video: bool(video.title), "Başlık"),
+            Rule("hd", lambda video: video.resolution == "1080p", "HD")
+        ])
+
+        class ShortTitleVideo(StandardVideo):
+            pass
+
+        registry.register(ShortTitleVideo, [
+            Rule("title", lambda video: len(video.title) <= 4, "Kısa başlık")
+        ])
+        video = ShortTitleVideo("channel_1", "Uzun", 300, VideoVisibility.PUBLIC)
+        self.assertEqual(
+            [rule.name for rule in registry.rules_for(ShortTitleVideo).rules],
+            ["hd", "title"]
+        )
+        self.assertTrue(registry.is_valid(video))
+        video.title = "Çok uzun"
+        self.assertEqual(registry.failures(video)[0].message, "Kısa başlık")
+        self.assertEqual(
+            ShortVideo.validate_all_videos(self.videos),
+            [self.videos[0], self.videos[1], self.videos[2], self.videos[4]]
+        )
+
+
+class TestRelatedIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.repo = VideoRepository()
+        self.service = VideoService(self.repo)
+        self.index = RelatedIndex(capacity=5)
+        self.index.attach(self.repo)
+
+    def _upload(self, title, tags, channel_id="channel_1"):
+        video = StandardVideo(channel_id, title, 300, VideoVisibility.PUBLIC)
+        for tag in tags:
+            video.add_tag(tag)
+        self.service.upload_video(video)
+        self.service.process_and_publish(video.video_id)
+        return video.video_id
+
+    def test_similar_videos_ranked_with_channel_boost(self):
+        base = self._upload("Python dersleri", ["python", "eğitim"])
+        same = self._upload(
+            "Python dersleri 2", ["python", "eğitim"], "channel_2"
+        )
+        boosted = self._upload("Python dersleri 3", ["python", "eğitim"])
+        other = self._upload("Yemek tarifi", ["yemek"])
+
+        related = [video_id for video_id, _ in self.index.related(base, 3)]
+        self.assertEqual(related[0], boosted)
+        self.assertIn(same, related)
+        self.assertNotIn(other, related)
+
+    def test_visibility_filtered_at_read_time(self):
+        base = self._upload("Python dersleri", ["python"])
+        hidden = self._upload("Python dersleri", ["python"])
+        self.service.change_visibility(hidden, VideoVisibility.PRIVATE)
+        self.assertEqual(self.index.related(base), [])
+        self.assertEqual(len(self.index.neighbors(base)), 1)
+
+        self.service.change_visibility(hidden, VideoVisibility.PUBLIC)
+        self.assertEqual(self.index.related(base)[0][0], hidden)
+        self.service.block_video(hidden)
+        self.assertEqual(self.index.related(base), [])
+
+    def test_incremental_tag_title_and_remove(self):
+        base = self._upload("Gitar", ["müzik"])
+        other = self._upload("Keman", ["klasik"])
+        self.assertEqual(self.index.related(base), [])
+
+        self.service.add_tag(other, "müzik")
+        self.repo.find_by_id(other).update_title("Gitar")
+        self.assertEqual(self.index.related(base)[0][0], other)
+
+        self.service.remove_tag(other, "müzik")
+        self.repo.find_by_id(other).update_title("Keman")
+        self.assertEqual(self.index.related(base), [])
+
+        self.service.add_tag(other, "müzik")
+        self.service.remove_video(other)
+        self.assertEqual(self.index.related(base), [])
+        self.assertEqual(len(self.index), 1)
+
+
+    def test_removal_refills_and_referrers_stay_exact(self):
+        index = RelatedIndex(capacity=2)
+        index.attach(self.repo)
+        base = self._upload("Python dersleri", ["python", "eğitim"])
+        for i in range(4):
+            self._upload(f"Python dersleri {i}", ["python", "eğitim"])
+        self.assertEqual(len(index.neighbors(base)), 2)
+
+        for video_id, _ in index.neighbors(base):
+            self.service.remove_video(video_id)
+        self.assertEqual(len(index.neighbors(base)), 2)
+
+        # Tablodan düşen ya da reddedilen id'ler referrer'da kalmaz.
+        expected = {}
+        for owner, board in index._neighbors.items():
+            for member in board.members:
+                expected.setdefault(member, set()).add(owner)
+        self.assertEqual(dict(index._referrers), expected)
+        self.assertEqual(len(index), 3)
+
+class TestUnitOfWork(unittest.TestCase):
+
+    def setUp(self):
+        self.repo = VideoRepository()
+        self.log = ChangeLog()
+        self.service = VideoService(self.repo, change_log=self.log)
+        self.existing = StandardVideo(
+            "channel_1", "Var olan", 300, VideoVisibility.PUBLIC
+        )
+        self.service.upload_video(self.existing)
+        self.subscription = self.service.subscribe_changes("uow")
+
+    def _new_video(self):
+        return StandardVideo("channel_2", "Yeni", 300, VideoVisibility.PUBLIC)
+
+    def test_failed_commit_leaves_videos_untouched(self):
+        other = self._new_video()
+        self.service.upload_video(other)
+        self.subscription.poll()
+        uow = self.service.unit_of_work()
+        uow.block_video(self.existing.video_id)
+        uow.add_tag(other.video_id, 42)
+        with self.assertRaises(TypeError):
+            uow.commit()
+
+        self.assertEqual(self.existing.status, VideoStatus.UPLOADED)
+        self.assertEqual(other.tags, [])
+        self.assertEqual(self.repo.find_by_status(VideoStatus.BLOCKED), [])
+        self.assertEqual(self.subscription.poll(), [])
+
+    def test_change_log_batch_keeps_applied_changes(self):
+        # Blok hata verse de uygulanmış değişikliğin olayı kaybolmaz.
+        with self.assertRaises(ValueError):
+            with self.log.batch():
+                self.service.block_video(self.existing.video_id)
+                raise ValueError("iptal")
+        self.assertEqual(self.existing.status, VideoStatus.BLOCKED)
+        self.assertEqual(
+            [e.change_type for e in self.subscription.poll()],
+            [ChangeType.STATUS_CHANGED]
+        )
+
+    def test_commit_without_log_room_changes_nothing(self):
+        log = ChangeLog(capacity=4, block_timeout=0.01)
+        repo = VideoRepository()
+        service = VideoService(repo, change_log=log)
+        subscription = log.subscribe("yavaş")
+        videos = [self._new_video() for _ in range(3)]
+
+        def build(uow):
+            for video in videos:
+                uow.upload_video(video)
+                uow.process_and_publish(video.video_id)
+
+        uow = service.unit_of_work()
+        build(uow)
+        with self.assertRaises(BufferError):
+            uow.commit()
+        self.assertEqual(repo.count(), 0)
+        self.assertTrue(all(v.status == VideoStatus.UPLOADED for v in videos))
+        self.assertEqual(log.last_seq, 0)
+
+        # Yeterli yer varken aynı iş tek seferde, eksiksiz yazılır.
+        log = ChangeLog(capacity=6, block_timeout=0.01)
+        repo = VideoRepository()
+        service = VideoService(repo, change_log=log)
+        subscription = log.subscribe("yavaş")
+        with service.unit_of_work() as uow:
+            build(uow)
+        self.assertEqual(repo.count(), 3)
+        self.assertEqual(len(subscription.poll()), 6)
+
+    def test_commit_applies_steps_with_one_timestamp(self):
+        video = self._new_video()
+        with self.service.unit_of_work() as uow:
+            uow.upload_video(video)
+            uow.add_tag(video.video_id, "yeni")
+            uow.process_and_publish(video.video_id)
+            uow.change_visibility(video.video_id, VideoVisibility.UNLISTED)
+            uow.start_processing(self.existing.video_id)
+            uow.publish_video(self.existing.video_id)
+            self.assertEqual(self.repo.count(), 1)
+
+        self.assertEqual(video.status, VideoStatus.PUBLISHED)
+        self.assertEqual(video.visibility, VideoVisibility.UNLISTED)
+        self.assertEqual(video.tags, ["yeni"])
+        self.assertEqual(video.updated_at, self.existing.updated_at)
+        self.assertEqual(
+            self.repo.find_by_visibility(VideoVisibility.UNLISTED), [video]
+        )
+        self.assertEqual(
+            self.repo.find_by_status(VideoStatus.PUBLISHED),
+            [self.existing, video]
+        )
+
+        events = self.subscription.poll()
+        self.assertEqual(
+            [event.change_type for event in events],
+            [
+                ChangeType.CREATED,
+                ChangeType.STATUS_CHANGED,
+                ChangeType.VISIBILITY_CHANGED,
+                ChangeType.TAG_ADDED,
+                ChangeType.STATUS_CHANGED
+            ]
+        )
+        self.assertEqual(len({event.timestamp for event in events}), 1)
+
+    def test_invalid_step_rolls_back_everything(self):
+        video = self._new_video()
+        with self.assertRaises(RuntimeError):
+            with self.service.unit_of_work() as uow:
+                uow.upload_video(video)
+                uow.block_video(self.existing.video_id)
+                uow.process_and_publish(self.existing.video_id)
+
+        self.assertFalse(self.repo.exists(video.video_id))
+        self.assertEqual(self.existing.status, VideoStatus.UPLOADED)
+        self.assertEqual(self.subscription.poll(), [])
+        with self.assertRaises(RuntimeError):
+            uow.add_tag(self.existing.video_id, "geç")
+
+    def test_concurrent_change_detected_and_remove(self):
+        uow = self.service.unit_of_work()
+        uow.process_and_publish(self.existing.video_id)
+        self.service.block_video(self.existing.video_id)
+        with self.assertRaisesRegex(RuntimeError, "Eşzamanlı"):
+            uow.commit()
+        self.assertEqual(self.existing.status, VideoStatus.BLOCKED)
+
+        with self.service.unit_of_work() as uow:
+            uow.add_tag(self.existing.video_id, "silinecek")
+            self.assertTrue(uow.remove_video(self.existing.video_id))
+            self.assertFalse(uow.remove_video(self.existing.video_id))
+        self.assertEqual(self.repo.count(), 0)
+        self.assertEqual(self.repo.find_by_status(VideoStatus.BLOCKED), [])
+
+
+class TestAdmissionControl(unittest.TestCase):
+
+    def setUp(self):
+        self.repo = VideoRepository()
+        self.admission = AdmissionController(
+            expensive_limit=1,
+            expensive_queue=0,
+            cheap_cost=10,
+            max_cost=25,
+            degrade_limit=8
+        )
+        self.service = VideoService(self.repo, admission=self.admission)
+        self.videos = []
+        for i in range(30):
+            video = StandardVideo(
+                f"channel_{i % 3}", f"Video {i}", 300, VideoVisibility.PUBLIC
+            )
+            video.created_at = datetime(2024, 1, 1) + timedelta(minutes=i)
+            self.service.upload_video(video)
+            self.videos.append(video)
+
+    def test_over_budget_scans_degrade_with_cursor(self):
+        # Tam sıralama 150, sekizlik parça 120 birim: yalnızca parça sığar.
+        self.admission.max_cost = 130
+        first = self.service.sort_by_created(reverse=True)
+        self.assertEqual(list(first), self.videos[::-1][:8])
+        self.assertEqual(first.total, 30)
+
+        collected = list(first)
+        cursor = first.cursor
+        while cursor is not None:
+            chunk = self.service.resume(cursor)
+            collected.extend(chunk)
+            cursor = chunk.cursor
+        self.assertEqual(collected, self.videos[::-1])
+
+        page = self.service.paginate(2, 5)
+        self.assertEqual(list(page), self.videos[5:10])
+        self.assertEqual(len(self.service.list_all()), 30)
+        metrics = self.admission.metrics()
+        self.assertEqual(metrics["degraded"], 2)
+        self.assertEqual(metrics["rejected"], 0)
+
+    def test_deep_degraded_pages_are_costed_and_rejected(self):
+        self.admission.max_cost = 130
+        # 30 video içinden ilk 30'u seçmek tam sıralama kadar tutar.
+        with self.assertRaises(AdmissionRejected):
+            self.service.paginate(6, 5)
+        metrics = self.admission.metrics()
+        self.assertEqual(metrics["degraded"], 0)
+        self.assertEqual(metrics["rejected"], 1)
+
+        # Cursor ile aynı derinliğe inmek parça başına sabit maliyetlidir.
+        cursor = self.service.sort_by_created().cursor
+        for _ in range(2):
+            chunk = self.service.resume(cursor)
+            cursor = chunk.cursor
+        tail = self.service.resume(cursor)
+        self.assertEqual(list(tail), self.videos[24:])
+        self.assertIsNone(tail.cursor)
+        self.assertEqual(self.admission.metrics()["rejected"], 1)
+
+    def test_sorted_endpoint_passes_the_cursor_through(self):
+        self.admission.max_cost = 130
+        server = VideoHttpServer(self.service, port=0)
+
+        async def main():
+            await server.start()
+            client = AsyncVideoClient(port=server.port)
+            try:
+                titles = []
+                path = "/videos/sorted?by=created&reverse=true"
+                while path is not None:
+                    status, headers, data = await client.request("GET", path)
+                    self.assertEqual(status, 200)
+                    titles.extend(
+                        json.loads(line)["title"] for line in data.splitlines()
+                    )
+                    token = headers.get("x-next-cursor")
+                    path = token and f"/videos/sorted?cursor={quote(token)}"
+                status, _, _ = await client.request(
+                    "GET", "/videos/sorted?cursor=bozuk"
+                )
+                return titles, status
+            finally:
+                await client.close()
+                await server.stop()
+
+        titles, status = asyncio.run(main())
+        self.assertEqual(titles, [v.title for v in self.videos[::-1]])
+        self.assertEqual(status, 400)
+
+    def test_list_and_page_endpoints_are_admitted_and_resumable(self):
+        server = VideoHttpServer(self.service, port=0)
+
+        async def main():
+            await server.start()
+            client = AsyncVideoClient(port=server.port)
+            try:
+                listed = await client.request("GET", "/videos")
+                channel = await client.get_lines("/videos?channel_id=channel_0")
+
+                # 20'lik sayfa sekizlik parçalara bölünür, sayfa sonunda biter.
+                self.admission.max_cost = 130
+                titles = []
+                path = "/videos/page?page=1&page_size=20"
+                while path is not None:
+                    status, headers, data = await client.request("GET", path)
+                    self.assertEqual(status, 200)
+                    titles.extend(video["title"] for video in json.loads(data))
+                    token = headers.get("x-next-cursor")
+                    path = token and f"/videos/page?cursor={quote(token)}"
+                return listed, channel, titles
+            finally:
+                await client.close()
+                await server.stop()
+
+        listed, channel, titles = asyncio.run(main())
+        status, headers, data = listed
+        self.assertEqual(len(data.splitlines()), 8)
+        self.assertIn("x-next-cursor", headers)
+        self.assertEqual(len(channel[1]), 10)
+        self.assertEqual(titles, [v.title for v in self.videos[:20]])
+
+        metrics = self.admission.metrics()
+        self.assertEqual(metrics["cheap"]["admitted"], 32)
+        self.assertEqual(metrics["degraded"], 2)
+
+    def test_reject_non_degradable_and_index_costs(self):
+        with self.assertRaises(AdmissionRejected):
+            self.service.list_uploaded_between(
+                datetime(2024, 1, 1), datetime(2025, 1, 1)
+            )
+        # Kanal indeksi 10 video: ucuz şeritten geçer.
+        self.assertEqual(len(self.service.list_by_channel("channel_0")), 10)
+        self.assertEqual(self.admission.metrics()["cheap"]["admitted"], 31)
+        self.assertEqual(self.admission.metrics()["rejected"], 1)
+
+    def test_saturated_expensive_lane_sheds_but_cheap_ops_run(self):
+        self.admission.max_cost = 1000
+        self.assertTrue(self.admission.expensive.acquire(None))
+        try:
+            with self.assertRaises(AdmissionRejected):
+                self.service.list_by_status(VideoStatus.UPLOADED)
+            self.service.process_and_publish(self.videos[0].video_id)
+        finally:
+            self.admission.expensive.release()
+
+        metrics = self.admission.metrics()
+        self.assertEqual(metrics["expensive"]["shed"], 1)
+        self.assertEqual(metrics["shed"], 1)
+        self.assertEqual(self.videos[0].status, VideoStatus.PUBLISHED)
+        self.assertEqual(
+            len(self.service.list_by_status(VideoStatus.UPLOADED)), 29
+        )
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,432 @@
+import math
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from functools import partial
+from hashlib import blake2b
+from time import perf_counter
+from typing import Dict, List, Optional, Tuple
+from weakref import WeakValueDictionary, ref
+
+from base import ChangeType, VideoBase, VideoStatus, VideoVisibility
+from repository import VideoRepository
+
+
+class BloomFilter:
+
+    def __init__(self, capacity: int = 100000, error_rate: float = 0.01):
+        capacity = max(1, capacity)
+        bits = math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+        self.size = max(8, bits)
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str):
+        digest = blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:], "big") | 1
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, key: str) -> None:
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(key)
+        )
+
+
+# Yerinde değişen alanlar; diğer alanlar değişmez değerlerdir.
+_MUTABLE_FIELDS = ("tags", "flags", "metadata")
+
+
+def _snapshot(state: dict) -> dict:
+    snapshot = state.copy()
+    for key in _MUTABLE_FIELDS:
+        snapshot[key] = snapshot[key].copy()
+    return snapshot
+
+
+class TieredVideoRepository(VideoRepository):
+    # Sıcak katman: bellekte LRU sıralı videolar. Soğuk katman: diske eklenen
+    # pickle kayıtları + (offset, uzunluk) anahtar indeksi. İkincil indeksler
+    # her iki katmanı da kapsar, bu yüzden sayım sorguları diske inmez.
+    # Dışarı verilen soğuk videolar zayıf bir kimlik haritasında tutulur:
+    # aynı id için her okuma aynı nesneyi döndürür. Olay üreten bir metotla
+    # değişen nesne sıcağa alınır; olay üretmeyen değişiklikler (altyazı,
+    # süre, bayrak...) nesne bırakıldığında kayıtla karşılaştırılıp diske
+    # geri yazılır.
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_hot_videos: Optional[int] = None,
+        memory_budget_bytes: Optional[int] = None,
+        eviction_sample: int = 8,
+        expected_videos: int = 100000
+    ):
+        if max_hot_videos is not None and max_hot_videos < 1:
+            raise ValueError("max_hot_videos en az 1 olmalı")
+        if eviction_sample < 1:
+            raise ValueError("eviction_sample en az 1 olmalı")
+        super().__init__()
+        self._videos: "OrderedDict[str, VideoBase]" = OrderedDict()
+        # Geçici dosya bu sınıfa aittir ve close() ile silinir.
+        self._owns_file = path is None
+        if path is None:
+            handle, path = tempfile.mkstemp(suffix=".videos")
+            os.close(handle)
+        self.path = path
+        self._file = open(path, "a+b")
+        self._io_lock = threading.RLock()
+        self._cold: Dict[str, Tuple[int, int]] = {}
+        self._handed: "WeakValueDictionary[str, VideoBase]" = (
+            WeakValueDictionary()
+        )
+        self._write_backs: Dict[str, tuple] = {}
+        self._bloom = BloomFilter(expected_videos)
+        self._expected_videos = expected_videos
+
+        self.max_hot_videos = max_hot_videos
+        self.memory_budget_bytes = memory_budget_bytes
+        self.eviction_sample = eviction_sample
+
+        self._record_bytes = 0
+        self._record_count = 0
+        self._garbage_bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.rehydrations = 0
+        self.evictions = 0
+        self.rehydration_seconds = 0.0
+        self.max_rehydration_seconds = 0.0
+
+    def _hot_limit(self) -> Optional[int]:
+        limits = []
+        if self.max_hot_videos is not None:
+            limits.append(self.max_hot_videos)
+        if self.memory_budget_bytes is not None:
+            # Video boyutu, diske yazılan kayıtların ortalamasıyla tahmin edilir.
+            average = (
+                self._record_bytes / self._record_count
+                if self._record_count else 1024
+            )
+            limits.append(max(1, int(self.memory_budget_bytes // average)))
+        return min(limits) if limits else None
+
+    def _write(self, video: VideoBase) -> None:
+        data = pickle.dumps(video, pickle.HIGHEST_PROTOCOL)
+        video_id = video.video_id
+        # seek + write ikilisi araya başka bir okuma girmeden yapılmalı; geri
+        # yazım GC sırasında da gelebildiği için kayıt defteri de kilittedir.
+        with self._io_lock:
+            self._file.seek(0, os.SEEK_END)
+            offset = self._file.tell()
+            self._file.write(data)
+
+            previous = self._cold.get(video_id)
+            if previous is not None:
+                self._garbage_bytes += previous[1]
+            self._cold[video_id] = (offset, len(data))
+            self._bloom.add(video_id)
+            self._record_bytes += len(data)
+            self._record_count += 1
+
+    def _read(self, video_id: str) -> Optional[VideoBase]:
+        if video_id not in self._bloom:
+            return None
+        location = self._cold.get(video_id)
+        if location is None:
+            return None
+        video = self._handed.get(video_id)
+        if video is not None:
+            return video
+
+        started = perf_counter()
+        with self._io_lock:
+            self._file.flush()
+            self._file.seek(location[0])
+            data = self._file.read(location[1])
+        video = pickle.loads(data)
+        elapsed = perf_counter() - started
+        self._hand_out(video)
+
+        self.rehydrations += 1
+        self.rehydration_seconds += elapsed
+        self.max_rehydration_seconds = max(
+            self.max_rehydration_seconds, elapsed
+        )
+        return video
+
+    def _evict(self) -> None:
+        limit = self._hot_limit()
+        if limit is None:
+            return
+        while len(self._videos) > limit:
+            # En eski erişilen birkaç aday içinden en uzun süredir
+            # izlenmeyen soğuğa taşınır; son erişilen video aday olmaz.
+            sample = min(self.eviction_sample, len(self._videos) - 1)
+            candidates = []
+            for video in self._videos.values():
+                if len(candidates) >= sample:
+                    break
+                candidates.append(video)
+            victim = min(
+                candidates,
+                key=lambda v: v.last_watched_at or v.created_at
+            )
+            self.demote(victim.video_id)
+
+    def demote(self, video_id: str) -> bool:
+        video = self._videos.pop(video_id, None)
+        if video is None:
+            return False
+        # Elinde referans tutan çağıran için nesne haritada kalır.
+        self._write(video)
+        self._hand_out(video)
+        self.evictions += 1
+        return True
+
+    def _hand_out(self, video: VideoBase) -> None:
+        video_id = video.video_id
+        video._observer = self._on_cold_change
+        self._handed[video_id] = video
+        state = video.__dict__
+        self._write_backs[video_id] = (
+            ref(video, partial(self._write_back, video_id)),
+            type(video),
+            state,
+            _snapshot(state)
+        )
+
+    def _write_back(self, video_id: str, dead: ref) -> None:
+        # Bırakılan soğuk nesnenin durumu, dışarı verildiği andan farklıysa
+        # yeni kayıt olarak eklenir. Nesne yok olduğundan durumu, tutulan
+        # __dict__ üzerinden yeniden kurulur. İptal edilen kaydın zayıf
+        # referansı da silindiğinden geri çağrı hiç gelmez.
+        entry = self._write_backs.get(video_id)
+        if entry is None or entry[0] is not dead:
+            return
+        del self._write_backs[video_id]
+        _, video_class, state, snapshot = entry
+        if (
+            self._file.closed
+            or video_id not in self._cold
+            or video_id in self._videos
+            or _snapshot(state) == snapshot
+        ):
+            return
+        video = video_class.__new__(video_class)
+        video.__dict__.update(state)
+        self._write(video)
+
+    def _cancel_write_back(self, video_id: str) -> None:
+        self._write_backs.pop(video_id, None)
+
+    def _on_cold_change(
+        self,
+        video: VideoBase,
+        change_type: ChangeType,
+        payload: dict
+    ) -> None:
+        video_id = video.video_id
+        if self._handed.get(video_id) is not video or video_id not in self._cold:
+            video._observer = None
+            return
+        self._forget_cold(video_id)
+        self._promote(video)
+        self._on_video_change(video, change_type, payload)
+
+    def _detach(self, video: VideoBase) -> None:
+        video._observer = None
+        if self._handed.get(video.video_id) is video:
+            del self._handed[video.video_id]
+            self._cancel_write_back(video.video_id)
+
+    def _promote(self, video: VideoBase) -> None:
+        # Sıcak nesne tek doğru kaynaktır; geri yazım gerekmez.
+        self._cancel_write_back(video.video_id)
+        video._observer = self._on_video_change
+        self._videos[video.video_id] = video
+        self._evict()
+
+    def save(self, video: VideoBase) -> None:
+        if video.video_id in self._cold and video.video_id not in self._videos:
+            previous = self._read(video.video_id)
+            position = self._unindex(previous)
+            self._forget_cold(video.video_id)
+            if previous is not video:
+                self._detach(previous)
+            self._cancel_write_back(video.video_id)
+            video.intern_fields()
+            self._videos[video.video_id] = video
+            video._observer = self._on_video_change
+            self._index(video, position)
+        else:
+            super().save(video)
+        self._videos.move_to_end(video.video_id)
+        self._evict()
+
+    def remove(self, video_id: str) -> bool:
+        if video_id in self._videos:
+            self._forget_cold(video_id)
+            return super().remove(video_id)
+
+        video = self._read(video_id)
+        if video is None:
+            return False
+        self._forget_cold(video_id)
+        self._detach(video)
+        self._unindex(video)
+        self._on_video_change(video, ChangeType.REMOVED, {})
+        return True
+
+    def _forget_cold(self, video_id: str) -> None:
+        location = self._cold.pop(video_id, None)
+        if location is not None:
+            self._garbage_bytes += location[1]
+
+    def apply_bulk(
+        self,
+        videos: List[VideoBase],
+        now: datetime,
+        status: Optional[VideoStatus] = None,
+        visibility: Optional[VideoVisibility] = None
+    ) -> None:
+        super().apply_bulk(videos, now, status=status, visibility=visibility)
+        # Toplu işlem sırasında soğuğa düşen videoların güncel hali yazılır.
+        for video in videos:
+            if video.video_id not in self._videos:
+                self._write(video)
+
+    def apply_batch(
+        self,
+        created: List[VideoBase],
+        changed: List[Tuple[VideoBase, VideoStatus, VideoVisibility]],
+        removed: List[str],
+        events: List[Tuple[VideoBase, ChangeType, dict]],
+        now: datetime
+    ) -> None:
+        for video_id in removed:
+            self._forget_cold_removal(video_id, events)
+        super().apply_batch(created, changed, removed, events, now)
+        # Commit'e kadar soğuğa düşmüş videoların güncel hali yazılır.
+        for video, _, _ in changed:
+            if video.video_id not in self._videos:
+                self._write(video)
+        self._evict()
+
+    def _forget_cold_removal(self, video_id: str, events: list) -> None:
+        if video_id in self._videos:
+            self._forget_cold(video_id)
+            return
+        video = self._read(video_id)
+        if video is not None:
+            self._forget_cold(video_id)
+            self._detach(video)
+            self._unindex(video)
+            events.append((video, ChangeType.REMOVED, {}))
+
+    def find_by_id(self, video_id: str) -> Optional[VideoBase]:
+        video = self._videos.get(video_id)
+        if video is not None:
+            self.hits += 1
+            self._videos.move_to_end(video_id)
+            return video
+
+        video = self._read(video_id)
+        if video is None:
+            return None
+        self.misses += 1
+        self._forget_cold(video_id)
+        self._promote(video)
+        return video
+
+    def exists(self, video_id: str) -> bool:
+        return video_id in self._videos or (
+            video_id in self._bloom and video_id in self._cold
+        )
+
+    def count(self) -> int:
+        return len(self._videos) + len(self._cold)
+
+    def _iter_all(self):
+        yield from list(self._videos.values())
+        for video_id in list(self._cold):
+            if video_id not in self._videos:
+                video = self._read(video_id)
+                if video is not None:
+                    yield video
+
+    def _resolve(self, video_ids) -> List[VideoBase]:
+        result = []
+        for video_id in video_ids:
+            video = self._videos.get(video_id)
+            if video is None:
+                video = self._read(video_id)
+            if video is not None:
+                result.append(video)
+        return result
+
+    def compact(self) -> int:
+        # Geçersiz kalmış kayıtları atarak soğuk dosyayı yeniden yazar.
+        with self._io_lock:
+            reclaimed = self._garbage_bytes
+            records = [(vid, self._read(vid)) for vid in list(self._cold)]
+            self._file.close()
+            self._file = open(self.path, "w+b")
+            self._cold = {}
+            self._bloom = BloomFilter(
+                max(self._expected_videos, len(records))
+            )
+            self._record_bytes = 0
+            self._record_count = 0
+            self._garbage_bytes = 0
+            for _, video in records:
+                self._write(video)
+            return reclaimed
+
+    def metrics(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hot_videos": len(self._videos),
+            "cold_videos": len(self._cold),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "rehydrations": self.rehydrations,
+            "avg_rehydration_ms": (
+                self.rehydration_seconds / self.rehydrations * 1000
+                if self.rehydrations else 0.0
+            ),
+            "max_rehydration_ms": self.max_rehydration_seconds * 1000,
+            "cold_file_bytes": self._record_bytes,
+            "garbage_bytes": self._garbage_bytes
+        }
+
+    def clear(self) -> None:
+        for video_id in list(self._cold):
+            if video_id not in self._videos:
+                self.remove(video_id)
+        super().clear()
+        self.compact()
+
+    def close(self) -> None:
+        with self._io_lock:
+            if self._file.closed:
+                return
+            self._write_backs.clear()
+            self._file.close()
+            if self._owns_file and os.path.exists(self.path):
+                os.remove(self.path)
+
+    def __len__(self):
+        return self.count()
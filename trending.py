@@ -0,0 +1,195 @@
+import heapq
+from bisect import bisect_left
+import math
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from base import ChangeType, VideoBase
+from leaderboard import Leaderboard
+from repository import VideoRepository
+
+
+DEFAULT_WEIGHTS = {"views": 1.0, "shares": 3.0, "loops": 0.5}
+
+
+class TrendingEngine:
+    # Forward decay: her olay w * e^(λ(t - t0)) olarak eklenir. Böylece eski
+    # skorlar hiç güncellenmeden karşılaştırılabilir ve sıralama zamanla
+    # değişmez; okurken e^(-λ(now - t0)) ile bugünkü değere çevrilir.
+
+    MAX_EXPONENT = 600.0
+
+    def __init__(
+        self,
+        half_life: timedelta = timedelta(hours=6),
+        capacity: int = 100,
+        reserve: Optional[int] = None,
+        weights: Optional[Dict[str, float]] = None,
+        clock: Callable[[], datetime] = datetime.now
+    ):
+        self.decay_rate = math.log(2) / half_life.total_seconds()
+        self.capacity = capacity
+        self.reserve = capacity if reserve is None else reserve
+        self.weights = weights or dict(DEFAULT_WEIGHTS)
+        self.clock = clock
+        self._landmark = clock().timestamp()
+        self._scores: Dict[str, float] = {}
+        self._scopes: Dict[str, Tuple[str, str]] = {}
+        self._boards: Dict[Tuple[str, Optional[str]], Leaderboard] = {}
+        # Tablolar görünen kapasitenin altında bir yedek tutar; tavan, o
+        # tablodan düşen ya da kabul edilmeyen en yüksek skordur. Tablo
+        # dışındaki her video tavanın altında kalır.
+        self._ceilings: Dict[Tuple[str, Optional[str]], float] = {}
+        self._members: Dict[Tuple[str, Optional[str]], Set[str]] = {}
+
+    def attach(self, repository: VideoRepository) -> None:
+        repository.add_listener(self._on_change)
+
+    def detach(self, repository: VideoRepository) -> None:
+        repository.remove_listener(self._on_change)
+
+    def _on_change(
+        self,
+        video: VideoBase,
+        change_type: ChangeType,
+        payload: dict
+    ) -> None:
+        if change_type == ChangeType.STATS_DELTA:
+            weight = 0.0
+            for metric, amount in payload.items():
+                if amount > 0 and metric in self.weights:
+                    weight += self.weights[metric] * amount
+            if weight > 0:
+                self.record(
+                    video.video_id,
+                    video.channel_id,
+                    video.get_video_type(),
+                    weight
+                )
+        elif change_type == ChangeType.REMOVED:
+            self.forget(video.video_id)
+
+    def _board(self, scope: str, key: Optional[str]) -> Leaderboard:
+        board = self._boards.get((scope, key))
+        if board is None:
+            board = Leaderboard(self.capacity + self.reserve)
+            self._boards[(scope, key)] = board
+        return board
+
+    def _offer(
+        self,
+        key: Tuple[str, Optional[str]],
+        video_id: str,
+        score: float
+    ) -> None:
+        if key[0] != "global":
+            self._members.setdefault(key, set()).add(video_id)
+        dropped = self._board(*key).offer(video_id, score)
+        if dropped is not None:
+            ceiling = self._ceilings.get(key, 0.0)
+            self._ceilings[key] = max(ceiling, self._scores[dropped])
+
+    def record(
+        self,
+        video_id: str,
+        channel_id: str,
+        video_type: str,
+        weight: float,
+        when: Optional[datetime] = None
+    ) -> None:
+        exponent = self.decay_rate * (
+            (when or self.clock()).timestamp() - self._landmark
+        )
+        if exponent > self.MAX_EXPONENT:
+            self._rebase((when or self.clock()).timestamp())
+            exponent = 0.0
+
+        score = self._scores.get(video_id, 0.0) + weight * math.exp(exponent)
+        self._scores[video_id] = score
+        self._scopes[video_id] = (channel_id, video_type)
+
+        self._offer(("global", None), video_id, score)
+        self._offer(("channel", channel_id), video_id, score)
+        self._offer(("type", video_type), video_id, score)
+
+    def _rebase(self, timestamp: float) -> None:
+        # e^x taşmasın diye nadiren tüm skorlar yeni referans zamana ölçeklenir.
+        factor = math.exp(-self.decay_rate * (timestamp - self._landmark))
+        self._landmark = timestamp
+        self._scores = {vid: s * factor for vid, s in self._scores.items()}
+        for board in self._boards.values():
+            board.rescale(factor)
+        self._ceilings = {
+            key: ceiling * factor for key, ceiling in self._ceilings.items()
+        }
+
+    def forget(self, video_id: str) -> None:
+        self._scores.pop(video_id, None)
+        scopes = self._scopes.pop(video_id, None)
+        if scopes is None:
+            return
+        channel_id, video_type = scopes
+        keys = (("global", None), ("channel", channel_id), ("type", video_type))
+        for key in keys:
+            members = self._members.get(key)
+            if members is not None:
+                members.discard(video_id)
+            board = self._boards.get(key)
+            if board is not None and board.remove(video_id):
+                self._refill(key, board)
+
+    def _refill(
+        self,
+        key: Tuple[str, Optional[str]],
+        board: Leaderboard
+    ) -> None:
+        # Tavanın üstünde görünen kapasite kadar kayıt kaldıkça yedek yeter;
+        # dışarıdaki hiçbir video onları geçemez. Yedek tükenince tablo
+        # yalnızca kapsamın kendi videolarından yeniden kurulur.
+        ceiling = self._ceilings.get(key)
+        if ceiling is None:
+            return
+        above = bisect_left(board.entries, (-ceiling, ""))
+        if above >= self.capacity:
+            return
+
+        ids = self._scores if key[0] == "global" else self._members[key]
+        top = heapq.nlargest(
+            board.capacity + 1,
+            ((self._scores[video_id], video_id) for video_id in ids)
+        )
+        board.entries = [(-score, video_id) for score, video_id in top]
+        board.members = {video_id: score for score, video_id in top}
+        if len(top) > board.capacity:
+            score, video_id = top[-1]
+            board.remove(video_id)
+            self._ceilings[key] = score
+        else:
+            del self._ceilings[key]
+
+    def _current(self, score: float) -> float:
+        return score * math.exp(
+            -self.decay_rate * (self.clock().timestamp() - self._landmark)
+        )
+
+    def score(self, video_id: str) -> float:
+        return self._current(self._scores.get(video_id, 0.0))
+
+    def trending(
+        self,
+        k: int = 10,
+        scope: str = "global",
+        key: Optional[str] = None
+    ) -> List[Tuple[str, float]]:
+        if scope not in ("global", "channel", "type"):
+            raise ValueError("Geçersiz kapsam")
+        board = self._boards.get((scope, key if scope != "global" else None))
+        if board is None:
+            return []
+        return [
+            (video_id, self._current(-score))
+            for score, video_id in board.entries[:min(k, self.capacity)]
+        ]
+
+    def __len__(self):
+        return len(self._scores)
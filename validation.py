@@ -0,0 +1,196 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+class Rule:
+    __slots__ = ("name", "check", "message", "replaces")
+
+    def __init__(
+        self,
+        name: str,
+        check: Callable[[object], bool],
+        message: str,
+        replaces: Tuple[str, ...] = ()
+    ):
+        self.name = name
+        self.check = check
+        self.message = message
+        # Kalıtılan bu isimli kurallar alt sınıfta düşürülür.
+        self.replaces = replaces
+
+    def __repr__(self) -> str:
+        return f"<Rule {self.name}>"
+
+
+class ValidationFailure:
+    __slots__ = ("video_id", "video_type", "rule", "message")
+
+    def __init__(self, video_id: str, video_type: str, rule: str, message: str):
+        self.video_id = video_id
+        self.video_type = video_type
+        self.rule = rule
+        self.message = message
+
+    def to_dict(self) -> dict:
+        return {
+            "video_id": self.video_id,
+            "video_type": self.video_type,
+            "rule": self.rule,
+            "message": self.message
+        }
+
+    def __eq__(self, other) -> bool:
+        return (
+            isinstance(other, ValidationFailure)
+            and self.to_dict() == other.to_dict()
+        )
+
+    def __repr__(self) -> str:
+        return f"<ValidationFailure {self.video_type} | {self.rule}: {self.message}>"
+
+
+class ValidationResult:
+    __slots__ = ("video", "failures")
+
+    def __init__(self, video, failures: List[ValidationFailure]):
+        self.video = video
+        self.failures = failures
+
+    @property
+    def ok(self) -> bool:
+        return not self.failures
+
+    def __repr__(self) -> str:
+        return f"<ValidationResult {self.video.video_id} | ok={self.ok}>"
+
+
+class RuleSet:
+    # Bir sınıfın kalıtımla birleşmiş kuralları tek bir demete derlenir;
+    # geçerli videolar için yol yalnızca kısa devre eden bir döngüdür.
+
+    def __init__(self, rules: Iterable[Rule]):
+        self.rules: Tuple[Rule, ...] = tuple(rules)
+        self._checks = tuple(rule.check for rule in self.rules)
+
+    def passes(self, video) -> bool:
+        for check in self._checks:
+            if not check(video):
+                return False
+        return True
+
+    def failures(self, video) -> List[ValidationFailure]:
+        if self.passes(video):
+            return []
+        video_type = video.get_video_type()
+        return [
+            ValidationFailure(video.video_id, video_type, rule.name, rule.message)
+            for rule in self.rules
+            if not rule.check(video)
+        ]
+
+    def __len__(self):
+        return len(self.rules)
+
+
+class ValidationRegistry:
+    # Kurallar sınıf başına kaydedilir; bir sınıfın kural seti MRO'daki
+    # tüm kayıtların birleşimidir, aynı isimli kural alt sınıfta ezilir,
+    # replaces ile verilen isimler ise tamamen kaldırılır.
+
+    def __init__(self):
+        self._rules: Dict[type, List[Rule]] = {}
+        self._compiled: Dict[type, RuleSet] = {}
+
+    def register(self, video_class: type, rules: Iterable[Rule]) -> None:
+        self._rules.setdefault(video_class, []).extend(rules)
+        self._compiled.clear()
+
+    def rules_for(self, video_class: type) -> RuleSet:
+        compiled = self._compiled.get(video_class)
+        if compiled is None:
+            merged: Dict[str, Rule] = {}
+            for klass in reversed(video_class.__mro__):
+                for rule in self._rules.get(klass, ()):
+                    for name in rule.replaces:
+                        merged.pop(name, None)
+                    merged.pop(rule.name, None)
+                    merged[rule.name] = rule
+            compiled = self._compiled[video_class] = RuleSet(merged.values())
+        return compiled
+
+    def is_valid(self, video) -> bool:
+        return self.rules_for(type(video)).passes(video)
+
+    def failures(self, video) -> List[ValidationFailure]:
+        return self.rules_for(type(video)).failures(video)
+
+    def validate(self, video) -> ValidationResult:
+        return ValidationResult(video, self.failures(video))
+
+    def validate_stream(self, videos: Iterable) -> Iterator[ValidationResult]:
+        rule_sets: Dict[type, RuleSet] = {}
+        for video in videos:
+            video_class = type(video)
+            rule_set = rule_sets.get(video_class)
+            if rule_set is None:
+                rule_set = rule_sets[video_class] = self.rules_for(video_class)
+            if rule_set.passes(video):
+                yield ValidationResult(video, [])
+            else:
+                yield ValidationResult(video, rule_set.failures(video))
+
+    def validate_parallel(
+        self,
+        videos: Iterable,
+        workers: Optional[int] = None,
+        chunk_size: int = 5000
+    ) -> Iterator[ValidationResult]:
+        # İşçiler yalnızca hatalı videoların sıra ve nedenlerini döndürür,
+        # videolar geri taşınmaz. Kurallar işçide modül içe aktarılırken
+        # kaydedilir; çalışma anında eklenen kurallar işçiye ulaşmaz.
+        workers = workers or os.cpu_count() or 1
+        iterator = iter(videos)
+        with ProcessPoolExecutor(workers) as pool:
+            pending = []
+            while True:
+                chunk = list(islice(iterator, chunk_size))
+                if chunk:
+                    pending.append((chunk, pool.submit(_validate_chunk, chunk)))
+                # Bellekte sınırlı sayıda parça tutulur.
+                while pending and (not chunk or len(pending) > workers * 2):
+                    done, future = pending.pop(0)
+                    failed = future.result()
+                    for index, video in enumerate(done):
+                        yield ValidationResult(video, failed.get(index, []))
+                if not chunk:
+                    return
+
+
+def _validate_chunk(videos: list) -> Dict[int, List[ValidationFailure]]:
+    failed = {}
+    for index, video in enumerate(videos):
+        failures = validators.failures(video)
+        if failures:
+            failed[index] = failures
+    return failed
+
+
+validators = ValidationRegistry()
+
+
+def register_rules(video_class: type, *rules: Rule) -> None:
+    validators.register(video_class, rules)
+
+
+def validate_stream(videos: Iterable) -> Iterator[ValidationResult]:
+    return validators.validate_stream(videos)
+
+
+def validate_parallel(
+    videos: Iterable,
+    workers: Optional[int] = None,
+    chunk_size: int = 5000
+) -> Iterator[ValidationResult]:
+    return validators.validate_parallel(videos, workers, chunk_size)
@@ -0,0 +1,417 @@
+import json
+import queue
+import threading
+import zlib
+from collections import defaultdict
+from contextlib import nullcontext
+from datetime import datetime, timedelta
+from enum import Enum
+from random import Random
+from time import perf_counter, sleep
+from typing import Dict, Iterable, List, Optional
+
+from base import VideoBase, VideoStatus, VideoVisibility
+from implementations import LiveStreamVideo, ShortVideo, StandardVideo
+from services import VideoService
+
+
+TRACE_VERSION = 1
+
+
+def encode_video(video: VideoBase) -> dict:
+    data = {
+        "type": video.get_video_type(),
+        "id": video.video_id,
+        "channel_id": video.channel_id,
+        "title": video.title,
+        "duration_seconds": video.duration_seconds,
+        "visibility": video.visibility.value
+    }
+    if isinstance(video, StandardVideo):
+        data["resolution"] = video.resolution
+        data["has_subtitles"] = video.has_subtitles
+    elif isinstance(video, ShortVideo):
+        data["is_vertical"] = video.is_vertical
+        data["music_used"] = video.music_used
+    elif isinstance(video, LiveStreamVideo):
+        data["scheduled_time"] = video.scheduled_time.isoformat()
+    return data
+
+
+def decode_video(data: dict) -> VideoBase:
+    visibility = VideoVisibility(data["visibility"])
+    if data["type"] == "StandardVideo":
+        return StandardVideo(
+            channel_id=data["channel_id"],
+            title=data["title"],
+            duration_seconds=data["duration_seconds"],
+            visibility=visibility,
+            resolution=data.get("resolution", "1080p"),
+            has_subtitles=data.get("has_subtitles", False)
+        )
+    if data["type"] == "ShortVideo":
+        return ShortVideo(
+            channel_id=data["channel_id"],
+            title=data["title"],
+            duration_seconds=data["duration_seconds"],
+            visibility=visibility,
+            is_vertical=data.get("is_vertical", True),
+            music_used=data.get("music_used", False)
+        )
+    if data["type"] == "LiveStreamVideo":
+        return LiveStreamVideo(
+            channel_id=data["channel_id"],
+            title=data["title"],
+            scheduled_time=datetime.fromisoformat(data["scheduled_time"]),
+            visibility=visibility
+        )
+    raise ValueError("Bilinmeyen video tipi")
+
+
+class WorkloadRecorder:
+    # VideoService'i sarar; her çağrıyı zaman, süre ve argümanlarıyla
+    # JSON Lines olarak yazar. Video id'leri {"id": ...} olarak işaretlenir
+    # ki tekrar oynatırken yeni id'lere eşlenebilsin.
+
+    def __init__(self, service: VideoService, path: Optional[str] = None):
+        self._service = service
+        self._lock = threading.Lock()
+        self._known_ids: set = set()
+        self._started = perf_counter()
+        self.records: List[dict] = []
+        self._file = open(path, "w", encoding="utf-8") if path else None
+        if self._file is not None:
+            self._file.write(json.dumps({"version": TRACE_VERSION}) + "\n")
+
+    def _encode(self, value):
+        if isinstance(value, VideoBase):
+            return {"video": encode_video(value)}
+        if isinstance(value, Enum):
+            return {"enum": type(value).__name__, "value": value.value}
+        if isinstance(value, datetime):
+            return {"datetime": value.isoformat()}
+        if isinstance(value, str) and value in self._known_ids:
+            return {"id": value}
+        if isinstance(value, (list, tuple)):
+            return [self._encode(item) for item in value]
+        return value
+
+    def _record(self, record: dict) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.write(json.dumps(record, separators=(",", ":")))
+                self._file.write("\n")
+            else:
+                self.records.append(record)
+
+    def __getattr__(self, name: str):
+        target = getattr(self._service, name)
+        if not callable(target) or name.startswith("_"):
+            return target
+
+        def recorded(*args, **kwargs):
+            offset = perf_counter() - self._started
+            started = perf_counter()
+            ok = True
+            try:
+                return target(*args, **kwargs)
+            except Exception:
+                ok = False
+                raise
+            finally:
+                elapsed = perf_counter() - started
+                if name == "upload_video" and ok:
+                    self._known_ids.add(args[0].video_id)
+                record = {
+                    "t": round(offset, 6),
+                    "op": name,
+                    "args": [self._encode(arg) for arg in args],
+                    "ms": round(elapsed * 1000, 4),
+                    "ok": ok
+                }
+                if kwargs:
+                    record["kwargs"] = {
+                        key: self._encode(value)
+                        for key, value in kwargs.items()
+                    }
+                self._record(record)
+
+        return recorded
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def load_trace(path: str) -> List[dict]:
+    records = []
+    with open(path, encoding="utf-8") as handle:
+        header = json.loads(handle.readline())
+        if header.get("version") != TRACE_VERSION:
+            raise ValueError("Desteklenmeyen iz sürümü")
+        for line in handle:
+            if line.strip():
+                records.append(json.loads(line))
+    return records
+
+
+def generate_demo_mix(
+    count: int,
+    seed: int = 0,
+    channels: int = 20
+) -> List[dict]:
+    # demo.py senaryolarının karışımı: yükleme, yayınlama, izleme, görünürlük,
+    # engelleme, etiketleme ve listeleme sorguları.
+    rng = Random(seed)
+    uploaded: List[str] = []
+    records = []
+    weights = [
+        ("upload", 15),
+        ("process_and_publish", 10),
+        ("mark_video_watched", 35),
+        ("add_tag", 10),
+        ("change_visibility", 5),
+        ("block_video", 2),
+        ("list_public", 5),
+        ("list_by_channel", 10),
+        ("sort_by_title", 1),
+        ("paginate", 7)
+    ]
+    ops = [op for op, weight in weights for _ in range(weight)]
+
+    for i in range(count):
+        op = rng.choice(ops) if uploaded else "upload"
+        if op == "upload":
+            video_id = f"gen-{i}"
+            kind = rng.choice(("StandardVideo", "ShortVideo", "LiveStreamVideo"))
+            video = {
+                "type": kind,
+                "id": video_id,
+                "channel_id": f"channel_{rng.randrange(channels)}",
+                "title": f"{kind} {i}",
+                "duration_seconds": (
+                    rng.randint(10, 60) if kind == "ShortVideo"
+                    else rng.randint(60, 3600)
+                ),
+                "visibility": VideoVisibility.PUBLIC.value
+            }
+            if kind == "LiveStreamVideo":
+                video["scheduled_time"] = (
+                    datetime.now() + timedelta(hours=rng.randint(1, 48))
+                ).isoformat()
+            uploaded.append(video_id)
+            records.append({"op": "upload_video", "args": [{"video": video}]})
+        elif op in ("process_and_publish", "mark_video_watched", "block_video"):
+            records.append({
+                "op": op, "args": [{"id": rng.choice(uploaded)}]
+            })
+        elif op == "add_tag":
+            records.append({
+                "op": op,
+                "args": [
+                    {"id": rng.choice(uploaded)},
+                    rng.choice(("education", "python", "shorts", "music"))
+                ]
+            })
+        elif op == "change_visibility":
+            visibility = rng.choice(list(VideoVisibility))
+            records.append({
+                "op": op,
+                "args": [
+                    {"id": rng.choice(uploaded)},
+                    {"enum": "VideoVisibility", "value": visibility.value}
+                ]
+            })
+        elif op == "list_by_channel":
+            records.append({
+                "op": op, "args": [f"channel_{rng.randrange(channels)}"]
+            })
+        elif op == "paginate":
+            records.append({"op": op, "args": [rng.randint(1, 5), 20]})
+        else:
+            records.append({"op": op, "args": []})
+    return records
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+class ReplayReport:
+
+    def __init__(
+        self,
+        latencies: Dict[str, List[float]],
+        errors: Dict[str, int],
+        elapsed_seconds: float
+    ):
+        self.latencies = latencies
+        self.errors = errors
+        self.elapsed_seconds = elapsed_seconds
+
+    @property
+    def requests(self) -> int:
+        return sum(len(values) for values in self.latencies.values())
+
+    @property
+    def error_count(self) -> int:
+        return sum(self.errors.values())
+
+    @property
+    def error_rate(self) -> float:
+        return self.error_count / self.requests if self.requests else 0.0
+
+    @property
+    def throughput(self) -> float:
+        if self.elapsed_seconds <= 0:
+            return 0.0
+        return self.requests / self.elapsed_seconds
+
+    def summary(self, op: Optional[str] = None) -> dict:
+        if op is None:
+            values = sorted(v for vs in self.latencies.values() for v in vs)
+            errors = self.error_count
+        else:
+            values = sorted(self.latencies.get(op, []))
+            errors = self.errors.get(op, 0)
+        return {
+            "requests": len(values),
+            "errors": errors,
+            "p50_ms": percentile(values, 0.50) * 1000,
+            "p99_ms": percentile(values, 0.99) * 1000,
+            "p999_ms": percentile(values, 0.999) * 1000
+        }
+
+    def __repr__(self) -> str:
+        overall = self.summary()
+        return (
+            f"<ReplayReport {self.requests} req | "
+            f"{self.throughput:.0f} req/s | "
+            f"p50={overall['p50_ms']:.3f}ms p99={overall['p99_ms']:.3f}ms "
+            f"p999={overall['p999_ms']:.3f}ms | "
+            f"errors={self.error_rate:.2%}>"
+        )
+
+
+class ReplayDriver:
+    # Açık döngü: her istek planlanan zamanına göre ölçülür, böylece
+    # kuyrukta bekleme de gecikmeye dahil olur. Aynı videoya ait istekler
+    # sırayı korumak için hep aynı işçiye gider. VideoService ve depo iş
+    # parçacığı güvenli olmadığından çağrılar varsayılan olarak tek kilitle
+    # sıralanır (kilit beklemesi de gecikmeye girer); eşzamanlı çağrıyı
+    # kaldırabilen bir arka uç için thread_safe=True verilir.
+
+    ENUMS = {"VideoStatus": VideoStatus, "VideoVisibility": VideoVisibility}
+
+    def __init__(
+        self,
+        service,
+        target_qps: Optional[float] = None,
+        workers: int = 8,
+        thread_safe: bool = False
+    ):
+        self.service = service
+        self.target_qps = target_qps
+        self.workers = workers
+        self.thread_safe = thread_safe
+        self._id_map: Dict[str, str] = {}
+        self._call_lock = nullcontext() if thread_safe else threading.Lock()
+
+    def _decode(self, value):
+        if isinstance(value, list):
+            return [self._decode(item) for item in value]
+        if not isinstance(value, dict):
+            return value
+        if "video" in value:
+            video = decode_video(value["video"])
+            self._id_map[value["video"]["id"]] = video.video_id
+            return video
+        if "id" in value:
+            return self._id_map.get(value["id"], value["id"])
+        if "enum" in value:
+            return self.ENUMS[value["enum"]](value["value"])
+        if "datetime" in value:
+            return datetime.fromisoformat(value["datetime"])
+        return value
+
+    @staticmethod
+    def _routing_key(record: dict) -> Optional[str]:
+        for arg in record.get("args", []):
+            if isinstance(arg, dict):
+                if "video" in arg:
+                    return arg["video"]["id"]
+                if "id" in arg:
+                    return arg["id"]
+        return None
+
+    def run(self, records: Iterable[dict]) -> ReplayReport:
+        records = list(records)
+        queues = [queue.Queue() for _ in range(self.workers)]
+        latencies: Dict[str, List[float]] = defaultdict(list)
+        errors: Dict[str, int] = defaultdict(int)
+        lock = threading.Lock()
+
+        def worker(inbox: queue.Queue) -> None:
+            local_latencies = defaultdict(list)
+            local_errors = defaultdict(int)
+            while True:
+                item = inbox.get()
+                if item is None:
+                    break
+                scheduled, record = item
+                delay = scheduled - perf_counter()
+                if delay > 0:
+                    sleep(delay)
+                op = record["op"]
+                try:
+                    args = self._decode(record.get("args", []))
+                    kwargs = {
+                        key: self._decode(value)
+                        for key, value in record.get("kwargs", {}).items()
+                    }
+                    method = getattr(self.service, op)
+                    with self._call_lock:
+                        method(*args, **kwargs)
+                except Exception:
+                    local_errors[op] += 1
+                local_latencies[op].append(perf_counter() - scheduled)
+            with lock:
+                for op, values in local_latencies.items():
+                    latencies[op].extend(values)
+                for op, count in local_errors.items():
+                    errors[op] += count
+
+        threads = [
+            threading.Thread(target=worker, args=(inbox,), daemon=True)
+            for inbox in queues
+        ]
+        for thread in threads:
+            thread.start()
+
+        started = perf_counter()
+        next_worker = 0
+        for i, record in enumerate(records):
+            scheduled = (
+                started + i / self.target_qps
+                if self.target_qps else perf_counter()
+            )
+            key = self._routing_key(record)
+            if key is None:
+                index = next_worker
+                next_worker = (next_worker + 1) % self.workers
+            else:
+                index = zlib.crc32(key.encode("utf-8")) % self.workers
+            queues[index].put((scheduled, record))
+
+        for inbox in queues:
+            inbox.put(None)
+        for thread in threads:
+            thread.join()
+
+        return ReplayReport(
+            dict(latencies), dict(errors), perf_counter() - started
+        )